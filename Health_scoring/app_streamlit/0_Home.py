@@ -1,5 +1,8 @@
+import os
+
 import streamlit as st
-from PIL import Image
+
+import app_data
 
 
 st.set_page_config(page_title="Company Financial Health Dashboard", layout="wide")
@@ -39,8 +42,8 @@ st.markdown(
 )
 
 
-logo = Image.open("Copilot_20250623_064402.png")
-st.image(logo, width=120)
+# st.image reads the file itself; no PIL import on the landing page
+st.image(os.path.join(app_data.APP_DIR, "Copilot_20250623_064402.png"), width=120)
 
 
 
@@ -0,0 +1,103 @@
+"""Data shared by the dashboard pages, loaded once per server process.
+
+Loaders are `st.cache_resource` entries keyed on the score store's hash, so
+every session shares one read-only copy and a rebuilt store is picked up on
+the next rerun. pandas, pyarrow and the scoring package are only imported
+inside the loaders: importing this module is free, which keeps the Home page
+light.
+"""
+
+import os
+import sys
+
+import streamlit as st
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(APP_DIR, '..')))
+
+CSV_PATH = os.path.join(APP_DIR, 'dataset1_complet.csv')
+
+# rendered page tables kept per server process (least recently used evicted first)
+RENDER_CACHE_ENTRIES = 512
+RENDER_CACHE_TTL = 3600
+
+
+def store_path():
+    from health_scoring.store import STORE_FILENAME
+    return os.path.join(APP_DIR, STORE_FILENAME)
+
+
+def store_hash():
+    """Hash of the score store, (re)materialized from CSV_PATH when stale."""
+    from health_scoring.store import ensure_store
+    return ensure_store(store_path(), CSV_PATH)
+
+
+@st.cache_resource(show_spinner=False)
+def _score_index(file_hash):
+    from health_scoring.index import ScoreIndex
+    from health_scoring.store import load_store
+
+    # scores, thresholds, statuses and alerts are precomputed by health_scoring.store;
+    # macro series stay in their (country, quarter) table, see `_macro_table`
+    df, _ = load_store(store_path(), macro=False)
+    return ScoreIndex(df)
+
+
+@st.cache_resource(show_spinner=False)
+def _macro_table(file_hash):
+    from health_scoring.store import load_macro, read_metadata
+
+    return load_macro(read_metadata(store_path()))
+
+
+@st.cache_resource(show_spinner=False)
+def _explorer_cube(file_hash):
+    from health_scoring.explorer import ExplorerCube
+
+    # every company/indicator series is filled, rescaled and melted once per store version
+    return ExplorerCube(_score_index(file_hash).frame, macro=_macro_table(file_hash))
+
+
+@st.cache_data(show_spinner=False)
+def _correlation_matrix(file_hash, method):
+    from health_scoring.correlation import correlate, to_matrix
+
+    frame = _score_index(file_hash).frame
+    macro = _macro_table(file_hash)
+    return to_matrix(correlate(macro.join(frame) if macro is not None else frame, method=method))
+
+
+@st.cache_data(max_entries=RENDER_CACHE_ENTRIES, ttl=RENDER_CACHE_TTL, show_spinner=False)
+def _rendered_table(file_hash, layout, by, name, view):
+    from health_scoring.report import render_report
+
+    index = _score_index(file_hash)
+    if by == "company":
+        rows = index.company(name, latest_first=layout == "financial")
+        return render_report(rows, layout, key="quarter", view=view)
+    return render_report(index.quarter(name), layout, key="company", view=view)
+
+
+def score_index():
+    """`ScoreIndex` over the current score store (shared, treat as read-only)."""
+    return _score_index(store_hash())
+
+
+def explorer_cube():
+    """`ExplorerCube` of the current score store (shared)."""
+    return _explorer_cube(store_hash())
+
+
+def correlation_matrix(method="pearson"):
+    """Pooled correlation matrix of the source indicators in the current store."""
+    return _correlation_matrix(store_hash(), method)
+
+
+def rendered_table(layout, by, name, view="all"):
+    """HTML of a page table for one company (`by="company"`) or one quarter.
+
+    Cached on (store version, layout, company/quarter, score view), so repeated
+    views of the same table by any session cost a dictionary lookup.
+    """
+    return _rendered_table(store_hash(), layout, by, name, view)
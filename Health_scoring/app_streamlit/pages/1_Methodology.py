@@ -1,6 +1,38 @@
 import streamlit as st
-from PIL import Image
 import os
+import sys
+import altair as alt
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(current_dir, '..')))
+
+from app_data import correlation_matrix
+
+
+def show_correlation_matrix():
+    method = st.radio("Correlation method", ["Pearson", "Spearman"], horizontal=True)
+    try:
+        matrix = correlation_matrix(method.lower())
+    except OSError:
+        # no dataset next to the app: fall back to the notebook's snapshot
+        image_path = os.path.normpath(os.path.join(current_dir, '..', 'img', 'correlation_matrix.png'))
+        st.image(image_path, caption='Correlation Matrix of Key Indicators', use_container_width=True)
+        return
+
+    order = list(matrix.columns)
+    cells = matrix.rename_axis("x").reset_index().melt(id_vars="x", var_name="y", value_name="corr")
+    base = alt.Chart(cells).encode(
+        x=alt.X("x:N", sort=order, title=None),
+        y=alt.Y("y:N", sort=order, title=None),
+    )
+    heatmap = base.mark_rect().encode(
+        color=alt.Color("corr:Q", scale=alt.Scale(scheme="redblue", domain=[-1, 1]), title="Correlation"),
+        tooltip=["x", "y", alt.Tooltip("corr:Q", format=".2f")],
+    )
+    labels = base.mark_text(fontSize=10).encode(text=alt.Text("corr:Q", format=".2f"))
+    st.altair_chart((heatmap + labels).properties(height=520), use_container_width=True)
+    st.caption(f"{method} correlation matrix of key indicators (pairwise complete observations)")
+
 
 def show_methodology_page():
     st.title("Methodology – How Are the Financial Scores Built?")
@@ -51,10 +83,7 @@ def show_methodology_page():
     
     st.subheader(" Step 2: Correlation Matrix – Selecting the Right Combinations")
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    image_path = os.path.normpath(os.path.join(current_dir, '..', 'img', 'correlation_matrix.png'))
-    image = Image.open(image_path)
-    st.image(image, caption='Correlation Matrix of Key Indicators', use_container_width=True)
+    show_correlation_matrix()
 
     st.markdown("""
     This matrix shows how strongly each indicator correlates with the others:
@@ -1,18 +1,16 @@
 import streamlit as st
 import pandas as pd
 import os
+import sys
 import altair as alt
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.normpath(os.path.join(current_dir, '..', 'dataset1_complet.csv'))
+sys.path.insert(0, os.path.normpath(os.path.join(current_dir, '..')))
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv(csv_path)
-    df = df.sort_values(["company", "quarter"])
-    return df
+from app_data import explorer_cube
+from health_scoring.explorer import MACRO_OPTIONS, POINT_BUDGET, SCORE_OPTIONS
 
-df = load_data()
+cube = explorer_cube()
 
 st.title("Score Evolution Explorer")
 st.markdown("""
@@ -29,27 +27,13 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-score_options = {
-    "Profitability (Local)": "score_profitability_local",
-    "Profitability (Global)": "score_profitability_global",  
-    "Liquidity (Local)": "score_liquidity_local",
-    "Liquidity (Global)": "score_liquidity_global",
-    "Solvency (Local)": "score_solvency_local",
-    "Solvency (Global)": "score_solvency_global",
-    "Leverage (Local)": "score_leverage_adjusted_local",
-    "Leverage (Global)": "score_leverage_adjusted_global",
-    "Revenue Growth": "revenue_growth"
-}
-
-macro_options = {
-    "Inflation (YoY)": "inflation_YoY",
-    "GDP Growth Rate": "gdp_growth_rate",
-    "Interest Rate": "interest_rate"
-}
+score_options = SCORE_OPTIONS
+
+macro_options = MACRO_OPTIONS
 
 selected_companies = st.multiselect(
     "Select companies to compare:",
-    options=sorted(df["company"].unique())
+    options=list(cube.companies)
 )
 
 selected_labels = st.multiselect(
@@ -67,58 +51,7 @@ if selected_companies and selected_labels:
     low_threshold = st.slider("Low threshold", 0.0, 1.0, 0.2)
     high_threshold = st.slider("High threshold", 0.0, 1.0, 0.8)
 
-    selected_columns = [score_options[label] for label in selected_labels]
-    macro_columns = [macro_options[m] for m in selected_macro]
-
-    def prepare_plot_data(df_src, label):
-        all_quarters = df["quarter"].sort_values().unique()
-        df_plot = df_src[["quarter"] + selected_columns].copy()
-        df_plot = df_plot.set_index("quarter").reindex(all_quarters)
-        df_plot.fillna(method="ffill", inplace=True)
-        df_plot.fillna(method="bfill", inplace=True)
-        df_plot.reset_index(inplace=True)
-        df_plot["Company"] = label
-
-        if "revenue_growth" in df_plot.columns and df_plot["revenue_growth"].notna().any():
-            mean_rev = df_plot["revenue_growth"].mean()
-            df_plot["revenue_growth"] = df_plot["revenue_growth"] - mean_rev + 0.5
-            
-
-        df_plot = df_plot.rename(columns={v: k for k, v in score_options.items()})
-        df_melt = df_plot.melt(id_vars=["quarter", "Company"], var_name="Score", value_name="Value")
-        df_melt["Value"] = df_melt["Value"].fillna(0.5)
-        
-        return df_melt
-
-    def prepare_macro_data(df_src, label):
-        df_macro = df_src[["quarter"] + macro_columns].copy()
-        df_macro["Company"] = label
-        df_macro = df_macro.sort_values("quarter")
-
-        for col in macro_columns:
-            df_macro[col] = df_macro[col].clip(-1, 1) + 0.5
-
-        df_macro = df_macro.rename(columns={v: k for k, v in macro_options.items()})
-
-        df_melt = df_macro.melt(id_vars=["quarter", "Company"], var_name="Score", value_name="Value")
-        df_melt["Value"] = df_melt["Value"].fillna(0.5)
-
-        # NEW → Add LineType column
-        df_melt["LineType"] = "dotted"
-
-        return df_melt
-
-    df_all = pd.concat([
-        prepare_plot_data(df[df["company"] == comp], comp)
-        for comp in selected_companies
-    ])
-
-    if selected_macro:
-        df_macro_all = pd.concat([
-            prepare_macro_data(df[df["company"] == comp], comp)
-            for comp in selected_companies
-        ])
-        df_all = pd.concat([df_all, df_macro_all])
+    df_all = cube.select(selected_companies, selected_labels + selected_macro, max_points=POINT_BUDGET)
 
     base_chart = alt.Chart(df_all).mark_line(point=True).encode(
     x=alt.X("quarter:O", title="Quarter"),
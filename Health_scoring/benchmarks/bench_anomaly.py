@@ -0,0 +1,85 @@
+"""Benchmark anomaly backends: fit/score latency and agreement with the autoencoder.
+
+    python benchmarks/bench_anomaly.py                      # dataset_unified.csv
+    python benchmarks/bench_anomaly.py --companies 500 --quarters 60
+
+Agreement is measured on the `is_anomaly_<group>` flags: share of rows with
+the same flag, and Jaccard overlap of the flagged rows, against the Keras
+autoencoder (skipped with --no-autoencoder or when TensorFlow is missing).
+"""
+
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, '..')))
+
+from health_scoring.anomaly import error_frame, get_detector, prepare  # noqa: E402
+from health_scoring.loader import read_source  # noqa: E402
+from synthetic import synthetic_source  # noqa: E402
+
+SOURCE = os.path.normpath(os.path.join(HERE, '..', '..', 'dataset_unified.csv'))
+
+
+def tensorflow_import_seconds():
+    code = "import time; t = time.perf_counter(); import keras; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return float(out.stdout.strip().splitlines()[-1]) if out.returncode == 0 else float("nan")
+
+
+def run_backend(backend, df, X, codes, n_companies):
+    detector = get_detector(backend)
+    start = time.perf_counter()
+    detector.fit(X, codes, n_companies=n_companies)
+    fit_s = time.perf_counter() - start
+    start = time.perf_counter()
+    errors = detector.reconstruction_errors(X, codes)
+    score_s = time.perf_counter() - start
+    return fit_s, score_s, error_frame(df, errors)
+
+
+def agreement(flags, reference):
+    rows = []
+    for col in [c for c in reference.columns if c.startswith("is_anomaly_")]:
+        a, b = flags[col].to_numpy(), reference[col].to_numpy()
+        union = (a | b).sum()
+        rows.append({"flag": col, "same_flag": (a == b).mean(), "jaccard": (a & b).sum() / union if union else 1.0})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=0, help="synthetic companies (0 = use dataset_unified.csv)")
+    parser.add_argument("--quarters", type=int, default=52)
+    parser.add_argument("--no-autoencoder", action="store_true")
+    args = parser.parse_args(argv)
+
+    source = synthetic_source(args.companies, args.quarters) if args.companies else read_source(SOURCE)
+    df, X, codes, companies = prepare(source)
+    print(f"{len(df):,} rows, {len(companies):,} companies")
+
+    backends = ["pca", "isolation_forest"]
+    if not args.no_autoencoder and importlib.util.find_spec("keras") is not None:
+        backends.append("autoencoder")
+        print(f"keras import: {tensorflow_import_seconds():.2f} s (paid once per worker)")
+
+    results = {}
+    for backend in backends:
+        fit_s, score_s, frame = run_backend(backend, df, X, codes, len(companies))
+        results[backend] = frame
+        print(f"{backend:>16}: fit {fit_s:8.3f} s   score {score_s:8.3f} s")
+
+    if "autoencoder" in results:
+        for backend in ("pca", "isolation_forest"):
+            print(f"\nagreement {backend} vs autoencoder")
+            print(agreement(results[backend], results["autoencoder"]).to_string(index=False, float_format="%.3f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Benchmark: row-wise page classifier vs health_scoring.classify.
+
+    python benchmarks/bench_classify.py --rows 1000000
+
+The legacy functions below are the ones the Streamlit pages ran through
+`df.apply(axis=1)`, with the module-level threshold dicts turned into arguments.
+Label parity between the two is checked by `tests/test_classify.py`.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+
+from health_scoring.classify import classify, compute_thresholds  # noqa: E402
+from health_scoring.scoring import GLOBAL_SCORE_COLS, LOCAL_SCORE_COLS  # noqa: E402
+
+
+def get_local_alerts(row, thresholds_dynamic):
+    alerts = []
+    for score in ["profitability", "liquidity", "solvency", "leverage_adjusted"]:
+        val = row.get(f"score_{score}_local")
+        if pd.notna(val):
+            key = f"score_{score}"
+            if val > thresholds_dynamic[key]["high"]:
+                alerts.append(f"↑ {score.title()}")
+            elif val < thresholds_dynamic[key]["low"]:
+                alerts.append(f"↓ {score.title()}")
+    rev = row.get("revenue_growth")
+    if pd.notna(rev):
+        if rev > thresholds_dynamic["revenue_growth"]["boost"]:
+            alerts.append("Rev ↑")
+        elif rev < thresholds_dynamic["revenue_growth"]["drop"]:
+            alerts.append("Rev ↓")
+    return ", ".join(alerts)
+
+
+def get_global_alerts(row, thresholds_dynamic_global):
+    alerts = []
+    for score in ["profitability", "liquidity", "solvency", "leverage_adjusted"]:
+        val = row.get(f"score_{score}_global")
+        if pd.notna(val):
+            key = f"score_{score}"
+            if val > thresholds_dynamic_global[key]["high"]:
+                alerts.append(f"High {score.title()}")
+            elif val < thresholds_dynamic_global[key]["low"]:
+                alerts.append(f"Low {score.title()}")
+    return ", ".join(alerts)
+
+
+def get_local_status(row, thresholds_dynamic):
+    red, green = 0, 0
+    indicators = {
+        "score_profitability": row.get("score_profitability_local"),
+        "score_liquidity": row.get("score_liquidity_local"),
+        "score_solvency": row.get("score_solvency_local"),
+        "score_leverage_adjusted": row.get("score_leverage_adjusted_local")
+    }
+    available = [val for val in indicators.values() if pd.notna(val)]
+    if len(available) < 3:
+        return "Insufficient Data"
+    for key, value in indicators.items():
+        if pd.notna(value):
+            if value < thresholds_dynamic[key]["low"]:
+                red += 1
+            elif value > thresholds_dynamic[key]["high"]:
+                green += 1
+    adj_leverage = indicators["score_leverage_adjusted"]
+    rev = row.get("revenue_growth")
+    if adj_leverage is not None and adj_leverage < thresholds_dynamic["score_leverage_adjusted"]["low"]:
+        return "Leveraged Risk"
+    elif adj_leverage is not None and adj_leverage > thresholds_dynamic["score_leverage_adjusted"]["high"] and red == 0 and rev is not None and rev > thresholds_dynamic["revenue_growth"]["boost"]:
+        return "Excellent Health"
+    elif red >= 3:
+        return "Critical Risk"
+    elif red == 2:
+        return "Danger"
+    elif green >= 2 and red == 0:
+        return "Strong"
+    elif green > 0 and red == 0:
+        return "Good signal"
+    elif red == green and red > 0:
+        return "Mixed Risk"
+    elif red == 1 and green == 0:
+        return "Caution"
+    elif all(thresholds_dynamic[k]["low"] <= val <= thresholds_dynamic[k]["high"] for k, val in indicators.items() if pd.notna(val)):
+        return "Stable"
+    else:
+        return "Watch"
+
+
+def get_global_status(row, thresholds_dynamic_global):
+    red, green = 0, 0
+    indicators = {
+        "score_profitability": row.get("score_profitability_global"),
+        "score_liquidity": row.get("score_liquidity_global"),
+        "score_solvency": row.get("score_solvency_global"),
+        "score_leverage_adjusted": row.get("score_leverage_adjusted_global")
+    }
+    available = [val for val in indicators.values() if pd.notna(val)]
+    if len(available) < 3:
+        return "Insufficient Data"
+    for key, value in indicators.items():
+        if pd.notna(value):
+            if value < thresholds_dynamic_global[key]["low"]:
+                red += 1
+            elif value > thresholds_dynamic_global[key]["high"]:
+                green += 1
+    if red >= 3:
+        return "Critical Risk"
+    elif red == 2:
+        return "Danger"
+    elif green >= 2 and red == 0:
+        return "Strong"
+    elif green > 0 and red == 0:
+        return "Good signal"
+    elif red == green and red > 0:
+        return "Mixed Risk"
+    elif red == 1 and green == 0:
+        return "Caution"
+    elif all(thresholds_dynamic_global[k]["low"] <= val <= thresholds_dynamic_global[k]["high"] for k, val in indicators.items() if pd.notna(val)):
+        return "Stable"
+    else:
+        return "Watch"
+
+
+def legacy_classify(df, thresholds_local, thresholds_global):
+    return pd.DataFrame({
+        "Local Alert Summary": df.apply(get_local_alerts, axis=1, args=(thresholds_local,)),
+        "Global Alert Summary": df.apply(get_global_alerts, axis=1, args=(thresholds_global,)),
+        "Local Status": df.apply(get_local_status, axis=1, args=(thresholds_local,)),
+        "Global Status": df.apply(get_global_status, axis=1, args=(thresholds_global,)),
+    }, index=df.index)
+
+
+def synthetic_scores(rows, seed=0, missing=0.05):
+    """Random score columns with some missing cells and revenue growth outliers."""
+    rng = np.random.default_rng(seed)
+    data = {col: rng.random(rows) for col in LOCAL_SCORE_COLS + GLOBAL_SCORE_COLS}
+    data["revenue_growth"] = rng.normal(0, 0.2, rows)
+    df = pd.DataFrame(data)
+    mask = rng.random(df.shape) < missing
+    return df.mask(mask)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=None,
+                        help="run the row-wise baseline on the first N rows only (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    df = synthetic_scores(args.rows, seed=args.seed)
+    thresholds_local = compute_thresholds(df, "local")
+    thresholds_global = compute_thresholds(df, "global")
+
+    start = time.perf_counter()
+    classify(df, thresholds_local, thresholds_global)
+    fast_s = time.perf_counter() - start
+    print(f"vectorized: {args.rows:>10,} rows in {fast_s:8.3f} s")
+
+    legacy_rows = args.rows if args.legacy_rows is None else min(args.legacy_rows, args.rows)
+    sample = df.iloc[:legacy_rows]
+    start = time.perf_counter()
+    legacy_classify(sample, thresholds_local, thresholds_global)
+    slow_s = time.perf_counter() - start
+    print(f"row-wise:   {legacy_rows:>10,} rows in {slow_s:8.3f} s "
+          f"(~{slow_s * args.rows / max(legacy_rows, 1):.1f} s at {args.rows:,})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Per-stage timings of the scoring pipeline on synthetic data, written as JSON.
+
+    python benchmarks/bench_suite.py                            # 1e3, 1e4, 1e5 rows
+    python benchmarks/bench_suite.py --sizes 1e6 1e7 --output after.json
+    python benchmarks/bench_suite.py --compare before.json
+
+Every size generates `synthetic.synthetic_source` data, writes it in the
+source CSV format and times each stage on it (best of --repeat runs):
+CSV parse, local and global percentile ranking, composite scores,
+thresholds, status/alert classification, alert text rendering, Score
+Explorer melt and anomaly preparation/fit/score. The Explorer and anomaly
+stages are skipped above --heavy-max-rows. With --compare, each timing is
+printed next to the same (rows, stage) entry of an earlier results file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.normpath(os.path.join(HERE, '..')))
+
+from health_scoring.anomaly import get_detector, prepare  # noqa: E402
+from health_scoring.classify import classify, compute_thresholds, with_alert_text  # noqa: E402
+from health_scoring.explorer import ExplorerCube  # noqa: E402
+from health_scoring.loader import read_source, write_source  # noqa: E402
+from health_scoring.scoring import (  # noqa: E402
+    INDICATORS,
+    assemble_block,
+    composite_scores,
+    group_codes,
+    grouped_pct_rank,
+    scores_frame,
+)
+from synthetic import synthetic_source  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+def _best(fn, repeat):
+    """(result of the last call, best wall time of `repeat` calls)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_size(rows, quarters, repeat=1, heavy_max_rows=1_000_000, backend="pca", seed=0, workdir=None):
+    """{stage: seconds or None if skipped} for one synthetic dataset of ~`rows` rows."""
+    companies = max(1, rows // quarters)
+    timings = {}
+
+    def timed(stage, fn):
+        result, timings[stage] = _best(fn, repeat)
+        return result
+
+    source = synthetic_source(companies, quarters, seed=seed)
+    path = write_source(source, os.path.join(workdir, f"source_{rows}.csv"))
+    del source
+
+    df = timed("csv_parse", lambda: read_source(path))
+    os.remove(path)
+    raw = df[INDICATORS].to_numpy(dtype=np.float64)
+    local = timed("local_rank", lambda: grouped_pct_rank(raw, group_codes(df["company"])[0]))
+    global_ = timed("global_rank", lambda: grouped_pct_rank(raw, group_codes(df["quarter"])[0]))
+    block = assemble_block(local, global_)
+    composite = timed("composite", lambda: composite_scores(block))
+    scored = pd.concat([df, scores_frame(block, df.index, composite)], axis=1)
+
+    thresholds = timed("thresholds", lambda: {
+        "local": compute_thresholds(scored, "local"),
+        "global": compute_thresholds(scored, "global"),
+    })
+    labels = timed("classify", lambda: classify(scored, thresholds["local"], thresholds["global"], render=False))
+    timed("render_alerts", lambda: with_alert_text(labels))
+    scored = pd.concat([scored, labels], axis=1)
+
+    heavy = len(df) <= heavy_max_rows
+    timings["explorer_melt"] = _best(lambda: ExplorerCube(scored), repeat)[1] if heavy else None
+    if heavy:
+        frame, X, codes, names = timed("anomaly_prepare", lambda: prepare(df))
+        detector = timed("anomaly_fit", lambda: get_detector(backend).fit(X, codes, n_companies=len(names)))
+        timed("anomaly_score", lambda: detector.reconstruction_errors(X, codes))
+    else:
+        timings.update(anomaly_prepare=None, anomaly_fit=None, anomaly_score=None)
+    return {"rows": len(df), "companies": companies, "quarters": quarters, "stages": timings}
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=HERE, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def print_results(results, baseline=None):
+    previous = {}
+    for entry in (baseline or {}).get("results", []):
+        for stage, seconds in entry["stages"].items():
+            previous[entry["rows"], stage] = seconds
+    for entry in results:
+        print(f"\n{entry['rows']:,} rows ({entry['companies']:,} companies x {entry['quarters']} quarters)")
+        for stage, seconds in entry["stages"].items():
+            if seconds is None:
+                print(f"  {stage:>16}:  skipped")
+                continue
+            line = f"  {stage:>16}: {seconds:9.4f} s"
+            before = previous.get((entry["rows"], stage))
+            if before:
+                line += f"   (was {before:9.4f} s, x{seconds / before:5.2f})"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5],
+                        help="approximate company-quarter rows per run")
+    parser.add_argument("--quarters", type=int, default=40, help="quarters per company")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage (best is kept)")
+    parser.add_argument("--heavy-max-rows", type=float, default=1e6,
+                        help="skip the Explorer and anomaly stages above this many rows")
+    parser.add_argument("--backend", default="pca", help="anomaly backend (see anomaly.BACKENDS)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            results.append(run_size(
+                int(size), args.quarters, repeat=args.repeat, heavy_max_rows=int(args.heavy_max_rows),
+                backend=args.backend, seed=args.seed, workdir=workdir,
+            ))
+
+    report = {"version": RESULTS_VERSION, "environment": environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_results(results, baseline)
+    print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
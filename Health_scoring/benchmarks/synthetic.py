@@ -0,0 +1,70 @@
+"""Synthetic company-quarter data in the `dataset_unified.csv` schema.
+
+Ratios are per-company random walks around the levels seen in the real
+extract, with occasional shocks; macro columns depend only on (country,
+quarter), as in the source. Missing cells follow the source pattern: a
+share of latest-quarter rows lacks the income-statement ratios (like the
+Banco Santander 2024-Q3 row), plus scattered gaps elsewhere.
+"""
+
+import numpy as np
+import pandas as pd
+
+from health_scoring.loader import SOURCE_COLUMNS
+
+COUNTRIES = ["France", "USA", "Spain", "UK"]
+
+# (level, quarterly step) per ratio, roughly the real extract's mean and spread
+RATIO_WALKS = {
+    "ROA": (0.6, 0.05),
+    "ROE": (0.075, 0.006),
+    "debt_to_equity": (15.5, 0.8),
+    "current_ratio": (1.0, 0.1),
+    "net_margin": (0.18, 0.02),
+    "revenue_growth": (0.05, 0.3),
+    "cash_ratio": (0.45, 0.05),
+}
+MACRO_WALKS = {
+    "inflation_YoY": (0.02, 0.003),
+    "gdp_growth_rate": (0.007, 0.004),
+    "interest_rate": (0.011, 0.002),
+}
+# columns left empty on "not yet reported" latest-quarter rows
+LATE_COLUMNS = ["ROA", "ROE", "net_margin", "cash_ratio"]
+
+
+def _walks(rng, shape, walks):
+    levels = np.array([level for level, _ in walks.values()])
+    steps = np.array([step for _, step in walks.values()])
+    return levels + rng.normal(0, 1, shape + (len(walks),)).cumsum(axis=-2) * steps
+
+
+def synthetic_source(companies, quarters, seed=0, missing=0.03, late=0.1, shocks=0.01):
+    """`companies` x `quarters` rows, clustered by company and sorted by quarter."""
+    rng = np.random.default_rng(seed)
+    periods = pd.period_range(end="2024Q4", periods=quarters, freq="Q")
+    n = companies * quarters
+    country_of = rng.integers(0, len(COUNTRIES), companies)
+
+    df = pd.DataFrame({
+        "company": np.repeat([f"Company {i:07d}" for i in range(companies)], quarters),
+        "date": np.tile(periods.end_time.strftime("%Y-%m-%d"), companies),
+        "quarter": np.tile(periods.strftime("%Y-Q%q"), companies),
+        "country": np.repeat(np.array(COUNTRIES)[country_of], quarters),
+    })
+
+    ratios = _walks(rng, (companies, quarters), RATIO_WALKS).reshape(n, len(RATIO_WALKS))
+    spread = np.array([step for _, step in RATIO_WALKS.values()]) * 10
+    ratios += (rng.random(ratios.shape) < shocks) * rng.normal(0, 1, ratios.shape) * spread
+    df[list(RATIO_WALKS)] = ratios
+
+    macro = _walks(rng, (len(COUNTRIES), quarters), MACRO_WALKS)
+    df[list(MACRO_WALKS)] = macro[np.repeat(country_of, quarters), np.tile(np.arange(quarters), companies)]
+
+    ratio_cols = list(RATIO_WALKS)
+    holes = rng.random((n, len(ratio_cols))) < missing
+    latest = np.zeros(n, dtype=bool)
+    latest[quarters - 1::quarters] = rng.random(companies) < late
+    holes[:, [ratio_cols.index(c) for c in LATE_COLUMNS]] |= latest[:, None]
+    df[ratio_cols] = df[ratio_cols].mask(holes)
+    return df[SOURCE_COLUMNS]
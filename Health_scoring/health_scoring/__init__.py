@@ -0,0 +1,32 @@
+"""Financial health scoring shared by the notebooks and the Streamlit app.
+
+The names below are resolved on first access, so importing a submodule (or
+the package itself) does not load every other submodule with it.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "INDICATORS": "scoring",
+    "GLOBAL_SCORE_COLS": "scoring",
+    "LOCAL_SCORE_COLS": "scoring",
+    "SCORES": "scoring",
+    "score": "scoring",
+    "STATUS_LABELS": "classify",
+    "classify": "classify",
+    "compute_thresholds": "classify",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
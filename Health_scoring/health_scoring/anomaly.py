@@ -0,0 +1,322 @@
+"""Autoencoder anomaly detection on feature groups, for all companies at once.
+
+Port of `Ml_learning_anomalies.ipynb`. The notebook trained one small Keras
+autoencoder per feature group for a single bank; here the per-group
+autoencoders are stacked into one model that also takes a learned company
+embedding, and the whole universe is trained in a single batched fit with
+early stopping. The output has the notebook's `df_group_errors` layout: one
+reconstruction error column per group, `date`, `company` and
+`is_anomaly_<group>` flags (errors above the company's 95th percentile).
+
+The autoencoder is one of several interchangeable backends (see
+`detectors.py`); `detect(df, backend="pca")` avoids importing TensorFlow.
+`AnomalyModel.save` persists scalers, model state and the fitted cutoffs so
+`score_only` can flag new quarters without retraining. `macro_context` adds
+the per-country standardized macro series next to the errors.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .detectors import Detector, IsolationForestDetector, PCADetector, group_features
+from .gaps import fill_gaps
+from .macro import MacroTable
+
+
+GROUPS = {
+    "rentabilité": ["ROE", "ROA", "net_margin"],
+    "solvabilité": ["debt_to_equity", "current_ratio"],
+    "liquidité": ["cash_ratio"],
+    "croissance": ["revenue_growth"],
+}
+
+ANOMALY_PERCENTILE = 95
+
+# bump when the saved model layout changes
+MODEL_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def fill_company_gaps(df, features, by="company"):
+    """Linear interpolation over each company's rows, nearest value at the edges (notebook behaviour).
+
+    Adds the `gaps.IMPUTED_COL` bitmask of the filled cells.
+    """
+    return fill_gaps(df, features, strategy="linear", by=by, spacing="rows")
+
+
+def fit_scaler(df, features, by="company"):
+    """Per-company mean and population std (like StandardScaler), indexed by company."""
+    grouped = df.groupby(by, sort=True)[features]
+    return grouped.mean(), grouped.std(ddof=0)
+
+
+def standardize(df, features, mean, std, by="company"):
+    """z-scores with the given per-company scaler; constant or empty columns give 0."""
+    keys = df[by].to_numpy()
+    mu = mean.reindex(keys).to_numpy()
+    sigma = std.reindex(keys).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (df[features].to_numpy(dtype=np.float64) - mu) / np.where(sigma > 0, sigma, np.nan)
+    return np.nan_to_num(z, nan=0.0).astype(np.float32)
+
+
+def standardize_by_company(df, features, by="company"):
+    """Per-company z-scores fitted on `df` itself."""
+    mean, std = fit_scaler(df, features, by=by)
+    return standardize(df, features, mean, std, by=by)
+
+
+def prepare_frame(df, groups=GROUPS, by="company"):
+    """Copy of `df` sorted by company and date, with feature gaps filled."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values([by, "date"], kind="stable").reset_index(drop=True)
+    return fill_company_gaps(df, group_features(groups), by=by)
+
+
+def prepare(df, groups=GROUPS, by="company"):
+    """Sorted frame, standardized feature matrix and integer company codes."""
+    df = prepare_frame(df, groups, by=by)
+    X = standardize_by_company(df, group_features(groups), by=by)
+    codes, companies = pd.factorize(df[by], sort=True)
+    return df, X, codes.astype(np.int32), list(companies)
+
+
+def company_cutoffs(errors, companies, percentile=ANOMALY_PERCENTILE):
+    """(company x group) table of the `percentile`-th reconstruction error."""
+    return pd.DataFrame(errors).groupby(np.asarray(companies)).quantile(percentile / 100)
+
+
+def flag_anomalies(errors, companies, percentile=ANOMALY_PERCENTILE, cutoffs=None):
+    """`is_anomaly_<group>`: error above the company's own `percentile`-th error.
+
+    With `cutoffs` (from `company_cutoffs`), previously fitted thresholds are
+    used instead of the errors' own percentiles.
+    """
+    if cutoffs is None:
+        cutoffs = company_cutoffs(errors, companies, percentile)
+    limits = cutoffs.reindex(np.asarray(companies))
+    return {f"is_anomaly_{group}": values > limits[group].to_numpy() for group, values in errors.items()}
+
+
+def error_frame(df, errors, by="company", percentile=ANOMALY_PERCENTILE, cutoffs=None):
+    """Errors + flags in the notebook's `df_group_errors` layout."""
+    out = pd.DataFrame(errors)
+    out["date"] = df["date"].to_numpy()
+    out[by] = df[by].to_numpy()
+    for col, values in flag_anomalies(errors, df[by].to_numpy(), percentile, cutoffs).items():
+        out[col] = values
+    return out
+
+
+def macro_context(errors, df, macro=None, by="company", transform="zscore"):
+    """`error_frame` output with the macro series of each row's country and quarter.
+
+    Replaces the notebook's per-company `df_macro_scaled` merged on `date`:
+    the series are standardized once per country in a `MacroTable` (built
+    from `df` unless given) and gathered through the (company, date) of
+    each error row.
+    """
+    macro = macro if macro is not None else MacroTable.from_frame(df)
+    source = pd.MultiIndex.from_arrays([df[by].astype(str), pd.to_datetime(df["date"])])
+    rows = source.get_indexer(pd.MultiIndex.from_arrays([errors[by].astype(str), pd.to_datetime(errors["date"])]))
+    if (rows < 0).any():
+        raise ValueError("error rows without a matching (company, date) in df")
+    keys = df[["country", "quarter"]].to_numpy()[rows]
+    values = macro.gather(macro.positions(keys[:, 0], keys[:, 1]), transform)
+    return errors.assign(**{col: values[:, j] for j, col in enumerate(macro.columns)})
+
+
+class BatchedAutoencoder(Detector):
+    """Per-group autoencoders with a shared company embedding, trained in one fit."""
+
+    def __init__(self, groups=GROUPS, embedding_dim=4, encoding_dim=2, epochs=200,
+                 batch_size=1024, patience=10, learning_rate=0.005, seed=0):
+        super().__init__(groups)
+        self.embedding_dim = embedding_dim
+        self.encoding_dim = encoding_dim
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.patience = patience
+        self.learning_rate = learning_rate
+        self.seed = seed
+        self.model = None
+
+    def build(self, n_companies, compile=True):
+        import keras
+        from keras import layers
+
+        keras.utils.set_random_seed(self.seed)
+        company = keras.Input(shape=(1,), dtype="int32", name="company")
+        embedding = layers.Flatten()(layers.Embedding(n_companies, self.embedding_dim)(company))
+
+        inputs, outputs = [], []
+        for idx in self._slices().values():
+            width = len(idx)
+            encoding_dim = min(self.encoding_dim, width)
+            group_input = keras.Input(shape=(width,))
+            inputs.append(group_input)
+            x = layers.Concatenate()([group_input, embedding])
+            x = layers.Dense(encoding_dim * 2, activation="relu")(x)
+            x = layers.Dense(encoding_dim, activation="relu")(x)
+            x = layers.Dense(encoding_dim * 2, activation="relu")(x)
+            outputs.append(layers.Dense(width, activation="linear")(x))
+
+        reconstruction = layers.Concatenate()(outputs) if len(outputs) > 1 else outputs[0]
+        self.model = keras.Model(inputs=inputs + [company], outputs=reconstruction)
+        if compile:
+            self.model.compile(optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate), loss="mse")
+        return self.model
+
+    def _inputs(self, X, codes):
+        return [X[:, idx] for idx in self._slices().values()] + [codes]
+
+    def _target(self, X):
+        # decoder outputs are concatenated in group order
+        return X[:, [i for idx in self._slices().values() for i in idx]]
+
+    def fit(self, X, codes, n_companies=None):
+        import keras
+
+        if self.model is None:
+            self.build(n_companies or int(codes.max()) + 1)
+        stop = keras.callbacks.EarlyStopping(monitor="loss", patience=self.patience, restore_best_weights=True)
+        self.model.fit(
+            self._inputs(X, codes), self._target(X),
+            epochs=self.epochs,
+            batch_size=min(self.batch_size, len(X)),
+            callbacks=[stop],
+            verbose=0,
+        )
+        return self
+
+    def reconstruction_errors(self, X, codes):
+        """Mean squared reconstruction error per row, per group."""
+        target = self._target(X)
+        rec = self.model.predict(self._inputs(X, codes), batch_size=max(self.batch_size, 4096), verbose=0)
+        squared = np.square(target - rec)
+        errors, start = {}, 0
+        for group, idx in self._slices().items():
+            errors[group] = squared[:, start:start + len(idx)].mean(axis=1)
+            start += len(idx)
+        return errors
+
+    def save_state(self, directory):
+        self.model.save_weights(os.path.join(directory, "autoencoder.weights.h5"))
+
+    def load_state(self, directory, n_companies):
+        # inference only: no optimizer state to restore
+        self.build(n_companies, compile=False)
+        self.model.load_weights(os.path.join(directory, "autoencoder.weights.h5"))
+        return self
+
+
+BACKENDS = {
+    "autoencoder": BatchedAutoencoder,
+    "pca": PCADetector,
+    "isolation_forest": IsolationForestDetector,
+}
+
+
+def get_detector(backend, groups=GROUPS, **kwargs):
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown anomaly backend {backend!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](groups, **kwargs)
+
+
+class AnomalyModel:
+    """Fitted detector plus the per-company scalers and anomaly cutoffs it was trained with."""
+
+    def __init__(self, backend="pca", groups=GROUPS, by="company", percentile=ANOMALY_PERCENTILE, **model_kwargs):
+        self.backend = backend
+        self.groups = groups
+        self.by = by
+        self.percentile = percentile
+        self.model_kwargs = model_kwargs
+        self.features = group_features(groups)
+        self.detector = None
+        self.companies = []
+        self.scaler_mean = self.scaler_std = self.cutoffs = None
+
+    def _codes(self, df):
+        codes = pd.Index(self.companies).get_indexer(df[self.by])
+        if (codes < 0).any():
+            unknown = sorted(set(df.loc[codes < 0, self.by]))
+            raise ValueError(f"no fitted model for {self.by} {unknown}; retrain to include them")
+        return codes.astype(np.int32)
+
+    def fit(self, df):
+        """Train on `df` and return its `df_group_errors` frame."""
+        df = prepare_frame(df, self.groups, by=self.by)
+        self.scaler_mean, self.scaler_std = fit_scaler(df, self.features, by=self.by)
+        self.companies = list(self.scaler_mean.index)
+        X = standardize(df, self.features, self.scaler_mean, self.scaler_std, by=self.by)
+        codes = self._codes(df)
+        self.detector = get_detector(self.backend, self.groups, **self.model_kwargs)
+        self.detector.fit(X, codes, n_companies=len(self.companies))
+        errors = self.detector.reconstruction_errors(X, codes)
+        self.cutoffs = company_cutoffs(errors, df[self.by].to_numpy(), self.percentile)
+        return error_frame(df, errors, by=self.by, cutoffs=self.cutoffs)
+
+    def score(self, df):
+        """Score new rows with the stored scalers, model and cutoffs (no retraining)."""
+        df = prepare_frame(df, self.groups, by=self.by)
+        X = standardize(df, self.features, self.scaler_mean, self.scaler_std, by=self.by)
+        errors = self.detector.reconstruction_errors(X, self._codes(df))
+        return error_frame(df, errors, by=self.by, cutoffs=self.cutoffs)
+
+    def save(self, directory):
+        """Write a versioned model directory (manifest, scalers, cutoffs, detector state)."""
+        os.makedirs(directory, exist_ok=True)
+        manifest = {
+            "version": MODEL_VERSION,
+            "backend": self.backend,
+            "groups": self.groups,
+            "by": self.by,
+            "percentile": self.percentile,
+            "model_kwargs": self.model_kwargs,
+            "companies": self.companies,
+        }
+        np.savez(
+            os.path.join(directory, "calibration.npz"),
+            scaler_mean=self.scaler_mean.to_numpy(),
+            scaler_std=self.scaler_std.to_numpy(),
+            cutoffs=self.cutoffs.reindex(columns=list(self.groups)).to_numpy(),
+        )
+        self.detector.save_state(directory)
+        # manifest last: a directory without one is an incomplete save
+        with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["version"] != MODEL_VERSION:
+            raise ValueError(f"{directory} has anomaly model version {manifest['version']}, expected {MODEL_VERSION}")
+        model = cls(manifest["backend"], manifest["groups"], manifest["by"], manifest["percentile"],
+                    **manifest["model_kwargs"])
+        model.companies = manifest["companies"]
+        index = pd.Index(model.companies, name=model.by)
+        with np.load(os.path.join(directory, "calibration.npz")) as arrays:
+            model.scaler_mean = pd.DataFrame(arrays["scaler_mean"], index=index, columns=model.features)
+            model.scaler_std = pd.DataFrame(arrays["scaler_std"], index=index, columns=model.features)
+            model.cutoffs = pd.DataFrame(arrays["cutoffs"], index=index, columns=list(model.groups))
+        model.detector = get_detector(model.backend, model.groups, **model.model_kwargs)
+        model.detector.load_state(directory, len(model.companies))
+        return model
+
+
+def detect(df, groups=GROUPS, by="company", percentile=ANOMALY_PERCENTILE, backend="pca", **model_kwargs):
+    """Fit `backend` on every company in `df` and return the `df_group_errors` frame."""
+    return AnomalyModel(backend, groups, by, percentile, **model_kwargs).fit(df)
+
+
+def score_only(df, directory):
+    """`df_group_errors` for `df` from a model saved with `AnomalyModel.save`."""
+    return AnomalyModel.load(directory).score(df)
@@ -0,0 +1,301 @@
+"""HTTP/JSON scoring service (needs the optional `aiohttp` package).
+
+    python -m health_scoring.api app_streamlit/scores.v3.parquet --port 8080
+
+Endpoints:
+
+- `GET /status?company=HSBC&start=2020-Q1&end=2024-Q4`: scores, statuses and
+  alerts of one company over a quarter range (both bounds optional);
+  `GET /status?quarter=2024-Q3` returns every company in that quarter.
+- `POST /score` with `{"rows": [{"company": ..., "quarter": ..., "ROA": ...}]}`:
+  scores and classifies company-quarter rows against the stored universe
+  (a row stands in for the stored row with the same company and quarter)
+  without changing the store.
+- `GET /health`: store version and row count.
+
+Lookups are served straight from a `ScoreIndex`. `/score` bodies are
+validated before they are queued (non-numeric ratios give a 400); concurrent
+requests are then coalesced by `MicroBatcher` into one vectorized call that
+compares every new row with the stored rows of its company and quarter at
+once, off the event loop. If a merged call still fails, its requests are
+retried one by one so the error only reaches the request that caused it.
+"""
+
+import argparse
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+from .classify import LABEL_COLS, classify, with_alert_text
+from .index import ScoreIndex
+from .loader import ID_COLUMNS, NUMERIC_COLUMNS
+from .scoring import INDICATORS, OUTPUT_COLS, assemble_block, scores_frame
+
+
+# columns returned for every row
+RESPONSE_COLS = ["company", "quarter"] + OUTPUT_COLS + LABEL_COLS
+# requests merged into one scoring call, and how long the first one may wait
+MAX_BATCH = 256
+MAX_DELAY = 0.002
+
+
+class MicroBatcher:
+    """Coalesce concurrent `submit(items)` calls into one `fn(all_items)` call.
+
+    `fn` takes a list of items and returns one result per item; it runs in the
+    default executor so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, fn, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = None
+        self._worker = None
+
+    async def submit(self, items):
+        """Results for `items`, computed together with other pending requests."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            # first call, or the worker died: queued requests go to a new one
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((items, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        size = len(pending[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while size < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            try:
+                request = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            pending.append(request)
+            size += len(request[0])
+        return pending
+
+    async def _call(self, pending):
+        """Run `fn` on the items of `pending` requests and resolve their futures."""
+        loop = asyncio.get_running_loop()
+        items = [item for request, _ in pending for item in request]
+        try:
+            results = await loop.run_in_executor(None, self.fn, items)
+            if results is None or len(results) != len(items):
+                raise ValueError(f"batch function returned {0 if results is None else len(results)} results for {len(items)} items")
+        except Exception as exc:
+            if len(pending) > 1:
+                # isolate the failing request: the others still get their results
+                for request in pending:
+                    await self._call([request])
+                return
+            results, error = None, exc
+        start = 0
+        for request, future in pending:
+            if not future.done():
+                if results is None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[start:start + len(request)])
+            start += len(request)
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            try:
+                await self._call(pending)
+            except BaseException as exc:
+                # never leave a request waiting on a batch that will not finish
+                _fail(pending, exc)
+                if not isinstance(exc, Exception):
+                    raise
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _fail([self._queue.get_nowait()], asyncio.CancelledError())
+
+
+def _fail(pending, exc):
+    for _, future in pending:
+        if future.done():
+            continue
+        if isinstance(exc, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(exc)
+
+
+class ScoringService:
+    """Status lookups and what-if scoring over a materialized store."""
+
+    def __init__(self, df, thresholds, meta=None):
+        self.index = ScoreIndex(df)
+        self._raw = self.index.frame[INDICATORS].to_numpy(dtype=np.float64)
+        self.thresholds = thresholds
+        self.meta = meta or {}
+
+    @classmethod
+    def from_store(cls, path):
+        from .store import load_store
+
+        df, meta = load_store(path, macro=False)
+        return cls(df, meta["thresholds"], meta)
+
+    def status(self, company=None, quarter=None, start=None, end=None):
+        """Rows of one company (optionally within [start, end]) or of one quarter."""
+        if company is not None:
+            rows = self.index.company(company)
+            quarters = rows["quarter"].astype(str).to_numpy()
+            lo = 0 if start is None else np.searchsorted(quarters, start, side="left")
+            hi = len(quarters) if end is None else np.searchsorted(quarters, end, side="right")
+            rows = rows.iloc[lo:hi]
+        elif quarter is not None:
+            rows = self.index.quarter(quarter)
+        else:
+            raise ValueError("give a company or a quarter")
+        return with_alert_text(rows)[RESPONSE_COLS]
+
+    def _group_pairs(self, new_rows):
+        """(owner, position) pairs: stored rows in each new row's company and quarter partition.
+
+        The stored row with the same (company, quarter), if any, is left out
+        since the new row replaces it.
+        """
+        companies, quarters = new_rows["company"].to_numpy(), new_rows["quarter"].to_numpy()
+        same = self.index.cells(companies, quarters)
+        pairs = []
+        for owners, positions in (self.index.company_pairs(companies), self.index.quarter_pairs(quarters)):
+            keep = positions != same[owners]
+            pairs.append((owners[keep], positions[keep]))
+        return pairs
+
+    def _pct_against(self, values, owners, positions):
+        """Percentile of each new value within its stored partition plus itself (average ties)."""
+        n, k = values.shape
+        stored = self._raw[positions]
+        mine = values[owners]
+        with np.errstate(invalid="ignore"):
+            less, equal = stored < mine, stored == mine
+
+        def count(mask):
+            flat = (owners[:, None] * k + np.arange(k)).ravel()
+            return np.bincount(flat, weights=mask.ravel(), minlength=n * k).reshape(n, k)
+
+        # average rank among ties: the value itself plus the equal stored ones
+        pct = (count(less) + count(equal) / 2 + 1) / (count(~np.isnan(stored)) + 1)
+        pct[np.isnan(values)] = np.nan
+        return pct
+
+    def score_rows(self, rows):
+        """Scored and classified records for a list of row dicts, in input order.
+
+        Each row is scored as if it alone were merged into the store, so the
+        result does not depend on which other requests share its batch.
+        """
+        new_rows = parse_rows(rows)
+        values = new_rows[INDICATORS].to_numpy(dtype=np.float64)
+        (local_owners, local_pos), (global_owners, global_pos) = self._group_pairs(new_rows)
+        block = assemble_block(
+            self._pct_against(values, local_owners, local_pos),
+            self._pct_against(values, global_owners, global_pos),
+        )
+        scored = pd.concat([new_rows, scores_frame(block, new_rows.index)], axis=1)
+        labels = classify(scored, self.thresholds["local"], self.thresholds["global"])
+        return json.loads(records_json(pd.concat([scored, labels], axis=1)[RESPONSE_COLS]))
+
+
+def parse_rows(rows):
+    """Frame of request rows with float ratios; ValueError naming the first non-numeric field."""
+    frame = pd.DataFrame.from_records(rows).reindex(columns=ID_COLUMNS + NUMERIC_COLUMNS)
+    given = frame[NUMERIC_COLUMNS]
+    numeric = given.apply(lambda col: pd.to_numeric(col.where(col.map(np.isscalar)), errors="coerce"))
+    bad = numeric.isna().to_numpy() & given.notna().to_numpy()
+    if bad.any():
+        row, col = np.argwhere(bad)[0]
+        raise ValueError(f"row {row}: {NUMERIC_COLUMNS[col]} must be a number, got {given.iat[row, col]!r}")
+    frame[NUMERIC_COLUMNS] = numeric.astype(np.float64)
+    frame[["company", "quarter"]] = frame[["company", "quarter"]].astype(str)
+    return frame
+
+
+def records_json(frame):
+    """JSON array of `frame` rows; NaN becomes null."""
+    return frame.to_json(orient="records", force_ascii=False, double_precision=15)
+
+
+def create_app(service, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+    """aiohttp application serving `service` (a `ScoringService`)."""
+    from aiohttp import web
+
+    batcher = MicroBatcher(service.score_rows, max_batch=max_batch, max_delay=max_delay)
+
+    def rows_response(body):
+        return web.Response(text=body, content_type="application/json")
+
+    async def health(request):
+        return web.json_response({"version": service.meta.get("version"), "rows": len(service.index)})
+
+    async def status(request):
+        q = request.query
+        try:
+            rows = service.status(company=q.get("company"), quarter=q.get("quarter"), start=q.get("start"), end=q.get("end"))
+        except KeyError as exc:
+            raise web.HTTPNotFound(text=json.dumps({"error": f"unknown {exc.args[0]!r}"}), content_type="application/json")
+        except ValueError as exc:
+            raise web.HTTPBadRequest(text=json.dumps({"error": str(exc)}), content_type="application/json")
+        return rows_response('{"rows": ' + records_json(rows) + "}")
+
+    async def score(request):
+        try:
+            payload = await request.json()
+            rows = payload["rows"]
+            if not isinstance(rows, list) or not all(isinstance(r, dict) and "company" in r and "quarter" in r for r in rows):
+                raise ValueError("rows must be a list of objects with company and quarter")
+            if not rows:
+                return web.json_response({"rows": []})
+            # coerced here so a bad row never reaches a shared batch
+            rows = parse_rows(rows).to_dict("records")
+        except (ValueError, KeyError, TypeError) as exc:
+            raise web.HTTPBadRequest(text=json.dumps({"error": f"bad request body: {exc}"}), content_type="application/json")
+        return web.json_response({"rows": await batcher.submit(rows)})
+
+    async def on_cleanup(app):
+        await batcher.close()
+
+    app = web.Application()
+    app.add_routes([web.get("/health", health), web.get("/status", status), web.post("/score", score)])
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve health scores over HTTP.")
+    parser.add_argument("store", help="materialized store (see health_scoring.store)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="rows scored per batched call")
+    parser.add_argument("--max-delay-ms", type=float, default=MAX_DELAY * 1000, help="wait for more requests")
+    args = parser.parse_args(argv)
+
+    try:
+        from aiohttp import web
+    except ImportError:
+        parser.error("the scoring API needs aiohttp (pip install aiohttp)")
+    app = create_app(ScoringService.from_store(args.store), args.max_batch, args.max_delay_ms / 1000)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
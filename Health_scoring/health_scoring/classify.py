@@ -0,0 +1,213 @@
+"""Status and alert classification for scored rows.
+
+Vectorized replacement for the `get_local_alerts` / `get_global_alerts` /
+`get_local_status` / `get_global_status` row functions of the Streamlit pages.
+Alerts are first computed as a small integer bitmask per row and only the
+distinct masks are rendered to text, so the output is a categorical column.
+The score store keeps the bitmasks (`FLAG_COLS`) and `with_alert_text` renders
+them for the rows a page actually displays.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .scoring import SCORES
+
+
+# quantiles used for the dynamic low/high cut points of every score
+THRESHOLD_QUANTILES = (0.1, 0.9)
+# fixed threshold for revenue growth
+REVENUE_THRESHOLDS = {"drop": -0.1, "boost": 0.1}
+
+STATUS_LABELS = [
+    "Insufficient Data",
+    "Leveraged Risk",
+    "Excellent Health",
+    "Critical Risk",
+    "Danger",
+    "Strong",
+    "Good signal",
+    "Mixed Risk",
+    "Caution",
+    "Stable",
+    "Watch",
+]
+
+# columns added by `classify`
+ALERT_COLS = ["Local Alert Summary", "Global Alert Summary"]
+STATUS_COLS = ["Local Status", "Global Status"]
+LABEL_COLS = ALERT_COLS + STATUS_COLS
+# unrendered alert bitmasks, as stored (`classify(..., render=False)`)
+FLAG_COLS = ["local_alert_flags", "global_alert_flags"]
+
+# alert bitmask layout: two bits per score (high, low) then revenue (up, down)
+REV_UP = 1 << (2 * len(SCORES))
+REV_DOWN = REV_UP << 1
+
+
+def high_bit(i):
+    return 1 << (2 * i)
+
+
+def low_bit(i):
+    return 1 << (2 * i + 1)
+
+
+def score_columns(scope):
+    return [f"score_{s}_{scope}" for s in SCORES]
+
+
+def compute_thresholds(df, scope="local", quantiles=THRESHOLD_QUANTILES):
+    """Low/high cut points per score, keyed like the pages' `thresholds_dynamic`."""
+    low_q, high_q = quantiles
+    cols = score_columns(scope)
+    bounds = df[cols].quantile([low_q, high_q])
+    thresholds = {
+        col.replace(f"_{scope}", ""): {"low": bounds.at[low_q, col], "high": bounds.at[high_q, col]}
+        for col in cols
+    }
+    if scope == "local":
+        thresholds["revenue_growth"] = dict(REVENUE_THRESHOLDS)
+    return thresholds
+
+
+def _bounds(thresholds):
+    low = np.array([thresholds[f"score_{s}"]["low"] for s in SCORES], dtype=np.float64)
+    high = np.array([thresholds[f"score_{s}"]["high"] for s in SCORES], dtype=np.float64)
+    return low, high
+
+
+def _signals(df, thresholds, scope):
+    values = df[score_columns(scope)].to_numpy(dtype=np.float64)
+    low, high = _bounds(thresholds)
+    with np.errstate(invalid="ignore"):
+        is_high = values > high
+        is_low = values < low
+    return values, is_high, is_low
+
+
+def _revenue(df):
+    if "revenue_growth" not in df.columns:
+        return np.full(len(df), np.nan)
+    return df["revenue_growth"].to_numpy(dtype=np.float64)
+
+
+def alert_flags(df, thresholds, scope="local"):
+    """uint16 alert bitmask per row (see `high_bit`, `low_bit`, REV_UP, REV_DOWN)."""
+    _, is_high, is_low = _signals(df, thresholds, scope)
+    # "high" wins over "low" for the same score, as in the original elif chain
+    is_low &= ~is_high
+    bits = np.arange(len(SCORES))
+    flags = (is_high * (1 << (2 * bits))).sum(axis=1) + (is_low * (1 << (2 * bits + 1))).sum(axis=1)
+    if scope == "local":
+        rev_thresholds = thresholds.get("revenue_growth", REVENUE_THRESHOLDS)
+        rev = _revenue(df)
+        with np.errstate(invalid="ignore"):
+            up = rev > rev_thresholds["boost"]
+            down = (rev < rev_thresholds["drop"]) & ~up
+        flags = flags + up * REV_UP + down * REV_DOWN
+    return flags.astype(np.uint16)
+
+
+def alert_text(flags, scope="local"):
+    """Text of a single alert bitmask, e.g. "↓ Liquidity, Rev ↑"."""
+    up, down = ("↑ {}", "↓ {}") if scope == "local" else ("High {}", "Low {}")
+    parts = []
+    for i, s in enumerate(SCORES):
+        if flags & high_bit(i):
+            parts.append(up.format(s.title()))
+        elif flags & low_bit(i):
+            parts.append(down.format(s.title()))
+    if flags & REV_UP:
+        parts.append("Rev ↑")
+    elif flags & REV_DOWN:
+        parts.append("Rev ↓")
+    return ", ".join(parts)
+
+
+def render_alerts(flags, scope="local", index=None):
+    """Categorical alert strings for an array of bitmasks (one render per distinct mask)."""
+    uniques, codes = np.unique(np.asarray(flags), return_inverse=True)
+    categories = pd.Index([alert_text(int(u), scope) for u in uniques])
+    # distinct masks always render to distinct strings
+    return pd.Series(pd.Categorical.from_codes(codes.ravel(), categories), index=index)
+
+
+def with_alert_text(df):
+    """`df` with the alert summary columns rendered from its `FLAG_COLS` bitmasks."""
+    rendered = {
+        text_col: render_alerts(df[flag_col].to_numpy(), scope, index=df.index)
+        for text_col, flag_col, scope in zip(ALERT_COLS, FLAG_COLS, ("local", "global"))
+        if flag_col in df.columns
+    }
+    return df.assign(**rendered)
+
+
+def local_alerts(df, thresholds):
+    return render_alerts(alert_flags(df, thresholds, "local"), "local", index=df.index)
+
+
+def global_alerts(df, thresholds):
+    return render_alerts(alert_flags(df, thresholds, "global"), "global", index=df.index)
+
+
+def _status(df, thresholds, scope):
+    values, is_high, is_low = _signals(df, thresholds, scope)
+    low, high = _bounds(thresholds)
+    present = ~np.isnan(values)
+    red = is_low.sum(axis=1)
+    green = (is_high & ~is_low).sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        out_of_range = present & ~((values >= low) & (values <= high))
+
+    conditions = [present.sum(axis=1) < 3]
+    choices = ["Insufficient Data"]
+    if scope == "local":
+        lev = SCORES.index("leverage_adjusted")
+        rev = _revenue(df)
+        with np.errstate(invalid="ignore"):
+            excellent = is_high[:, lev] & (red == 0) & (rev > thresholds["revenue_growth"]["boost"])
+        conditions += [is_low[:, lev], excellent]
+        choices += ["Leveraged Risk", "Excellent Health"]
+    conditions += [
+        red >= 3,
+        red == 2,
+        (green >= 2) & (red == 0),
+        (green > 0) & (red == 0),
+        (red == green) & (red > 0),
+        (red == 1) & (green == 0),
+        ~out_of_range.any(axis=1),
+    ]
+    choices += ["Critical Risk", "Danger", "Strong", "Good signal", "Mixed Risk", "Caution", "Stable"]
+
+    codes = np.select(conditions, [STATUS_LABELS.index(c) for c in choices], STATUS_LABELS.index("Watch"))
+    return pd.Series(pd.Categorical.from_codes(codes, STATUS_LABELS), index=df.index)
+
+
+def local_status(df, thresholds):
+    return _status(df, thresholds, "local")
+
+
+def global_status(df, thresholds):
+    return _status(df, thresholds, "global")
+
+
+def classify(df, thresholds_local=None, thresholds_global=None, render=True):
+    """The four page columns (alerts and status, local and global) for `df`.
+
+    With `render=False` the alerts are returned as uint16 bitmasks under
+    `FLAG_COLS` instead of text.
+    """
+    if thresholds_local is None:
+        thresholds_local = compute_thresholds(df, "local")
+    if thresholds_global is None:
+        thresholds_global = compute_thresholds(df, "global")
+    if render:
+        alerts = dict(zip(ALERT_COLS, [local_alerts(df, thresholds_local), global_alerts(df, thresholds_global)]))
+    else:
+        alerts = {
+            FLAG_COLS[0]: pd.Series(alert_flags(df, thresholds_local, "local"), index=df.index),
+            FLAG_COLS[1]: pd.Series(alert_flags(df, thresholds_global, "global"), index=df.index),
+        }
+    statuses = dict(zip(STATUS_COLS, [local_status(df, thresholds_local), global_status(df, thresholds_global)]))
+    return pd.DataFrame({**alerts, **statuses}, index=df.index)
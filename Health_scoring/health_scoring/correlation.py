@@ -0,0 +1,207 @@
+"""Batched Pearson / Spearman correlations of the source ratios.
+
+Replaces `correlation_matrix.ipynb` (one pooled `df.corr()` and a heatmap
+screenshot). Every (segment, column pair) becomes one group of a long array
+holding the rows where both columns are present, so pooled, per-company and
+per-quarter-window matrices are all computed in one grouped pass with
+pairwise-complete missing-value handling, like `DataFrame.corr`. Spearman
+ranks every pairwise sample from one sort per column.
+
+    corr = correlate(df, method="spearman", by="company")
+    matrix = to_matrix(correlate(df))            # pooled, k x k
+    trend = rolling_correlate(df, window=8)      # per company, trailing 8 quarters
+"""
+
+import numpy as np
+import pandas as pd
+
+from .loader import NUMERIC_COLUMNS
+from .scoring import quarter_ordinal
+
+
+METHODS = ["pearson", "spearman"]
+
+
+def _pairs(k, diagonal=True):
+    return np.triu_indices(k, 0 if diagonal else 1)
+
+
+def _long_pairs(X, segments, left, right):
+    """(rows, pairs, group) for every row and pair with both values present; group = segment * pairs + pair."""
+    both = ~np.isnan(X[:, left]) & ~np.isnan(X[:, right]) & (segments >= 0)[:, None]
+    rows, pair = np.nonzero(both)
+    return rows, pair, segments[rows] * len(left) + pair
+
+
+def _pair_ranks(X, segments, rows, left, right):
+    """Spearman ranks of the long pairwise samples `(rows, left, right)`, as two arrays.
+
+    The first holds the (average-tie) rank of the `left` column value among
+    the rows of its segment where both columns are present, the second the
+    same for `right`. Each column is sorted once per segment; the ranks for
+    every partner column then follow from cumulative counts of the partner's
+    presence along that order, so no per-pair sort is needed. Only one
+    column's (rows, k) counts are held at a time.
+    """
+    n, k = X.shape
+    present = ~np.isnan(X)
+    ranks = np.full((2, len(rows)), np.nan)
+    position = np.empty(n, dtype=np.int64)
+    for c in range(k):
+        order = np.flatnonzero(present[:, c] & (segments >= 0))
+        order = order[np.lexsort((X[order, c], segments[order]))]
+        seg, values = segments[order], X[order, c]
+        new_segment = np.r_[True, seg[1:] != seg[:-1]]
+        new_block = new_segment | np.r_[True, values[1:] != values[:-1]]
+        positions = np.arange(len(order))
+        segment_start = np.maximum.accumulate(np.where(new_segment, positions, 0))
+        block_start = np.maximum.accumulate(np.where(new_block, positions, 0))
+        block_end = np.r_[np.flatnonzero(new_block)[1:], len(order)][np.cumsum(new_block) - 1]
+
+        counts = np.vstack([np.zeros((1, k)), np.cumsum(present[order], axis=0)])
+        before = counts[block_start] - counts[segment_start]
+        tied = counts[block_end] - counts[block_start]
+        position[order] = positions
+        for side, (column, partner) in enumerate(((left, right), (right, left))):
+            at = np.flatnonzero(column == c)
+            p, d = position[rows[at]], partner[at]
+            ranks[side, at] = before[p, d] + (tied[p, d] + 1) / 2
+    return ranks[0], ranks[1]
+
+
+def grouped_pearson(x, y, groups, n_groups, min_periods=2):
+    """(correlation, count) per group id of paired samples; NaN below `min_periods` or for constant data."""
+    count = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = x - (np.bincount(groups, weights=x, minlength=n_groups) / count)[groups]
+        dy = y - (np.bincount(groups, weights=y, minlength=n_groups) / count)[groups]
+        sxy = np.bincount(groups, weights=dx * dy, minlength=n_groups)
+        sxx = np.bincount(groups, weights=dx * dx, minlength=n_groups)
+        syy = np.bincount(groups, weights=dy * dy, minlength=n_groups)
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        # constant samples leave only rounding noise in the centred sums
+        flat_x = sxx <= 1e-12 * np.bincount(groups, weights=x * x, minlength=n_groups)
+        flat_y = syy <= 1e-12 * np.bincount(groups, weights=y * y, minlength=n_groups)
+    r[(count < max(min_periods, 1)) | flat_x | flat_y] = np.nan
+    return r, count.astype(np.int64)
+
+
+def _segments(df, by=None, window=None):
+    """Segment code per row and a frame of segment labels (one row per code)."""
+    keys = {}
+    if by is not None:
+        keys[by] = df[by].to_numpy()
+    if window is not None:
+        ordinal = quarter_ordinal(df["quarter"])
+        start = np.where(ordinal >= 0, ordinal // window * window, -1)
+        keys["window_start"] = np.where(start >= 0, start, -1)
+    if not keys:
+        return np.zeros(len(df), dtype=np.int64), pd.DataFrame(index=[0])
+    frame = pd.DataFrame(keys)
+    valid = frame.notna().all(axis=1).to_numpy()
+    if "window_start" in frame:
+        valid &= frame["window_start"].to_numpy() >= 0
+    codes = np.full(len(df), -1, dtype=np.int64)
+    labels = frame[valid].drop_duplicates().sort_values(list(keys)).reset_index(drop=True)
+    if len(labels):
+        lookup = pd.MultiIndex.from_frame(labels)
+        codes[valid] = lookup.get_indexer(pd.MultiIndex.from_frame(frame[valid]))
+    if "window_start" in labels:
+        start = labels.pop("window_start").to_numpy()
+        labels["window_start"] = [f"{s // 4}-Q{s % 4 + 1}" for s in start]
+        labels["window_end"] = [f"{e // 4}-Q{e % 4 + 1}" for e in start + window - 1]
+    return codes, labels
+
+
+def correlate(df, columns=None, method="pearson", by=None, window=None, min_periods=2):
+    """Correlation of every column pair, pooled or per segment, as a long frame.
+
+    `by` names a grouping column (e.g. "company"); `window` splits quarters
+    into consecutive blocks of that many quarters. Both can be combined. The
+    result has the segment columns, then `x`, `y` (x <= y in `columns` order,
+    diagonal included), `corr` and `n` (rows with both values present).
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    columns = list(columns or [c for c in NUMERIC_COLUMNS if c in df.columns])
+    X = df[columns].to_numpy(dtype=np.float64)
+    segments, labels = _segments(df, by=by, window=window)
+    left, right = _pairs(len(columns))
+    rows, pair, groups = _long_pairs(X, segments, left, right)
+    if method == "spearman":
+        x, y = _pair_ranks(X, segments, rows, left[pair], right[pair])
+    else:
+        x, y = X[rows, left[pair]], X[rows, right[pair]]
+
+    n_pairs = len(left)
+    r, n = grouped_pearson(x, y, groups, len(labels) * n_pairs, min_periods)
+    out = labels.loc[labels.index.repeat(n_pairs)].reset_index(drop=True)
+    names = np.array(columns, dtype=object)
+    out["x"] = np.tile(names[left], len(labels))
+    out["y"] = np.tile(names[right], len(labels))
+    out["corr"] = r
+    out["n"] = n
+    return out
+
+
+def to_matrix(corr):
+    """Square symmetric matrix from a single-segment `correlate` result."""
+    columns = list(dict.fromkeys(list(corr["x"]) + list(corr["y"])))
+    matrix = corr.pivot(index="x", columns="y", values="corr").reindex(index=columns, columns=columns)
+    return matrix.combine_first(matrix.T).rename_axis(index=None, columns=None)
+
+
+def rolling_correlate(df, columns=None, window=8, by="company", min_periods=4):
+    """Pearson correlation of every column pair over each company's trailing `window` quarters.
+
+    One row per (company, quarter, pair) with x < y. Windows are measured in
+    calendar quarters like `scoring.rolling_pct_rank`; sums come from
+    per-pair cumulative sums, so the cost is O(rows * pairs).
+    """
+    columns = list(columns or [c for c in NUMERIC_COLUMNS if c in df.columns])
+    codes, _ = pd.factorize(df[by], sort=True)
+    times = quarter_ordinal(df["quarter"])
+    order = np.lexsort((times, codes))
+    codes, times = codes[order].astype(np.int64), times[order]
+    X = df[columns].to_numpy(dtype=np.float64)[order]
+    left, right = _pairs(len(columns), diagonal=False)
+
+    # company-centred values keep the running sums well conditioned
+    counts = np.bincount(codes[codes >= 0], minlength=codes.max() + 1 if len(codes) else 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.vstack([
+            np.bincount(codes, weights=np.nan_to_num(X[:, c]), minlength=len(counts))
+            / np.bincount(codes, weights=~np.isnan(X[:, c]), minlength=len(counts))
+            for c in range(len(columns))
+        ]).T if len(counts) else np.zeros((0, len(columns)))
+    X = X - np.nan_to_num(means)[codes]
+
+    both = ~np.isnan(X[:, left]) & ~np.isnan(X[:, right])
+    xs = np.where(both, X[:, left], 0.0)
+    ys = np.where(both, X[:, right], 0.0)
+    terms = [both.astype(np.float64), xs, ys, xs * xs, ys * ys, xs * ys]
+    cums = [np.vstack([np.zeros((1, len(left))), np.cumsum(t, axis=0)]) for t in terms]
+
+    key = codes * (times.max() + window + 1 if len(times) else 1) + times
+    start = np.searchsorted(key, key - window + 1, side="left")
+    stop = np.arange(len(key)) + 1
+    n, sx, sy, sxx, syy, sxy = (c[stop] - c[start] for c in cums)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        r = np.clip(cov / np.sqrt(vx * vy), -1.0, 1.0)
+    tol = 1e-12 * np.maximum(sxx, syy)
+    r[(n < min_periods) | (vx <= tol) | (vy <= tol)] = np.nan
+    r[(codes < 0) | (times < 0)] = np.nan
+
+    names = np.array(columns, dtype=object)
+    rows = np.repeat(order, len(left))
+    return pd.DataFrame({
+        by: df[by].to_numpy()[rows],
+        "quarter": df["quarter"].to_numpy()[rows],
+        "x": np.tile(names[left], len(order)),
+        "y": np.tile(names[right], len(order)),
+        "corr": r.ravel(),
+        "n": n.ravel().astype(np.int64),
+    })
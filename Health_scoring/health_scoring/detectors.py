@@ -0,0 +1,121 @@
+"""Lightweight anomaly detector backends.
+
+Every detector scores the feature groups of `anomaly.GROUPS` on the
+per-company standardized matrix built by `anomaly.prepare` and returns one
+error array per group, so all backends feed the same `df_group_errors`
+output. Higher error means more anomalous.
+
+- `PCADetector`: NumPy-only PCA reconstruction error, fitted on all companies.
+- `IsolationForestDetector`: scikit-learn IsolationForest per group.
+- `anomaly.BatchedAutoencoder`: the Keras model (needs TensorFlow).
+"""
+
+import os
+import pickle
+
+import numpy as np
+
+
+def group_features(groups):
+    return list(dict.fromkeys(col for cols in groups.values() for col in cols))
+
+
+class Detector:
+    """Base class: subclasses implement `_fit_group` and `_score_group`."""
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.features = group_features(groups)
+        self.models = {}
+
+    def _slices(self):
+        return {g: [self.features.index(c) for c in cols] for g, cols in self.groups.items()}
+
+    def fit(self, X, codes, n_companies=None):
+        self.models = {g: self._fit_group(X[:, idx], codes) for g, idx in self._slices().items()}
+        return self
+
+    def reconstruction_errors(self, X, codes):
+        return {g: self._score_group(self.models[g], X[:, idx], codes) for g, idx in self._slices().items()}
+
+    def save_state(self, directory):
+        """Write the fitted per-group models into `directory`."""
+        with open(os.path.join(directory, "models.pkl"), "wb") as f:
+            pickle.dump(self.models, f)
+
+    def load_state(self, directory, n_companies):
+        with open(os.path.join(directory, "models.pkl"), "rb") as f:
+            self.models = pickle.load(f)
+        return self
+
+    def _fit_group(self, X, codes):
+        raise NotImplementedError
+
+    def _score_group(self, model, X, codes):
+        raise NotImplementedError
+
+
+class PCADetector(Detector):
+    """Mean squared residual after projecting each group on its top principal components.
+
+    Groups keep `min(encoding_dim, width - 1)` components, mirroring the
+    autoencoder bottleneck; single-feature groups therefore score the squared
+    distance from the (company-standardized) mean.
+    """
+
+    def __init__(self, groups, encoding_dim=2):
+        super().__init__(groups)
+        self.encoding_dim = encoding_dim
+
+    def _fit_group(self, X, codes):
+        X = X.astype(np.float64)
+        mean = X.mean(axis=0)
+        n_components = min(self.encoding_dim, X.shape[1] - 1)
+        if n_components <= 0:
+            return mean, np.zeros((0, X.shape[1]))
+        _, _, vt = np.linalg.svd(X - mean, full_matrices=False)
+        return mean, vt[:n_components]
+
+    def _score_group(self, model, X, codes):
+        mean, components = model
+        centered = X.astype(np.float64) - mean
+        residual = centered - (centered @ components.T) @ components
+        return np.mean(np.square(residual), axis=1)
+
+    def save_state(self, directory):
+        arrays = {}
+        for i, group in enumerate(self.groups):
+            arrays[f"mean_{i}"], arrays[f"components_{i}"] = self.models[group]
+        np.savez(os.path.join(directory, "pca.npz"), **arrays)
+
+    def load_state(self, directory, n_companies):
+        with np.load(os.path.join(directory, "pca.npz")) as arrays:
+            self.models = {
+                group: (arrays[f"mean_{i}"], arrays[f"components_{i}"]) for i, group in enumerate(self.groups)
+            }
+        return self
+
+
+class IsolationForestDetector(Detector):
+    """Negated IsolationForest score per group (higher = more isolated)."""
+
+    def __init__(self, groups, n_estimators=100, max_samples="auto", seed=0, n_jobs=None):
+        super().__init__(groups)
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.seed = seed
+        self.n_jobs = n_jobs
+
+    def _fit_group(self, X, codes):
+        from sklearn.ensemble import IsolationForest
+
+        forest = IsolationForest(
+            n_estimators=self.n_estimators,
+            max_samples=self.max_samples,
+            random_state=self.seed,
+            n_jobs=self.n_jobs,
+        )
+        return forest.fit(X)
+
+    def _score_group(self, model, X, codes):
+        return -model.score_samples(X)
@@ -0,0 +1,190 @@
+"""Dated events and their attribution to anomalous quarters.
+
+Replaces the hardcoded `df_events_jpm` / `jpm_events` lists of
+`Ml_learning_anomalies.ipynb` and its row-by-row `classify_event` /
+`classify_origin`. An event file has one row per event:
+
+    date;company;country;event;target;macro
+    2020-03-31;JP Morgan Chase;USA;Crise Covid-19;rentabilité/liquidité/croissance;true
+
+`company` scopes an event to one company; with an empty company, `country`
+scopes it to every company of that country, and with both empty it applies
+to all companies. `target` lists the anomaly groups (`anomaly.GROUPS`) the
+event can explain, `/`-separated (empty: all groups); `macro` marks external
+events.
+
+`EventStore` keeps the events sorted by (scope, time) in integer arrays; the
+events near a batch of rows are found with `searchsorted` on those keys, so
+attribution is a few array operations whatever the number of companies and
+events. `attribute` keeps the nearest matching event per (row, group), like
+`merge_asof(direction="nearest")`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .anomaly import GROUPS
+
+
+EVENT_COLUMNS = ["date", "company", "country", "event", "target", "macro"]
+TARGET_SEPARATOR = "/"
+READ_OPTIONS = {"sep": ";", "encoding": "utf-8-sig"}
+# notebook labels of `event_type` and `origine`
+EVENT_TYPES = {"none": "aucun", "external": "externe", "internal": "interne"}
+ORIGINS = {"explained": "expliqué", "unexplained": "interne non identifié"}
+
+
+def _quarter_ordinal(dates):
+    dates = pd.DatetimeIndex(dates)
+    return (dates.year * 4 + dates.quarter - 1).to_numpy(dtype=np.int64)
+
+
+def _day_number(dates):
+    return pd.DatetimeIndex(dates).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def _time_axis(dates, window):
+    """(time values, low offset, high offset) of a window on the matching time axis."""
+    if window == "quarter":
+        # same calendar quarter, as the notebook's to_period("Q") merge
+        return _quarter_ordinal(dates), 0, 0
+    if isinstance(window, (int, np.integer)):
+        return _day_number(dates), -int(window), int(window)
+    before, after = window
+    return _day_number(dates), -int(before), int(after)
+
+
+def _expand(lo, hi):
+    """(owner, position) pairs for the ranges [lo[i], hi[i])."""
+    counts = np.maximum(hi - lo, 0)
+    owners = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, np.repeat(lo, counts) + offsets
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in {"true", "1", "yes", "oui", "x"}
+    return bool(value) if pd.notna(value) else False
+
+
+class EventStore:
+    """Events sorted by date, with a per-scope sorted index for range lookups."""
+
+    def __init__(self, events, groups=GROUPS):
+        frame = pd.DataFrame(events).reindex(columns=EVENT_COLUMNS)
+        frame["date"] = pd.to_datetime(frame["date"])
+        for col in ["company", "country", "event", "target"]:
+            frame[col] = frame[col].fillna("").astype(str).str.strip()
+        frame["macro"] = frame["macro"].map(_as_bool).fillna(False).astype(bool)
+        self.frame = frame.sort_values("date", kind="stable").reset_index(drop=True)
+        self.groups = list(groups)
+
+        targets = self.frame["target"].str.split(TARGET_SEPARATOR)
+        unknown = {t.strip() for ts in targets for t in ts if t.strip()} - set(self.groups)
+        if unknown:
+            raise ValueError(f"unknown event targets {sorted(unknown)}, expected some of {self.groups}")
+        bits = np.zeros(len(self.frame), dtype=np.int64)
+        for j, group in enumerate(self.groups):
+            bits |= targets.map(lambda ts, g=group: g in [t.strip() for t in ts]).to_numpy(dtype=bool) << j
+        # no target: the event can explain any group
+        self._targets = np.where(bits == 0, (1 << len(self.groups)) - 1, bits)
+
+        company, country = self.frame["company"].to_numpy(), self.frame["country"].to_numpy()
+        self._scope = np.where(company != "", 0, np.where(country != "", 1, 2))
+        self._scope_key = np.where(company != "", company, country)
+
+    @classmethod
+    def read_csv(cls, path, groups=GROUPS):
+        return cls(pd.read_csv(path, **READ_OPTIONS, dtype={"company": str, "country": str, "target": str}), groups)
+
+    def to_csv(self, path):
+        self.frame.assign(date=self.frame["date"].dt.strftime("%Y-%m-%d")).to_csv(path, index=False, **READ_OPTIONS)
+        return path
+
+    def __len__(self):
+        return len(self.frame)
+
+    def candidates(self, companies, countries, dates, window="quarter"):
+        """(row, event, distance) arrays of every event whose scope and window cover a row.
+
+        Distance is in the window's time unit (quarters for "quarter", else
+        days), event minus row.
+        """
+        companies = np.asarray(companies, dtype=object).astype(str)
+        countries = np.asarray(countries, dtype=object).astype(str)
+        row_time, lo_offset, hi_offset = _time_axis(dates, window)
+        event_time = _time_axis(self.frame["date"], window)[0]
+
+        rows, events = [], []
+        if len(self) and len(row_time):
+            # (scope key, time) packed into one sorted integer per event
+            base = min(event_time.min(), row_time.min()) + lo_offset - 1
+            span = max(event_time.max(), row_time.max()) + hi_offset + 1 - base + 1
+        for scope, row_keys in enumerate([companies, countries, np.full(len(companies), "")]):
+            picked = np.flatnonzero(self._scope == scope)
+            if not len(picked) or not len(row_time):
+                continue
+            keys, key_codes = np.unique(self._scope_key[picked], return_inverse=True)
+            event_key = key_codes * span + (event_time[picked] - base)
+            order = np.argsort(event_key, kind="stable")
+            event_key, picked = event_key[order], picked[order]
+
+            row_codes = pd.Index(keys).get_indexer(row_keys)
+            known = np.flatnonzero(row_codes >= 0)
+            row_key = row_codes[known] * span + (row_time[known] - base)
+            lo = np.searchsorted(event_key, row_key + lo_offset, side="left")
+            hi = np.searchsorted(event_key, row_key + hi_offset, side="right")
+            owner, position = _expand(lo, hi)
+            rows.append(known[owner])
+            events.append(picked[position])
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        events = np.concatenate(events) if events else np.empty(0, dtype=np.int64)
+        return rows, events, event_time[events] - row_time[rows]
+
+    def attribute(self, errors, window="quarter", by="company", countries=None):
+        """Long frame of (row, group) with the nearest matching event, as the notebook's `df_merged`.
+
+        `errors` is an `anomaly.error_frame` (date, company, one error and one
+        `is_anomaly_<group>` column per group). Country-scoped events need a
+        `country` column on `errors` or a `countries` {company: country} map.
+        Adds `event`, `event_date`, `macro`, `event_type` (aucun / externe /
+        interne) and `origine` (expliqué / interne non identifié).
+        """
+        groups = [g for g in self.groups if g in errors.columns]
+        if "country" in errors.columns:
+            row_countries = errors["country"].astype(str).to_numpy()
+        else:
+            row_countries = errors[by].map(countries or {}).fillna("").astype(str).to_numpy()
+        rows, events, distance = self.candidates(errors[by].to_numpy(), row_countries, errors["date"], window)
+
+        # (row, group) cells each candidate event can explain
+        bits = np.array([1 << self.groups.index(g) for g in groups], dtype=np.int64)
+        pair, group = np.nonzero((self._targets[events][:, None] & bits[None, :]) != 0)
+        cell = rows[pair] * len(groups) + group
+        # nearest event first, earlier event on ties
+        order = np.lexsort((distance[pair], np.abs(distance[pair]), cell))
+        first = order[np.r_[True, cell[order][1:] != cell[order][:-1]]] if len(order) else order
+        nearest = np.full(len(errors) * len(groups), -1, dtype=np.int64)
+        nearest[cell[first]] = events[pair[first]]
+
+        n = len(errors)
+        out = pd.DataFrame({
+            "date": np.tile(errors["date"].to_numpy(), len(groups)),
+            by: np.tile(errors[by].to_numpy(), len(groups)),
+            "error_type": np.repeat(groups, n),
+            "reconstruction_error": np.concatenate([errors[g].to_numpy() for g in groups]) if groups else [],
+            "is_anomaly": np.concatenate([errors[f"is_anomaly_{g}"].to_numpy() for g in groups]) if groups else [],
+        })
+        # cells are numbered row-major (row, group); the frame is group-major
+        hit = nearest.reshape(n, len(groups)).T.ravel()
+        found = hit >= 0
+        # label -1 is no event: an all-missing row, also when the store is empty
+        picked = self.frame.reindex(hit).reset_index(drop=True)
+        out["event"] = picked["event"].astype(object)
+        out["event_date"] = picked["date"]
+        out["macro"] = picked["macro"].astype("boolean")
+        macro = out["macro"].fillna(False).to_numpy(dtype=bool)
+        out["event_type"] = np.where(found, np.where(macro, EVENT_TYPES["external"], EVENT_TYPES["internal"]), EVENT_TYPES["none"])
+        out["origine"] = np.where(found, ORIGINS["explained"], ORIGINS["unexplained"])
+        return out
@@ -0,0 +1,144 @@
+"""Precomputed long-format chart data for the Score Explorer page.
+
+`prepare_plot_data` / `prepare_macro_data` used to filter, reindex, fill,
+rescale and melt the frame once per selected company on every rerun. The
+`ExplorerCube` does those transforms once for every company and indicator on
+a dense (company x quarter x indicator) grid, stores the long frame sorted by
+(company, indicator, quarter) and serves selections as contiguous slices,
+aggregating quarters when a selection exceeds the chart's point budget.
+Macro series are rescaled per (country, quarter) in a `MacroTable` rather
+than per company.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .gaps import fill_grid
+from .macro import MacroTable
+
+
+SCORE_OPTIONS = {
+    "Profitability (Local)": "score_profitability_local",
+    "Profitability (Global)": "score_profitability_global",
+    "Liquidity (Local)": "score_liquidity_local",
+    "Liquidity (Global)": "score_liquidity_global",
+    "Solvency (Local)": "score_solvency_local",
+    "Solvency (Global)": "score_solvency_global",
+    "Leverage (Local)": "score_leverage_adjusted_local",
+    "Leverage (Global)": "score_leverage_adjusted_global",
+    "Revenue Growth": "revenue_growth",
+}
+
+MACRO_OPTIONS = {
+    "Inflation (YoY)": "inflation_YoY",
+    "GDP Growth Rate": "gdp_growth_rate",
+    "Interest Rate": "interest_rate",
+}
+
+# default cap on points sent to the chart
+POINT_BUDGET = 5000
+
+
+def _dense_grid(df, columns, company_codes, quarter_codes, shape):
+    grid = np.full(shape + (len(columns),), np.nan)
+    grid[company_codes, quarter_codes] = df[columns].to_numpy(dtype=np.float64)
+    return grid
+
+
+class ExplorerCube:
+    """Long chart frame (quarter, Company, Score, Value, LineType) for all companies.
+
+    Macro lines come from `macro` (a `MacroTable`), or from the macro columns
+    of `df` when it is not given.
+    """
+
+    def __init__(self, df, macro=None):
+        company_codes, self.companies = pd.factorize(df["company"], sort=True)
+        quarter_codes, self.quarters = pd.factorize(df["quarter"], sort=True)
+        shape = (len(self.companies), len(self.quarters))
+
+        score_labels = [label for label, col in SCORE_OPTIONS.items() if col in df.columns]
+        scores = _dense_grid(df, [SCORE_OPTIONS[lb] for lb in score_labels], company_codes, quarter_codes, shape)
+        scores = fill_grid(scores, "ffill")
+        if "Revenue Growth" in score_labels:
+            rev = score_labels.index("Revenue Growth")
+            with np.errstate(invalid="ignore"):
+                mean = np.nanmean(scores[:, :, rev], axis=1, keepdims=True) if shape[1] else 0.0
+            # centred on 0.5 so it shares the [0, 1] axis with the scores
+            scores[:, :, rev] = scores[:, :, rev] - mean + 0.5
+        present_scores = np.ones(scores.shape, dtype=bool)
+
+        if macro is None:
+            macro = MacroTable.from_frame(df)
+        macro_labels = [label for label, col in MACRO_OPTIONS.items() if col in macro.columns]
+        # scaled once per (country, quarter), then broadcast to the country's companies
+        country_of = df["country"].astype(str).groupby(company_codes).first().to_numpy()
+        by_country = macro.grid(macro.countries, self.quarters.astype(str), transform="clipped")
+        picked = [macro.columns.index(MACRO_OPTIONS[lb]) for lb in macro_labels]
+        macro = by_country[macro.countries.get_indexer(country_of)][:, :, picked]
+        # macro lines only cover the quarters a company actually reported
+        present_macro = np.zeros(macro.shape, dtype=bool)
+        present_macro[company_codes, quarter_codes] = True
+
+        labels = score_labels + macro_labels
+        values = np.concatenate([scores, macro], axis=2)
+        present = np.concatenate([present_scores, present_macro], axis=2)
+        line_type = np.array(["solid"] * len(score_labels) + ["dotted"] * len(macro_labels))
+
+        # (company, indicator, quarter) order makes every series one contiguous run
+        values = values.transpose(0, 2, 1)
+        present = present.transpose(0, 2, 1)
+        c, k, q = np.nonzero(present)
+        self.frame = pd.DataFrame({
+            "quarter": pd.Categorical.from_codes(q, self.quarters, ordered=True),
+            "Company": pd.Categorical.from_codes(c, self.companies),
+            "Score": pd.Categorical.from_codes(k, labels),
+            "Value": np.nan_to_num(values[c, k, q], nan=0.5).astype(np.float32),
+            "LineType": pd.Categorical(line_type[k], categories=["solid", "dotted"]),
+        })
+        self.labels = labels
+        counts = present.sum(axis=2).ravel()
+        stops = np.cumsum(counts)
+        self._offsets = np.stack([stops - counts, stops], axis=1).reshape(len(self.companies), len(labels), 2)
+
+    def select(self, companies, labels, max_points=POINT_BUDGET):
+        """Chart rows for the (company, indicator) pairs, at most `max_points` of them."""
+        company_idx = pd.Index(self.companies).get_indexer(companies)
+        label_idx = pd.Index(self.labels).get_indexer(labels)
+        spans = np.array([
+            self._offsets[c, k]
+            for c in company_idx[company_idx >= 0]
+            for k in label_idx[label_idx >= 0]
+        ]).reshape(-1, 2)
+        # empty series are skipped; when not even one point per series fits,
+        # only the first `max_points` series are kept
+        spans = spans[spans[:, 1] > spans[:, 0]][:max(max_points, 0)]
+        if not len(spans):
+            return self.frame.iloc[:0]
+        rows = np.concatenate([np.arange(start, stop) for start, stop in spans])
+        selection = self.frame.iloc[rows]
+        if len(selection) > max_points:
+            quarters = self.frame["quarter"].cat.codes.to_numpy()
+            bucket = bucket_size(quarters[spans[:, 0]], quarters[spans[:, 1] - 1], max_points // len(spans))
+            selection = downsample(selection, bucket)
+        return selection.reset_index(drop=True)
+
+
+def bucket_size(first, last, per_series):
+    """Smallest quarter bucket giving each series (quarters `first`..`last`) at most `per_series` points."""
+    first, last = np.asarray(first), np.asarray(last)
+    bucket = max(1, int(np.ceil((last - first + 1).max() / per_series)))
+    # buckets are aligned on quarter codes, so a series may straddle one more boundary
+    while (last // bucket - first // bucket + 1).max() > per_series:
+        bucket += 1
+    return bucket
+
+
+def downsample(selection, bucket):
+    """Average every `bucket` consecutive quarters of each series, labelled by the bucket's first quarter."""
+    quarter_pos = selection["quarter"].cat.codes.to_numpy() // bucket
+    grouped = selection.assign(bucket=quarter_pos).groupby(
+        ["Company", "Score", "LineType", "bucket"], observed=True, sort=False
+    )
+    out = grouped.agg(quarter=("quarter", "min"), Value=("Value", "mean")).reset_index()
+    return out[["quarter", "Company", "Score", "Value", "LineType"]]
@@ -0,0 +1,128 @@
+"""Headless batch export of the Financial view tables.
+
+Scores, classifies and lays out the whole dataset once, then writes one
+report per company (all quarters, latest first) and/or one per quarter (all
+companies), like the tables exported by hand from the Financial view.
+Never imports Streamlit.
+
+    python -m health_scoring.export app_streamlit/scores.v3.parquet exports/ --by company quarter
+    python -m health_scoring.export ../dataset_unified.csv exports/ --format parquet --workers 4
+    python -m health_scoring.export app_streamlit/scores.v3.parquet exports/ --by company --trends
+
+Reports land in `<output>/company/<name>.<ext>` and `<output>/quarter/<quarter>.<ext>`.
+"""
+
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from .features import render_trend_alerts, trend_alert_flags, trend_features
+from .index import ScoreIndex
+from .report import SCORE_VIEWS, report_frame
+from .store import build, load_store, read_csv_any
+
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+# reports handed to a worker at a time
+BATCH_SIZE = 64
+TREND_ALERTS_HEADER = "Trend Alerts"
+
+
+def safe_filename(name):
+    """File-system safe version of a company or quarter name."""
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("._") or "_"
+
+
+def load_scored(path, workers=1):
+    """Scored and classified frame from a score store or a (raw or scored) CSV."""
+    if path.endswith(".parquet"):
+        return load_store(path)[0]
+    return build(read_csv_any(path), workers=workers)[0]
+
+
+def write_report(frame, path, fmt="csv"):
+    if fmt == "csv":
+        frame.to_csv(path, index=False, encoding="utf-8-sig")
+    else:
+        frame.to_parquet(path, index=False)
+
+
+def _write_batch(batch):
+    for frame, path, fmt in batch:
+        write_report(frame, path, fmt)
+    return len(batch)
+
+
+def _report_table(index, view, key, trends):
+    table = report_frame(index.frame, view, key=key)
+    if trends:
+        flags = trend_alert_flags(trend_features(index.frame))
+        table[TREND_ALERTS_HEADER] = render_trend_alerts(flags, table.index)
+    return table
+
+
+def iter_reports(index, by, view="all", trends=False):
+    """(name, report) for every company or every quarter of a `ScoreIndex`.
+
+    With `trends`, reports get a "Trend Alerts" column (`features.trend_alert_flags`).
+    """
+    if by == "company":
+        table = _report_table(index, view, "quarter", trends)
+        for company in index.companies:
+            yield company, table.iloc[index.company_span(company)].iloc[::-1]
+    elif by == "quarter":
+        table = _report_table(index, view, "company", trends)
+        for quarter in index.quarters:
+            yield quarter, table.iloc[index.quarter_rows(quarter)]
+    else:
+        raise ValueError(f"cannot export by {by!r}, expected 'company' or 'quarter'")
+
+
+def export(df, output, by=("company", "quarter"), fmt="csv", view="all", workers=1, trends=False):
+    """Write every report of `df` under `output`; returns {by: number of files}."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {list(FORMATS)}")
+    index = ScoreIndex(df)
+    tasks = []
+    counts = {}
+    for key in by:
+        directory = os.path.join(output, key)
+        os.makedirs(directory, exist_ok=True)
+        reports = list(iter_reports(index, key, view, trends))
+        counts[key] = len(reports)
+        tasks += [
+            (frame.reset_index(drop=True), os.path.join(directory, safe_filename(name) + FORMATS[fmt]), fmt)
+            for name, frame in reports
+        ]
+
+    batches = [tasks[i:i + BATCH_SIZE] for i in range(0, len(tasks), BATCH_SIZE)]
+    if workers == 1:
+        for batch in batches:
+            _write_batch(batch)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_write_batch, batches))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Financial view reports without the dashboard.")
+    parser.add_argument("source", help="score store (.parquet), dataset_unified.csv or an already scored CSV")
+    parser.add_argument("output", help="directory for the reports")
+    parser.add_argument("--by", nargs="+", choices=["company", "quarter"], default=["company", "quarter"])
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--view", choices=SCORE_VIEWS, default="all", help="score columns to include")
+    parser.add_argument("--workers", type=int, default=1, help="writer processes (0 = one per CPU)")
+    parser.add_argument("--trends", action="store_true", help="add quarter-over-quarter trend alerts")
+    args = parser.parse_args(argv)
+
+    df = load_scored(args.source, workers=args.workers or None)
+    counts = export(df, args.output, by=args.by, fmt=args.format, view=args.view, workers=args.workers or None,
+                    trends=args.trends)
+    summary = ", ".join(f"{n} per-{key} reports" for key, n in counts.items())
+    print(f"wrote {summary} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
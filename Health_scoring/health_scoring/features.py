@@ -0,0 +1,132 @@
+"""Trend and momentum features of the composite scores, plus trend alerts.
+
+`score_global_local.ipynb` ran one `groupby("company")[col].diff()` per
+score after a full sort. `trend_features` sorts once and derives every
+feature of all eight scores from the same (rows, scores) array: the previous
+rows of a company are found by shifting the sorted array, and rolling
+statistics are summed over the stacked lags of each window.
+
+Steps are rows of the company in quarter order (like `groupby().diff()`), so
+a skipped quarter counts as one step. Columns, for each score
+`score_<name>` (e.g. `score_solvency_local`):
+
+- `trend_<name>`: change since the previous quarter (the notebook's column)
+- `momentum_<name>`: change over the last `momentum` quarters
+- `mean_<name>`, `std_<name>`: rolling mean / sample std over `window` quarters
+- `z_<name>`: distance of the score from its rolling mean, in rolling stds
+
+`trend_alert_flags` turns the quarter-over-quarter changes into a uint16
+bitmask (a drop and a rise bit per score) rendered as "Local Drop ↓ (Solvency)"
+by `trend_alert_text`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .scoring import GLOBAL_SCORE_COLS, LOCAL_SCORE_COLS, SCORES, quarter_ordinal
+
+
+TREND_SCORE_COLS = LOCAL_SCORE_COLS + GLOBAL_SCORE_COLS
+FEATURE_PREFIXES = ["trend", "momentum", "mean", "std", "z"]
+MOMENTUM_QUARTERS = 4
+ROLLING_QUARTERS = 4
+# quarter-over-quarter change of a score (in percentile points) that raises a trend alert
+TREND_THRESHOLDS = {"drop": -0.2, "rise": 0.2}
+TREND_FLAG_COL = "trend_alert_flags"
+
+
+def feature_columns(prefix, columns=TREND_SCORE_COLS):
+    return [f"{prefix}_{c[len('score_'):]}" for c in columns]
+
+
+def _sorted_order(df, by):
+    codes, _ = pd.factorize(df[by], sort=True)
+    order = np.lexsort((quarter_ordinal(df["quarter"]), codes))
+    return order, codes[order]
+
+
+def _lag(values, codes, steps):
+    """values[i - steps] where that row belongs to the same company, else NaN."""
+    out = np.full(values.shape, np.nan)
+    if steps < len(values):
+        same = codes[steps:] == codes[:-steps]
+        out[steps:][same] = values[:-steps][same]
+    return out
+
+
+def _rolling(values, codes, window, min_periods):
+    """Trailing mean and sample std over `window` rows of each company, NaN-skipping.
+
+    Sums run over the window's own rows, shifted by one of its values: a
+    constant window has deviations of exactly 0, and a small spread around a
+    large level keeps its precision.
+    """
+    lagged = np.stack([values] + [_lag(values, codes, steps) for steps in range(1, window)])
+    present = ~np.isnan(lagged)
+    count = present.sum(axis=0)
+    first = np.take_along_axis(lagged, present.argmax(axis=0)[None], axis=0)[0]
+    shifted = np.where(present, lagged - first, 0.0)
+    total = shifted.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = first + total / count
+        var = np.maximum((shifted * shifted).sum(axis=0) - total * total / count, 0.0) / (count - 1)
+    mean[count < min_periods] = np.nan
+    var[count < max(min_periods, 2)] = np.nan
+    return mean, np.sqrt(var)
+
+
+def trend_features(df, columns=TREND_SCORE_COLS, by="company", momentum=MOMENTUM_QUARTERS,
+                   window=ROLLING_QUARTERS, min_periods=2):
+    """Frame of trend/momentum/rolling/z-score features, aligned with `df`'s index."""
+    order, codes = _sorted_order(df, by)
+    values = df[columns].to_numpy(dtype=np.float64)[order]
+
+    trend = values - _lag(values, codes, 1)
+    moved = values - _lag(values, codes, momentum)
+    mean, std = _rolling(values, codes, window, min_periods)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(std > 0, (values - mean) / std, np.nan)
+
+    out = np.empty((len(df), len(FEATURE_PREFIXES) * len(columns)))
+    out[order] = np.hstack([trend, moved, mean, std, z])
+    names = [name for prefix in FEATURE_PREFIXES for name in feature_columns(prefix, columns)]
+    return pd.DataFrame(out, index=df.index, columns=names)
+
+
+def drop_bit(i):
+    return 1 << (2 * i)
+
+
+def rise_bit(i):
+    return 1 << (2 * i + 1)
+
+
+def trend_alert_flags(features, thresholds=TREND_THRESHOLDS):
+    """uint16 bitmask per row: a drop and a rise bit for each of the eight `trend_` columns."""
+    trend = features[feature_columns("trend")].to_numpy(dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        drop = trend <= thresholds["drop"]
+        rise = trend >= thresholds["rise"]
+    bits = np.arange(len(TREND_SCORE_COLS))
+    flags = (drop * (1 << (2 * bits))).sum(axis=1) + (rise * (1 << (2 * bits + 1))).sum(axis=1)
+    return flags.astype(np.uint16)
+
+
+def trend_alert_text(flags):
+    """Text of one trend bitmask, e.g. "Local Drop ↓ (Solvency), Global Trend ↑ (Liquidity)"."""
+    parts = []
+    for i, col in enumerate(TREND_SCORE_COLS):
+        scope = "Local" if col.endswith("_local") else "Global"
+        name = SCORES[i % len(SCORES)].title()
+        if flags & drop_bit(i):
+            parts.append(f"{scope} Drop ↓ ({name})")
+        elif flags & rise_bit(i):
+            parts.append(f"{scope} Trend ↑ ({name})")
+    return ", ".join(parts)
+
+
+def render_trend_alerts(flags, index=None):
+    """Categorical trend alert strings (one render per distinct mask)."""
+    uniques, codes = np.unique(np.asarray(flags), return_inverse=True)
+    categories = pd.Index([trend_alert_text(int(u)) for u in uniques])
+    return pd.Series(pd.Categorical.from_codes(codes.ravel(), categories), index=index)
@@ -0,0 +1,136 @@
+"""Gap filling of company time series on a dense (company x time) grid.
+
+Replaces the per-company loops that filled missing values in different ways
+(`prepare_plot_data`'s reindex + ffill/bfill, the anomaly notebook's linear
+interpolation): rows are scattered once into a (company, slot, column) array,
+every company and column is filled at once along the slot axis, and the
+result comes back with a bitmask of the cells that were imputed.
+
+Slots are either calendar quarters (`spacing="calendar"`: every quarter from
+the first to the last one in the data, so missing quarters count as gaps) or
+each company's own rows in time order (`spacing="rows"`, what
+`Series.interpolate` does on a company's rows).
+
+Strategies:
+
+- `none`: leave gaps.
+- `ffill`: last known value; leading gaps take the first known value.
+- `linear`: linear interpolation between the surrounding known values, the
+  nearest known value at the edges.
+- `seasonal`: same quarter of the nearest earlier (then later) year, then
+  `linear` for what is left; calendar spacing only.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .scoring import quarter_ordinal
+
+
+STRATEGIES = ["none", "ffill", "linear", "seasonal"]
+SPACINGS = ["calendar", "rows"]
+IMPUTED_COL = "imputed_flags"
+IMPUTED_DTYPE = np.uint16
+
+
+def fill_forward(grid, reverse=False, step=1):
+    """Carry the last non-NaN value forward (or backward) along axis 1, every `step` slots."""
+    if reverse:
+        return fill_forward(grid[:, ::-1], step=step)[:, ::-1]
+    if step > 1:
+        # every residue class of the slot index is its own series
+        out = grid.copy()
+        for r in range(step):
+            out[:, r::step] = fill_forward(grid[:, r::step])
+        return out
+    positions = np.arange(grid.shape[1]).reshape((1, -1) + (1,) * (grid.ndim - 2))
+    last_valid = np.maximum.accumulate(np.where(np.isnan(grid), 0, positions), axis=1)
+    return np.take_along_axis(grid, last_valid, axis=1)
+
+
+def fill_linear(grid):
+    """Linear interpolation along axis 1, nearest value at the edges (like `np.interp`)."""
+    n_slots = grid.shape[1]
+    positions = np.arange(n_slots).reshape((1, -1) + (1,) * (grid.ndim - 2))
+    known = ~np.isnan(grid)
+    before = np.maximum.accumulate(np.where(known, positions, -1), axis=1)
+    after = np.minimum.accumulate(np.where(known, positions, n_slots)[:, ::-1], axis=1)[:, ::-1]
+    has_before, has_after = before >= 0, after < n_slots
+    left = np.take_along_axis(grid, np.maximum(before, 0), axis=1)
+    right = np.take_along_axis(grid, np.minimum(after, n_slots - 1), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(has_before & has_after, (positions - before) / (after - before), 0.0)
+        inner = left + (right - left) * weight
+    out = np.where(has_before, np.where(has_after, inner, left), right)
+    out[~has_before & ~has_after] = np.nan
+    return np.where(known, grid, out)
+
+
+def fill_grid(grid, strategy="linear"):
+    """Filled copy of a (company, slot, ...) grid."""
+    if strategy == "none":
+        return grid.copy()
+    if strategy == "ffill":
+        return fill_forward(fill_forward(grid), reverse=True)
+    if strategy == "linear":
+        return fill_linear(grid)
+    if strategy == "seasonal":
+        return fill_linear(fill_forward(fill_forward(grid, step=4), reverse=True, step=4))
+    raise ValueError(f"unknown fill strategy {strategy!r}, expected one of {STRATEGIES}")
+
+
+def slots(df, by="company", spacing="calendar"):
+    """(company codes, slot codes, companies, number of slots) of every row."""
+    companies, names = pd.factorize(df[by], sort=True)
+    if spacing == "calendar":
+        ordinal = quarter_ordinal(df["quarter"])
+        if (ordinal < 0).any():
+            raise ValueError("rows without a quarter cannot be placed on the calendar grid")
+        start = ordinal.min() if len(ordinal) else 0
+        slot = ordinal - start
+        n_slots = int(slot.max()) + 1 if len(slot) else 0
+    elif spacing == "rows":
+        order = np.lexsort((quarter_ordinal(df["quarter"]), companies))
+        slot = np.empty(len(df), dtype=np.int64)
+        counts = np.bincount(companies, minlength=len(names))
+        starts = np.cumsum(counts) - counts
+        slot[order] = np.arange(len(df)) - np.repeat(starts, counts)
+        n_slots = int(counts.max()) if len(counts) else 0
+    else:
+        raise ValueError(f"unknown spacing {spacing!r}, expected one of {SPACINGS}")
+    return companies, slot, names, n_slots
+
+
+def fill_gaps(df, columns, strategy="linear", by="company", spacing="calendar"):
+    """`df` with gaps in `columns` filled, plus an `imputed_flags` bitmask column.
+
+    Bit j of `imputed_flags` is set where `columns[j]` was missing and got a
+    value (see `imputed_mask`); flags already on `df`, from a fill of the same
+    `columns`, are kept. Rows stay the rows of `df`: missing quarters only
+    serve as interpolation steps.
+    """
+    if strategy == "seasonal" and spacing != "calendar":
+        raise ValueError("seasonal filling needs calendar spacing")
+    if len(columns) > np.iinfo(IMPUTED_DTYPE).bits:
+        raise ValueError(f"at most {np.iinfo(IMPUTED_DTYPE).bits} columns can be flagged")
+    companies, slot, names, n_slots = slots(df, by=by, spacing=spacing)
+    grid = np.full((len(names), n_slots, len(columns)), np.nan)
+    values = df[columns].to_numpy(dtype=np.float64)
+    if len(df) and np.bincount(companies * n_slots + slot).max() > 1:
+        raise ValueError(f"several rows share a {by} and quarter")
+    grid[companies, slot] = values
+
+    filled = fill_grid(grid, strategy)[companies, slot]
+    imputed = np.isnan(values) & ~np.isnan(filled)
+    bits = (imputed.astype(np.uint32) << np.arange(len(columns), dtype=np.uint32)).sum(axis=1)
+    flags = bits.astype(IMPUTED_DTYPE)
+    if IMPUTED_COL in df.columns:
+        flags |= df[IMPUTED_COL].to_numpy(dtype=IMPUTED_DTYPE)
+    return df.assign(**{col: filled[:, j] for j, col in enumerate(columns)}, **{IMPUTED_COL: flags})
+
+
+def imputed_mask(df, columns):
+    """Boolean frame: which of `columns` were imputed by `fill_gaps(df, columns, ...)`."""
+    flags = df[IMPUTED_COL].to_numpy(dtype=np.uint32) if IMPUTED_COL in df.columns else np.zeros(len(df), np.uint32)
+    bits = (flags[:, None] >> np.arange(len(columns), dtype=np.uint32)) & 1
+    return pd.DataFrame(bits.astype(bool), index=df.index, columns=columns)
@@ -0,0 +1,158 @@
+"""Incremental re-scoring when new filings arrive.
+
+Global percentiles are grouped by quarter and local ones by company, so a batch
+of new rows only changes the global ranks of the quarters it touches and the
+local ranks of the companies it touches. Everything else is reused from the
+existing scored frame. The store's threshold summaries are updated the same
+way: the old scores of the changed rows are retracted and the new ones added.
+
+    python -m health_scoring.incremental app_streamlit/scores.v3.parquet new_quarter.csv --verify
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .classify import FLAG_COLS, LABEL_COLS
+from .schema import SCORE_ATOL, compact
+from .scoring import (
+    COMPOSITE_COLS,
+    GLOBAL_SCORE_COLS,
+    INDICATORS,
+    LOCAL_BLOCK_WIDTH,
+    OUTPUT_COLS,
+    PCT_BLOCK,
+    composite_scores,
+    global_block,
+    group_codes,
+    grouped_pct_rank,
+    local_block,
+    score,
+    scores_frame,
+)
+
+
+def _raw_columns(scored):
+    return [c for c in scored.columns if c not in OUTPUT_COLS + LABEL_COLS + FLAG_COLS]
+
+
+def rescore(scored, new_rows, local_by="company", global_by="quarter"):
+    """Merge `new_rows` into `scored` and recompute only the affected partitions.
+
+    Rows of `new_rows` whose (company, quarter) already exists replace the old
+    row; others are appended. Returns the scored frame without label columns.
+    """
+    raw_cols = _raw_columns(scored)
+    keys = [local_by, global_by]
+    new_rows = new_rows.reindex(columns=raw_cols)
+
+    combined = pd.concat([scored[raw_cols], new_rows], ignore_index=True)
+    keep = ~combined.duplicated(keys, keep="last").to_numpy()
+
+    block = np.vstack([
+        scored[PCT_BLOCK].to_numpy(dtype=np.float64),
+        np.full((len(new_rows), len(PCT_BLOCK)), np.nan),
+    ])[keep]
+    composite = np.vstack([
+        scored[COMPOSITE_COLS].to_numpy(dtype=np.float64),
+        np.full((len(new_rows), len(COMPOSITE_COLS)), np.nan),
+    ])[keep]
+    combined = combined[keep].reset_index(drop=True)
+    raw = combined[INDICATORS].to_numpy(dtype=np.float64)
+
+    local_rows = combined[local_by].isin(new_rows[local_by]).to_numpy()
+    global_rows = combined[global_by].isin(new_rows[global_by]).to_numpy()
+
+    if local_rows.any():
+        codes = group_codes(combined.loc[local_rows, local_by])[0]
+        block[local_rows, :LOCAL_BLOCK_WIDTH] = local_block(grouped_pct_rank(raw[local_rows], codes))
+    if global_rows.any():
+        codes = group_codes(combined.loc[global_rows, global_by])[0]
+        block[global_rows, LOCAL_BLOCK_WIDTH:] = global_block(grouped_pct_rank(raw[global_rows], codes))
+
+    # recompute only the side whose percentiles changed: reused ones come from float32
+    changed = local_rows | global_rows
+    fresh = composite_scores(block[changed])
+    is_global = np.isin(COMPOSITE_COLS, GLOBAL_SCORE_COLS)
+    for side, rows in ((~is_global, local_rows), (is_global, global_rows)):
+        picked = rows[changed]
+        composite[np.ix_(np.flatnonzero(changed)[picked], np.flatnonzero(side))] = fresh[np.ix_(picked, side)]
+
+    result = pd.concat([combined, scores_frame(block, combined.index, composite)], axis=1)
+    return result.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+def verify(scored, local_by="company", global_by="quarter", atol=1e-12):
+    """Raise ValueError unless `scored` matches a full recompute; returns the max abs diff."""
+    full = score(scored[_raw_columns(scored)], local_by=local_by, global_by=global_by)
+    expected = full[OUTPUT_COLS].to_numpy(dtype=np.float64)
+    actual = scored[OUTPUT_COLS].to_numpy(dtype=np.float64)
+    if (np.isnan(expected) != np.isnan(actual)).any():
+        raise ValueError("incremental scores have missing values where a full recompute has none (or vice versa)")
+    diff = np.nanmax(np.abs(expected - actual), initial=0.0)
+    if diff > atol:
+        raise ValueError(f"incremental scores differ from a full recompute by {diff:.3g}")
+    return diff
+
+
+def changed_scores(old, new, columns, keys=("company", "quarter")):
+    """(old values, new values) of `columns` on the union of keys, NaN where a score did not change."""
+    def keyed(df):
+        index = pd.MultiIndex.from_arrays([df[k].astype(str).to_numpy() for k in keys])
+        return pd.DataFrame(df[columns].to_numpy(dtype=np.float64), index=index, columns=columns)
+
+    old, new = keyed(old), keyed(new)
+    index = old.index.union(new.index)
+    old, new = old.reindex(index), new.reindex(index)
+    same = (old == new) | (old.isna() & new.isna())
+    return old.mask(same), new.mask(same)
+
+
+def update_thresholds(service, stored, scored):
+    """Swap the changed scores of `stored` for those of `scored` in a `ThresholdService`."""
+    old, new = changed_scores(stored, scored, service.columns)
+    return service.remove(old).update(new)
+
+
+def update_store(path, new_rows, check=False):
+    """Patch the materialized store at `path` with `new_rows`."""
+    from .store import build, load_store, write_store
+    from .thresholds import ThresholdService
+
+    stored, meta = load_store(path)
+    if meta.get("fill", "none") != "none":
+        # new rows change the neighbours that earlier gaps were filled from
+        raise ValueError(f"{path} was gap-filled ({meta['fill']}); materialize it again instead")
+    scored = rescore(stored, new_rows)
+    if check:
+        # reused scores were stored as float32
+        verify(scored, atol=SCORE_ATOL)
+    # the service holds the stored float32 scores, so compare at that precision
+    scored = compact(scored)
+    service = None
+    if meta.get("threshold_state") is not None:
+        service = update_thresholds(ThresholdService.from_dict(meta["threshold_state"]), stored, scored)
+        # once retracted values outnumber live ones, a fresh summary has a smaller error
+        service.rebuild(scored)
+    df, thresholds, service = build(scored, service=service)
+    write_store(df, thresholds, path, source=meta.get("source"), service=service)
+    return df
+
+
+def main(argv=None):
+    from .store import read_csv_any
+
+    parser = argparse.ArgumentParser(description="Patch the score store with new filings.")
+    parser.add_argument("store", help="materialized store (see health_scoring.store)")
+    parser.add_argument("new_rows", help="CSV with the new or revised company-quarter rows")
+    parser.add_argument("--verify", action="store_true", help="check the result against a full recompute")
+    args = parser.parse_args(argv)
+
+    new_rows = read_csv_any(args.new_rows)
+    df = update_store(args.store, new_rows, check=args.verify)
+    print(f"{args.store}: {len(new_rows)} rows merged, {len(df)} rows stored")
+
+
+if __name__ == "__main__":
+    main()
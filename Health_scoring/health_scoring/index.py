@@ -0,0 +1,123 @@
+"""Company / quarter lookups over a scored frame without boolean scans.
+
+`ScoreIndex` sorts the frame by (company, quarter) once and builds:
+
+- sorted categorical `companies` and `quarters`,
+- a company offset table, so "one company over time" is the contiguous row
+  range `frame.iloc[start:stop]` (a slice, not a copy),
+- per-quarter row positions, so "all companies in one quarter" gathers only
+  that quarter's rows,
+- a dense (company, quarter) -> row table for single-cell lookups.
+
+Build it once per store version (the pages keep it in `st.cache_resource`)
+and treat `frame` as read-only: slices share its memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ScoreIndex:
+    """Sorted scored frame with company and quarter offset tables."""
+
+    def __init__(self, df, company="company", quarter="quarter"):
+        self.company_col = company
+        self.quarter_col = quarter
+        company_codes, self.companies = pd.factorize(df[company], sort=True)
+        quarter_codes, self.quarters = pd.factorize(df[quarter], sort=True)
+
+        # a missing company or quarter (code -1) sorts last and is left out of
+        # that key's offset table and of the cell table; the row stays in `frame`
+        order = np.lexsort((_last(quarter_codes, self.quarters), _last(company_codes, self.companies)))
+        if np.any(order != np.arange(len(order))):
+            df = df.iloc[order]
+            company_codes, quarter_codes = company_codes[order], quarter_codes[order]
+        self.frame = df.reset_index(drop=True)
+
+        counts = np.bincount(company_codes[company_codes >= 0], minlength=len(self.companies))
+        stops = np.cumsum(counts)
+        self._company_offsets = np.stack([stops - counts, stops], axis=1)
+
+        counts = np.bincount(quarter_codes[quarter_codes >= 0], minlength=len(self.quarters))
+        stops = np.cumsum(counts)
+        self._by_quarter = np.argsort(_last(quarter_codes, self.quarters), kind="stable")[:counts.sum()]
+        self._quarter_offsets = np.stack([stops - counts, stops], axis=1)
+        self._quarter_rows = np.split(self._by_quarter, stops[:-1])
+
+        known = (company_codes >= 0) & (quarter_codes >= 0)
+        self._cells = np.full((len(self.companies), len(self.quarters)), -1, dtype=np.int64)
+        self._cells[company_codes[known], quarter_codes[known]] = np.flatnonzero(known)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _company_code(self, company):
+        code = self.companies.get_indexer([company])[0]
+        if code < 0:
+            raise KeyError(company)
+        return code
+
+    def _quarter_code(self, quarter):
+        code = self.quarters.get_indexer([quarter])[0]
+        if code < 0:
+            raise KeyError(quarter)
+        return code
+
+    def company_span(self, company):
+        """`slice` of `frame` rows holding one company."""
+        start, stop = self._company_offsets[self._company_code(company)]
+        return slice(int(start), int(stop))
+
+    def quarter_rows(self, quarter):
+        """Positions of one quarter's rows in `frame`, in company order."""
+        return self._quarter_rows[self._quarter_code(quarter)]
+
+    def company(self, company, columns=None, latest_first=False):
+        """Rows of one company, oldest quarter first (a slice of `frame`)."""
+        rows = self.frame.iloc[self.company_span(company)]
+        if columns is not None:
+            rows = rows[columns]
+        return rows.iloc[::-1] if latest_first else rows
+
+    def quarter(self, quarter, columns=None):
+        """Rows of one quarter, in company order."""
+        rows = self.frame.iloc[self.quarter_rows(quarter)]
+        return rows if columns is None else rows[columns]
+
+    def row(self, company, quarter):
+        """Position of (company, quarter) in `frame`, or -1 if that quarter is missing."""
+        return int(self._cells[self._company_code(company), self._quarter_code(quarter)])
+
+    def cells(self, companies, quarters):
+        """Positions of many (company, quarter) pairs in `frame`; -1 where unknown or missing."""
+        c = self.companies.get_indexer(companies)
+        q = self.quarters.get_indexer(quarters)
+        known = (c >= 0) & (q >= 0)
+        return np.where(known, self._cells[np.maximum(c, 0), np.maximum(q, 0)], -1)
+
+    def company_pairs(self, companies):
+        """(owner, position) arrays: every row of each of `companies` (none for unknown ones)."""
+        return _expand(self._company_offsets, self.companies.get_indexer(companies))
+
+    def quarter_pairs(self, quarters):
+        """(owner, position) arrays: every row of each of `quarters` (none for unknown ones)."""
+        owners, at = _expand(self._quarter_offsets, self.quarters.get_indexer(quarters))
+        return owners, self._by_quarter[at]
+
+    def company_sizes(self):
+        """Number of quarters per company, aligned with `companies`."""
+        return pd.Series(np.diff(self._company_offsets, axis=1).ravel(), index=self.companies)
+
+
+def _last(codes, uniques):
+    """Factorize codes with the missing-key code -1 moved after every known key."""
+    return np.where(codes < 0, len(uniques), codes)
+
+
+def _expand(offsets, codes):
+    """(owner, index) pairs covering the [start, stop) ranges of `offsets[codes]`; code -1 is empty."""
+    known = (codes >= 0) & (len(offsets) > 0)
+    start = np.where(known, offsets[np.maximum(codes, 0), 0], 0)
+    counts = np.where(known, offsets[np.maximum(codes, 0), 1], 0) - start
+    owners = np.repeat(np.arange(len(codes)), counts)
+    return owners, np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - start, counts)
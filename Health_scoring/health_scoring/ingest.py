@@ -0,0 +1,326 @@
+"""Build the `dataset_unified.csv` extract from raw quarterly statements.
+
+Replaces the per-ticker loop of `test.ipynb` (one `yf.Ticker` at a time, one
+Excel file per company). Statements come from a pluggable source:
+
+- `YFinanceSource`: Yahoo Finance through the optional `yfinance` package.
+- `FileSource`: statements saved as `<root>/<ticker>/<statement>.csv`, a local
+  stand-in for the remote provider (`write_statements` creates them).
+
+Every (ticker, statement) is fetched on a thread pool and cached on disk under
+`<cache>/<period>/<ticker>/<statement>.parquet`, so a refresh within the same
+period only downloads what is missing. Each entry records the source's
+`version` of the statement and is refetched when it changes (another source,
+or a statement file rewritten since). The line items of all tickers are then
+stacked into one frame and the ratios derived column-wise for the whole
+universe at once.
+
+    python -m health_scoring.ingest new.csv --cache .statements --macro ../dataset_unified.csv
+    python -m health_scoring.ingest out.csv --source file --root statements/ --universe universe.csv
+
+Macro columns (inflation, GDP growth, interest rate) do not come from the
+statements: they are filled from a `MacroTable` (`--macro` takes it from an
+existing extract) or left empty.
+"""
+
+import argparse
+import datetime
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .loader import NUMERIC_COLUMNS, SOURCE_COLUMNS, read_source, write_atomic, write_source
+from .macro import MacroTable
+
+
+STATEMENTS = ["income", "balance", "cashflow"]
+
+# line item -> (statement, provider row names in order of preference)
+LINE_ITEMS = {
+    "revenue": ("income", ["Total Revenue", "Operating Revenue"]),
+    "net_income": ("income", ["Net Income", "Net Income Common Stockholders"]),
+    "total_assets": ("balance", ["Total Assets"]),
+    "total_liabilities": ("balance", ["Total Liabilities Net Minority Interest", "Total Liabilities"]),
+    "equity": ("balance", ["Stockholders Equity", "Total Stockholder Equity"]),
+    "current_assets": ("balance", ["Current Assets", "Total Current Assets"]),
+    "current_liabilities": ("balance", ["Current Liabilities", "Total Current Liabilities"]),
+    "cash": ("balance", ["Cash And Cash Equivalents", "Cash"]),
+    "operating_cash_flow": ("cashflow", ["Operating Cash Flow", "Total Cash From Operating Activities"]),
+}
+
+# ratio -> (numerator, denominator, scale); quarterly income is annualized
+# and ROA is in percent, like the existing extracts
+RATIOS = {
+    "ROA": ("net_income", "total_assets", 400.0),
+    "ROE": ("net_income", "equity", 4.0),
+    "debt_to_equity": ("total_liabilities", "equity", 1.0),
+    "current_ratio": ("current_assets", "current_liabilities", 1.0),
+    "net_margin": ("net_income", "revenue", 1.0),
+    "cash_ratio": ("cash", "current_liabilities", 1.0),
+}
+
+# company -> (ticker, country) of the current extract
+UNIVERSE = {
+    "BNP Paribas": ("BNP.PA", "France"),
+    "Banco Santander": ("SAN.MC", "Spain"),
+    "Crédit Agricole": ("ACA.PA", "France"),
+    "HSBC": ("HSBA.L", "UK"),
+    "JP Morgan Chase": ("JPM", "USA"),
+}
+
+DEFAULT_WORKERS = 8
+
+
+class StatementSource:
+    """Base class: subclasses implement `fetch`."""
+
+    def fetch(self, ticker, statement):
+        """Statement of `ticker` as a frame: one row per period end date, one column per line item."""
+        raise NotImplementedError
+
+    def version(self, ticker, statement):
+        """Token stored with a cached statement; a different token makes the cache refetch."""
+        return type(self).__name__
+
+
+class FileSource(StatementSource):
+    """Statements read from `<root>/<ticker>/<statement>.csv` (see `write_statements`)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, ticker, statement):
+        return os.path.join(self.root, safe_ticker(ticker), f"{statement}.csv")
+
+    def fetch(self, ticker, statement):
+        return pd.read_csv(self.path(ticker, statement), index_col=0, parse_dates=[0])
+
+    def version(self, ticker, statement):
+        path = os.path.abspath(self.path(ticker, statement))
+        stat = os.stat(path)
+        return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class YFinanceSource(StatementSource):
+    """Quarterly statements from Yahoo Finance (needs the optional `yfinance` package)."""
+
+    ATTRIBUTES = {
+        "income": "quarterly_financials",
+        "balance": "quarterly_balance_sheet",
+        "cashflow": "quarterly_cashflow",
+    }
+
+    def fetch(self, ticker, statement):
+        import yfinance as yf
+
+        # yfinance returns line items as rows and periods as columns
+        return getattr(yf.Ticker(ticker), self.ATTRIBUTES[statement]).T
+
+
+SOURCES = {
+    "file": FileSource,
+    "yfinance": YFinanceSource,
+}
+
+
+def get_source(name, **kwargs):
+    if name not in SOURCES:
+        raise ValueError(f"unknown statement source {name!r}, expected one of {list(SOURCES)}")
+    return SOURCES[name](**kwargs)
+
+
+def safe_ticker(ticker):
+    """File-system safe version of a ticker."""
+    return re.sub(r"[^\w.-]+", "_", ticker)
+
+
+def write_statements(root, ticker, statements):
+    """Save `{statement: frame}` of `ticker` where `FileSource(root)` reads it."""
+    directory = os.path.join(root, safe_ticker(ticker))
+    os.makedirs(directory, exist_ok=True)
+    for statement, frame in statements.items():
+        frame.to_csv(os.path.join(directory, f"{statement}.csv"))
+
+
+def current_period(today=None):
+    """"YYYY-Qn" of `today`: the cache key of a refresh."""
+    today = today or datetime.date.today()
+    return f"{today.year}-Q{(today.month - 1) // 3 + 1}"
+
+
+class StatementCache:
+    """Raw statements on disk, keyed by period, ticker and statement."""
+
+    def __init__(self, directory, period=None):
+        self.directory = directory
+        self.period = period or current_period()
+
+    def path(self, ticker, statement):
+        return os.path.join(self.directory, self.period, safe_ticker(ticker), f"{statement}.parquet")
+
+    def get(self, ticker, statement, version=None):
+        """Cached statement, or None if missing or cached from another `version`."""
+        path = self.path(ticker, statement)
+        if not os.path.exists(path):
+            return None
+        if version is not None:
+            try:
+                with open(path + ".version", encoding="utf-8") as f:
+                    if f.read() != version:
+                        return None
+            except FileNotFoundError:
+                return None
+        return pd.read_parquet(path)
+
+    def put(self, ticker, statement, frame, version=None):
+        path = self.path(ticker, statement)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # private temporary files, so concurrent writers and readers never see a partial one
+        frame = frame.rename(columns=str)
+        frame.index.name = "period"
+        write_atomic(path, frame.to_parquet)
+        if version is not None:
+            write_atomic(path + ".version", lambda tmp_path: _write_text(tmp_path, version))
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _fetch_one(source, cache, ticker, statement):
+    if cache is None:
+        return source.fetch(ticker, statement)
+    version = source.version(ticker, statement)
+    frame = cache.get(ticker, statement, version)
+    if frame is None:
+        frame = source.fetch(ticker, statement)
+        cache.put(ticker, statement, frame, version)
+    return frame
+
+
+def fetch_statements(source, tickers, cache=None, workers=DEFAULT_WORKERS):
+    """({(ticker, statement): frame}, {ticker: error}) for every ticker, fetched concurrently.
+
+    A ticker whose fetch fails is reported in the errors and left out, so one
+    delisted symbol does not abort a refresh of the universe.
+    """
+    tasks = [(ticker, statement) for ticker in tickers for statement in STATEMENTS]
+    statements, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {task: executor.submit(_fetch_one, source, cache, *task) for task in tasks}
+        for (ticker, statement), future in futures.items():
+            try:
+                statements[ticker, statement] = future.result()
+            except Exception as exc:
+                errors.setdefault(ticker, f"{statement}: {exc}")
+    return {key: frame for key, frame in statements.items() if key[0] not in errors}, errors
+
+
+def line_items(statements):
+    """One row per (ticker, period end date) with the `LINE_ITEMS` columns, for all tickers at once."""
+    parts = []
+    for statement in STATEMENTS:
+        frames = {ticker: frame for (ticker, s), frame in statements.items() if s == statement}
+        if not frames:
+            continue
+        frame = pd.concat(frames, names=["ticker", "date"]).apply(pd.to_numeric, errors="coerce")
+        frame.index = frame.index.set_levels(pd.to_datetime(frame.index.levels[1]), level=1)
+        columns = {}
+        for item, (source, names) in LINE_ITEMS.items():
+            present = [n for n in names if n in frame.columns]
+            if source == statement:
+                # first provider name with a value, per row
+                columns[item] = frame[present].bfill(axis=1).iloc[:, 0] if present else np.nan
+        parts.append(pd.DataFrame(columns, index=frame.index).groupby(level=[0, 1]).first())
+    if not parts:
+        return pd.DataFrame(columns=["ticker", "date"] + list(LINE_ITEMS))
+    return pd.concat(parts, axis=1).reindex(columns=list(LINE_ITEMS)).reset_index()
+
+
+def derive_ratios(items, universe=UNIVERSE):
+    """Frame in the `dataset_unified.csv` schema from `line_items` output.
+
+    Rows are clustered by company, latest quarter first, like the extracts.
+    """
+    by_ticker = {ticker: (company, country) for company, (ticker, country) in universe.items()}
+    items = items[items["ticker"].isin(list(by_ticker))]
+    items = items.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratios = {
+            name: items[num].to_numpy(dtype=np.float64) / items[den].to_numpy(dtype=np.float64) * scale
+            for name, (num, den, scale) in RATIOS.items()
+        }
+        revenue = items["revenue"].to_numpy(dtype=np.float64)
+        previous = np.r_[np.nan, revenue[:-1]]
+        same = np.r_[False, items["ticker"].to_numpy()[1:] == items["ticker"].to_numpy()[:-1]]
+        ratios["revenue_growth"] = np.where(same, revenue / previous - 1, np.nan)
+
+    dates = pd.to_datetime(items["date"])
+    out = pd.DataFrame({
+        "company": items["ticker"].map(lambda t: by_ticker[t][0]),
+        "date": dates.dt.strftime("%Y-%m-%d"),
+        "quarter": dates.dt.year.astype(str) + "-Q" + dates.dt.quarter.astype(str),
+        "country": items["ticker"].map(lambda t: by_ticker[t][1]),
+    })
+    for column in NUMERIC_COLUMNS:
+        values = ratios.get(column, np.full(len(items), np.nan))
+        out[column] = np.where(np.isfinite(values), values, np.nan)
+    out = out.sort_values(["company", "date"], ascending=[True, False], kind="stable")
+    return out[SOURCE_COLUMNS].reset_index(drop=True)
+
+
+def read_universe(path):
+    """{company: (ticker, country)} from a `company;ticker;country` file."""
+    frame = pd.read_csv(path, sep=";", encoding="utf-8-sig", dtype=str)
+    return {row.company: (row.ticker, row.country) for row in frame.itertuples(index=False)}
+
+
+def ingest(source, universe=UNIVERSE, cache=None, workers=DEFAULT_WORKERS, macro=None):
+    """(dataset, errors): the source-schema frame of `universe` and the tickers that failed.
+
+    With `macro` (a `MacroTable`), the macro columns are filled from it.
+    """
+    tickers = [ticker for ticker, _ in universe.values()]
+    statements, errors = fetch_statements(source, tickers, cache=cache, workers=workers)
+    df = derive_ratios(line_items(statements), universe)
+    return (macro.join(df) if macro is not None else df), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the source extract from quarterly statements.")
+    parser.add_argument("output", help="CSV to write (dataset_unified.csv format)")
+    parser.add_argument("--source", choices=list(SOURCES), default="yfinance")
+    parser.add_argument("--root", help="statement directory of the file source")
+    parser.add_argument("--universe", help="company;ticker;country file (default: the current five banks)")
+    parser.add_argument("--cache", help="directory of the raw statement cache (default: no cache)")
+    parser.add_argument("--period", help="cache period key (default: the current quarter)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent fetches")
+    parser.add_argument("--macro", help="existing extract to take the (country, quarter) macro series from")
+    args = parser.parse_args(argv)
+
+    if args.source == "file" and not args.root:
+        parser.error("--source file needs --root")
+    if args.source == "yfinance":
+        try:
+            import yfinance  # noqa: F401
+        except ImportError:
+            parser.error("the yfinance source needs yfinance (pip install yfinance)")
+    source = get_source(args.source, **({"root": args.root} if args.source == "file" else {}))
+    universe = read_universe(args.universe) if args.universe else UNIVERSE
+    cache = StatementCache(args.cache, args.period) if args.cache else None
+    macro = MacroTable.from_frame(read_source(args.macro)) if args.macro else None
+
+    df, errors = ingest(source, universe, cache=cache, workers=args.workers, macro=macro)
+    write_source(df, args.output)
+    for ticker, error in errors.items():
+        print(f"skipped {ticker}: {error}")
+    print(f"wrote {len(df)} rows for {df['company'].nunique()} companies to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
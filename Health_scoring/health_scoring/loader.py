@@ -0,0 +1,164 @@
+"""Reader for the `company;date;quarter;...` source extracts.
+
+The source files are semicolon separated, use decimal commas and start with a
+UTF-8 BOM. `read_source` parses them with explicit dtypes and native decimal
+handling (no per-cell string replacement) and `write_source` writes them;
+`iter_partitions` and `score_chunked` stream files that do not fit in memory.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .scoring import (
+    INDICATORS,
+    assemble_block,
+    group_codes,
+    grouped_pct_rank,
+    scores_frame,
+)
+
+
+ID_COLUMNS = ["company", "date", "quarter", "country"]
+NUMERIC_COLUMNS = [
+    "ROA", "ROE", "debt_to_equity", "current_ratio", "net_margin", "revenue_growth",
+    "cash_ratio", "inflation_YoY", "gdp_growth_rate", "interest_rate",
+]
+SOURCE_COLUMNS = ID_COLUMNS + NUMERIC_COLUMNS
+SOURCE_DTYPES = {**{col: str for col in ID_COLUMNS}, **{col: np.float64 for col in NUMERIC_COLUMNS}}
+
+READ_OPTIONS = {
+    "sep": ";",
+    "decimal": ",",
+    "encoding": "utf-8-sig",
+    "dtype": SOURCE_DTYPES,
+}
+
+DEFAULT_CHUNKSIZE = 200_000
+
+# read once: os.umask can only be queried by setting it, which races with threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def read_source(path, chunksize=None, usecols=None):
+    """DataFrame of the source file, or an iterator of chunks if `chunksize` is set."""
+    dtype = SOURCE_DTYPES if usecols is None else {c: SOURCE_DTYPES[c] for c in usecols}
+    return pd.read_csv(path, **{**READ_OPTIONS, "dtype": dtype}, usecols=usecols, chunksize=chunksize)
+
+
+def write_source(df, path, float_format="%.6g"):
+    """Write `df` in the source file format (`;`, decimal comma, BOM)."""
+    df.to_csv(
+        path, sep=READ_OPTIONS["sep"], decimal=READ_OPTIONS["decimal"],
+        encoding=READ_OPTIONS["encoding"], index=False, float_format=float_format,
+        columns=SOURCE_COLUMNS,
+    )
+    return path
+
+
+def write_atomic(path, write):
+    """Call `write(tmp_path)` on a private temporary file next to `path`, then rename it over `path`.
+
+    Readers never see a partial file and concurrent writers never share one.
+    The file gets the mode a plain `open(path, "w")` would give it, not the
+    0600 of `tempfile`.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def iter_partitions(path, by="company", chunksize=DEFAULT_CHUNKSIZE, usecols=None):
+    """Yield one complete DataFrame per value of `by`, reading `chunksize` rows at a time.
+
+    The file must be clustered on `by` (all rows of a company contiguous), which
+    is how the extracts are written.
+    """
+    seen = set()
+    pending = None
+    for chunk in read_source(path, chunksize=chunksize, usecols=usecols):
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        keys = chunk[by].to_numpy()
+        # split points where the key changes; the last run may continue in the next chunk
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        for start, stop in zip(starts[:-1], starts[1:]):
+            yield _checked(chunk.iloc[start:stop], by, seen)
+        pending = chunk.iloc[starts[-1]:]
+    if pending is not None and len(pending):
+        yield _checked(pending, by, seen)
+
+
+def _checked(part, by, seen):
+    key = part[by].iloc[0]
+    if key in seen:
+        raise ValueError(f"source is not clustered by {by!r}: {key!r} appears in several blocks")
+    seen.add(key)
+    return part.reset_index(drop=True)
+
+
+def _spill_global_ranks(path, directory, chunksize, global_by):
+    """Global percentile ranks of every row in a disk-backed (rows, indicators) array.
+
+    Rows are appended to one file per `global_by` value as chunks are read,
+    then each group is ranked on its own, so memory holds one chunk or one
+    group at a time.
+    """
+    buckets = {}
+    n = 0
+    for chunk in read_source(path, chunksize=chunksize, usecols=[global_by] + INDICATORS):
+        codes, keys = group_codes(chunk[global_by])
+        rows = np.arange(n, n + len(chunk), dtype=np.int64)
+        values = chunk[INDICATORS].to_numpy(dtype=np.float64)
+        for code, key in enumerate(keys):
+            picked = codes == code
+            if key not in buckets:
+                buckets[key] = os.path.join(directory, f"group{len(buckets)}.bin")
+            with open(buckets[key], "ab") as f:
+                f.write(np.column_stack([rows[picked], values[picked]]).tobytes())
+        n += len(chunk)
+
+    # rows without a key keep NaN ranks, like `grouped_pct_rank`
+    ranks = np.lib.format.open_memmap(os.path.join(directory, "ranks.npy"), mode="w+",
+                                      dtype=np.float64, shape=(n, len(INDICATORS)))
+    ranks[:] = np.nan
+    for bucket in buckets.values():
+        block = np.fromfile(bucket, dtype=np.float64).reshape(-1, len(INDICATORS) + 1)
+        os.remove(bucket)
+        rows = block[:, 0].astype(np.int64)
+        ranks[rows] = grouped_pct_rank(block[:, 1:], np.zeros(len(block), dtype=np.int64))
+    ranks.flush()
+    return ranks
+
+
+def score_chunked(path, chunksize=DEFAULT_CHUNKSIZE, local_by="company", global_by="quarter", tmpdir=None):
+    """Yield scored company partitions of a source file.
+
+    Pass 1 spills the quarter key and the six ranked indicators to `tmpdir`
+    (a temporary directory by default) and ranks one quarter at a time into a
+    memory-mapped array; pass 2 streams company partitions again, ranks them
+    locally and reads the matching slice of the global ranks. Resident memory
+    is bounded by one chunk, the largest quarter and the largest company, not
+    by the file size.
+    """
+    with tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+        global_ranks = _spill_global_ranks(path, directory, chunksize, global_by)
+        offset = 0
+        for part in iter_partitions(path, by=local_by, chunksize=chunksize):
+            stop = offset + len(part)
+            local = grouped_pct_rank(part[INDICATORS].to_numpy(dtype=np.float64), group_codes(part[local_by])[0])
+            block = assemble_block(local, np.array(global_ranks[offset:stop]))
+            offset = stop
+            yield pd.concat([part, scores_frame(block, part.index)], axis=1)
+        del global_ranks
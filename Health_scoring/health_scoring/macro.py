@@ -0,0 +1,136 @@
+"""Macro series keyed by (country, quarter), joined to company rows on demand.
+
+The extracts repeat `inflation_YoY`, `gdp_growth_rate` and `interest_rate` on
+every company row although they only depend on the country and the quarter.
+`MacroTable` keeps one row per (country, quarter); company rows are matched
+to it once through an integer position index (`positions`) and columns are
+gathered only when asked for. Per-country transforms (z-scores, the
+explorer's clipped scale) are computed once on the table, however many
+companies share the country.
+
+    macro = MacroTable.from_frame(df)             # deduplicate the extract
+    z = macro.join(df, transform="zscore")        # per-country z-scores per row
+
+The score store keeps only the table (`to_dict`, in its metadata) and joins
+it back when loaded.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+MACRO_COLUMNS = ["inflation_YoY", "gdp_growth_rate", "interest_rate"]
+KEY_COLUMNS = ["country", "quarter"]
+
+
+def _zscore(values, codes):
+    """Per-country z-scores (population std, like StandardScaler); constant series give 0."""
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    out = np.empty_like(values)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        present = ~np.isnan(column)
+        count = np.bincount(codes[present], minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(codes[present], weights=column[present], minlength=n_groups) / count
+            dev = column - mean[codes]
+            var = np.bincount(codes[present], weights=dev[present] ** 2, minlength=n_groups) / count
+            std = np.sqrt(var)[codes]
+            out[:, j] = np.where(std > 0, dev / std, 0.0)
+        out[~present, j] = np.nan
+    return out
+
+
+TRANSFORMS = {
+    "raw": lambda values, codes: values,
+    "zscore": _zscore,
+    # shares the [0, 1] axis of the scores on the explorer chart
+    "clipped": lambda values, codes: np.clip(values, -1, 1) + 0.5,
+}
+
+
+class MacroTable:
+    """One row per (country, quarter) with the macro columns, sorted by country then quarter."""
+
+    def __init__(self, frame, columns=None):
+        self.columns = list(columns or [c for c in MACRO_COLUMNS if c in frame.columns])
+        frame = frame[KEY_COLUMNS + self.columns].sort_values(KEY_COLUMNS, kind="stable")
+        self.frame = frame.reset_index(drop=True)
+        self._keys = pd.MultiIndex.from_frame(self.frame[KEY_COLUMNS].astype(str))
+        if not self._keys.is_unique:
+            raise ValueError("macro table has duplicate (country, quarter) rows")
+        self._country_codes, self.countries = pd.factorize(self.frame["country"].astype(str), sort=True)
+        self._values = self.frame[self.columns].to_numpy(dtype=np.float64)
+        self._transformed = {"raw": self._values}
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """Deduplicate the macro columns of company rows; conflicting values for a key raise ValueError."""
+        columns = list(columns or [c for c in MACRO_COLUMNS if c in df.columns])
+        keys = df[KEY_COLUMNS].astype(str)
+        grouped = df[columns].groupby([keys["country"], keys["quarter"]], sort=True)
+        first, low, high = grouped.first(), grouped.min(), grouped.max()
+        conflicts = (low != high) & low.notna()
+        if conflicts.to_numpy().any():
+            country, quarter = conflicts.any(axis=1).idxmax()
+            raise ValueError(f"macro values differ between companies of {country} in {quarter}")
+        return cls(first.reset_index(), columns)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def to_dict(self):
+        return {"columns": self.columns, "rows": self.frame.to_numpy(dtype=object).tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(pd.DataFrame(state["rows"], columns=KEY_COLUMNS + state["columns"]), state["columns"])
+
+    def positions(self, countries, quarters):
+        """Table row of each (country, quarter) pair; -1 where the table has none."""
+        keys = pd.MultiIndex.from_arrays([np.asarray(countries).astype(str), np.asarray(quarters).astype(str)])
+        return self._keys.get_indexer(keys)
+
+    def values(self, transform="raw"):
+        """(rows, columns) array of the table, transformed per country (computed once)."""
+        if transform not in TRANSFORMS:
+            raise ValueError(f"unknown macro transform {transform!r}, expected one of {list(TRANSFORMS)}")
+        if transform not in self._transformed:
+            self._transformed[transform] = TRANSFORMS[transform](self._values, self._country_codes)
+        return self._transformed[transform]
+
+    def gather(self, positions, transform="raw"):
+        """Rows of `values(transform)` at `positions` (NaN for -1)."""
+        table = self.values(transform)
+        out = table[np.maximum(positions, 0)] if len(table) else np.full((len(positions), len(self.columns)), np.nan)
+        out[np.asarray(positions) < 0] = np.nan
+        return out
+
+    def join(self, df, columns=None, transform="raw", suffix=""):
+        """`df` with the macro columns of its (country, quarter), replacing any it already has."""
+        columns = list(columns or self.columns)
+        values = self.gather(self.positions(df["country"], df["quarter"]), transform)
+        picked = [self.columns.index(c) for c in columns]
+        return df.assign(**{c + suffix: values[:, j] for c, j in zip(columns, picked)})
+
+    def grid(self, countries, quarters, transform="raw"):
+        """(countries, quarters, columns) array of the table, NaN where a key is missing."""
+        c = np.repeat(np.arange(len(countries)), len(quarters))
+        q = np.tile(np.arange(len(quarters)), len(countries))
+        values = self.gather(self.positions(np.asarray(countries)[c], np.asarray(quarters)[q]), transform)
+        return values.reshape(len(countries), len(quarters), len(self.columns))
+
+
+def split_macro(df, columns=None):
+    """(company rows without the macro columns, `MacroTable` of them), or `(df, None)`.
+
+    The columns are only factored out when every (country, quarter) holds the
+    same values on all its rows, missing values included, so joining the
+    table back gives `df` again; otherwise they stay on the rows.
+    """
+    columns = list(columns or [c for c in MACRO_COLUMNS if c in df.columns])
+    keys = df[KEY_COLUMNS].astype(str)
+    if len(df) and df[columns].groupby([keys["country"], keys["quarter"]]).nunique(dropna=False).gt(1).any().any():
+        return df, None
+    table = MacroTable(pd.concat([keys, df[columns]], axis=1).drop_duplicates(KEY_COLUMNS), columns)
+    return df.drop(columns=columns), table
@@ -0,0 +1,105 @@
+"""Multi-process scoring.
+
+Local percentiles are independent per company and global ones per quarter, so
+`score_parallel` sorts the indicator array by company, splits it at company
+boundaries into roughly equal slices and ranks the slices in a process pool,
+then does the same by quarter. Input and output arrays live in shared memory;
+workers only receive slice offsets. Each row's rank depends only on its own
+group, so the result is identical for any worker count.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .scoring import (
+    INDICATORS,
+    OUTPUT_COLS,
+    assemble_block,
+    group_codes,
+    grouped_pct_rank,
+    scores_frame,
+)
+
+
+# slices per worker, so uneven company sizes still balance
+SLICES_PER_WORKER = 4
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _share(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _rank_slice(task):
+    values_name, codes_name, out_name, shape, start, stop = task
+    values_shm, values = _attach(values_name, shape, np.float64)
+    codes_shm, codes = _attach(codes_name, shape[:1], np.int64)
+    out_shm, out = _attach(out_name, shape, np.float64)
+    try:
+        out[start:stop] = grouped_pct_rank(values[start:stop], codes[start:stop])
+    finally:
+        del values, codes, out
+        for shm in (values_shm, codes_shm, out_shm):
+            shm.close()
+
+
+def slice_bounds(sorted_codes, n_slices):
+    """Cut points splitting `sorted_codes` into ~equal slices without splitting a group."""
+    n = len(sorted_codes)
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if n else np.empty(0, int)
+    targets = np.linspace(0, n, n_slices + 1)[1:-1]
+    cuts = starts[np.minimum(np.searchsorted(starts, targets), len(starts) - 1)] if len(starts) else []
+    return np.unique(np.r_[0, cuts, n]).astype(int)
+
+
+def ranked_in_pool(executor, values, codes, n_slices):
+    """`grouped_pct_rank(values, codes)` computed slice by slice in `executor`."""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = np.ascontiguousarray(codes[order], dtype=np.int64)
+    blocks = [_share(np.ascontiguousarray(values[order])), _share(sorted_codes), _share(np.empty_like(values))]
+    try:
+        names = [shm.name for shm in blocks]
+        bounds = slice_bounds(sorted_codes, n_slices)
+        tasks = [(*names, values.shape, int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        list(executor.map(_rank_slice, tasks))
+        ranked = np.ndarray(values.shape, dtype=np.float64, buffer=blocks[2].buf)
+        out = np.empty_like(values)
+        out[order] = ranked
+        del ranked
+        return out
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def score_parallel(df, workers=None, local_by="company", global_by="quarter"):
+    """Same result as `scoring.score`, with both ranking phases fanned out to `workers` processes."""
+    workers = workers or default_workers()
+    raw = df[INDICATORS].to_numpy(dtype=np.float64)
+    local_codes = group_codes(df[local_by])[0]
+    global_codes = group_codes(df[global_by])[0]
+    n_slices = workers * SLICES_PER_WORKER
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        local = ranked_in_pool(executor, raw, local_codes, n_slices)
+        global_ = ranked_in_pool(executor, raw, global_codes, n_slices)
+
+    result = scores_frame(assemble_block(local, global_), df.index)
+    base = df.drop(columns=[c for c in OUTPUT_COLS if c in df.columns])
+    return pd.concat([base, result], axis=1)
@@ -0,0 +1,130 @@
+"""Table layouts of the Financial and Simplified views.
+
+Shared by the pages and the batch exporter. `render_report` builds the HTML
+table the pages display with vectorized formatting and status colouring,
+in place of a pandas Styler with per-cell `applymap` callbacks.
+"""
+
+import html
+
+import numpy as np
+import pandas as pd
+
+from .classify import with_alert_text
+
+
+# source column -> displayed header, in display order
+REPORT_COLUMNS = {
+    "score_profitability_local": "Profitability (Local)",
+    "score_profitability_global": "Profitability (Global)",
+    "score_liquidity_local": "Liquidity (Local)",
+    "score_liquidity_global": "Liquidity (Global)",
+    "score_solvency_local": "Solvency (Local)",
+    "score_solvency_global": "Solvency (Global)",
+    "score_leverage_adjusted_local": "Adj. Leverage (Local)",
+    "score_leverage_adjusted_global": "Adj. Leverage (Global)",
+    "Rev Growth": "Revenue Growth",
+    "Local Alert Summary": "Local Alerts",
+    "Global Alert Summary": "Global Alerts",
+    "Local Status": "Local Status",
+    "Global Status": "Global Status",
+}
+
+SCORE_VIEWS = ["all", "local", "global"]
+
+# Simplified view: source column -> displayed header
+SIMPLIFIED_COLUMNS = {
+    "quarter": "Quarter",
+    "Local Status": "Local Status",
+    "Global Status": "Global Status",
+    "Local Alert Summary": "Local Alerts",
+    "Global Alert Summary": "Global Alerts",
+}
+
+STATUS_COLORS = {
+    "Strong": "#b6fcb6",
+    "Danger": "#ffd3d3",
+    "Critical Risk": "#ff9999",
+    "Stable": "#f7f7f7",
+    "Good signal": "#d1e7dd",
+    "Caution": "#fff3cd",
+    "Mixed Risk": "#ffe6cc",
+    "Leveraged Risk": "#f0c2c2",
+    "Excellent Health": "#c2f7e1",
+    "Insufficient Data": "#e0e0e0",
+}
+STATUS_HEADERS = ["Local Status", "Global Status"]
+LAYOUTS = ["financial", "simplified"]
+
+
+def report_columns(view="all"):
+    """Source columns shown for a score view ("all", "local" or "global")."""
+    if view == "local":
+        return [c for c in REPORT_COLUMNS if "Local" in REPORT_COLUMNS[c] or c in ["Rev Growth", "Local Alert Summary", "Local Status"]]
+    if view == "global":
+        return [c for c in REPORT_COLUMNS if "Global" in REPORT_COLUMNS[c] or c == "Global Alert Summary"]
+    if view != "all":
+        raise ValueError(f"unknown score view {view!r}, expected one of {SCORE_VIEWS}")
+    return list(REPORT_COLUMNS)
+
+
+def format_percent(values):
+    """"12.3%" strings for fractions; missing values give ""."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, "", dtype=object)
+    present = ~np.isnan(values)
+    out[present] = np.char.mod("%.1f%%", values[present] * 100)
+    return out
+
+
+def report_frame(df, view="all", key="quarter"):
+    """Rows of `df` laid out as the Financial view table, with `key` as first column.
+
+    Scores stay numeric; revenue growth is formatted as a percentage and the
+    alert summaries are rendered from the stored bitmasks.
+    """
+    df = with_alert_text(df)
+    df = df.assign(**{"Rev Growth": format_percent(df["revenue_growth"])})
+    return df[[key] + report_columns(view)].rename(columns=REPORT_COLUMNS)
+
+
+def _cells(values, colors=None):
+    """`<td>` strings for one column: escaped text, optional background per value."""
+    text = pd.Series(values, dtype=object).fillna("").astype(str)
+    distinct = pd.unique(text)
+    escaped = dict(zip(distinct, (html.escape(v) for v in distinct)))
+    if colors is None:
+        return "<td>" + text.map(escaped) + "</td>"
+    style = text.map(colors).fillna("")
+    return '<td style="background-color: ' + style + '">' + text.map(escaped) + "</td>"
+
+
+def table_html(frame, colored=STATUS_HEADERS, colors=STATUS_COLORS):
+    """HTML table of `frame` (no index), with `colored` columns shaded by `colors`."""
+    head = "".join(f"<th>{html.escape(str(c))}</th>" for c in frame.columns)
+    if frame.empty:
+        return f"<table><thead><tr>{head}</tr></thead><tbody></tbody></table>"
+    columns = [
+        _cells(frame[c].to_numpy(), colors if c in colored else None).to_numpy()
+        for c in frame.columns
+    ]
+    rows = columns[0]
+    for cells in columns[1:]:
+        rows = rows + cells
+    body = "".join("<tr>" + rows + "</tr>")
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def render_report(rows, layout="financial", key="quarter", view="all"):
+    """HTML of a page table for `rows` (one company's quarters or one quarter's companies)."""
+    if layout == "financial":
+        frame = report_frame(rows, view, key=key)
+        for col in report_columns(view):
+            if col.startswith("score_"):
+                header = REPORT_COLUMNS[col]
+                frame[header] = format_percent(frame[header])
+    elif layout == "simplified":
+        frame = with_alert_text(rows)[list(SIMPLIFIED_COLUMNS)].rename(columns=SIMPLIFIED_COLUMNS)
+    else:
+        raise ValueError(f"unknown layout {layout!r}, expected one of {LAYOUTS}")
+    return table_html(frame)
@@ -0,0 +1,69 @@
+"""Declared dtypes of the scored dataset.
+
+A scored frame read with default dtypes holds object strings for the id
+columns, float64 everywhere and one Python string per alert label. `compact`
+converts it to:
+
+- `company`, `country`: categorical
+- `quarter`: ordered categorical of the "YYYY-Qn" labels (int8 codes in
+  chronological order, same text as the source)
+- `date`: datetime64
+- percentile and composite score columns (`scoring.OUTPUT_COLS`): float32
+- statuses: categorical over `classify.STATUS_LABELS`
+- alerts: uint16 bitmasks (`classify.FLAG_COLS`), rendered with
+  `classify.with_alert_text` only for displayed rows
+- `imputed_flags` (gap-filled stores): uint16 bitmask of filled source ratios
+
+Raw ratios stay float64 so re-scoring from a compact frame ranks exactly the
+same values as the source.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .classify import FLAG_COLS, STATUS_COLS, STATUS_LABELS
+from .gaps import IMPUTED_COL, IMPUTED_DTYPE
+from .scoring import OUTPUT_COLS
+
+
+CATEGORY_COLS = ["company", "country"]
+SCORE_DTYPE = np.float32
+FLAG_DTYPE = np.uint16
+STATUS_DTYPE = pd.CategoricalDtype(STATUS_LABELS)
+# tolerance when comparing float32 scores with a float64 recompute
+SCORE_ATOL = 1e-6
+
+
+def quarter_dtype(quarters):
+    """Ordered categorical dtype over the distinct "YYYY-Qn" labels."""
+    return pd.CategoricalDtype(sorted(pd.unique(pd.Series(quarters).dropna().astype(str))), ordered=True)
+
+
+def compact(df):
+    """`df` converted to the declared schema; columns it does not have are skipped."""
+    out = {}
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            out[col] = df[col].astype("category")
+    if "quarter" in df.columns:
+        out["quarter"] = df["quarter"].astype(str).astype(quarter_dtype(df["quarter"]))
+    if "date" in df.columns:
+        out["date"] = pd.to_datetime(df["date"])
+    for col in OUTPUT_COLS:
+        if col in df.columns:
+            out[col] = df[col].astype(SCORE_DTYPE)
+    for col in STATUS_COLS:
+        if col in df.columns:
+            out[col] = df[col].astype(STATUS_DTYPE)
+    for col in FLAG_COLS:
+        if col in df.columns:
+            out[col] = df[col].astype(FLAG_DTYPE)
+    if IMPUTED_COL in df.columns:
+        out[IMPUTED_COL] = df[IMPUTED_COL].fillna(0).astype(IMPUTED_DTYPE)
+    return df.assign(**out)
+
+
+def memory_usage(df):
+    """Deep in-memory size of `df` in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
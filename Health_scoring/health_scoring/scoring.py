@@ -0,0 +1,252 @@
+"""Local / global percentile scoring.
+
+Vectorized version of the `score_global_local.ipynb` cells: every percentile
+rank is computed in one grouped NumPy pass over a (rows x indicators) array and
+every composite score in a single masked matrix product.
+
+`score(df, window=N)` is the point-in-time mode: each quarter's local
+percentile ranks it only against the same company's trailing N quarters, so
+scores never depend on later filings (see `rolling_pct_rank`).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# raw ratios ranked into percentiles (order matters for the weight matrix)
+INDICATORS = ["ROA", "ROE", "net_margin", "current_ratio", "cash_ratio", "debt_to_equity"]
+
+LOCAL_PCT_COLS = [f"{col}_pct" for col in INDICATORS]
+GLOBAL_PCT_COLS = [f"{col}_pct_global" for col in INDICATORS]
+
+SCORES = ["profitability", "liquidity", "solvency", "leverage_adjusted"]
+LOCAL_SCORE_COLS = [f"score_{s}_local" for s in SCORES]
+GLOBAL_SCORE_COLS = [f"score_{s}_global" for s in SCORES]
+
+# composite score -> percentile columns averaged (NaN-skipping mean, like DataFrame.mean(axis=1))
+_LOCAL_RECIPES = {
+    "score_profitability_local": ["ROA_pct", "ROE_pct", "net_margin_pct"],
+    "score_liquidity_local": ["current_ratio_pct", "cash_ratio_pct"],
+    "score_solvency_local": ["inv_debt_pct"],
+    "score_leverage_adjusted_local": ["ROE_pct", "inv_debt_pct"],
+}
+_GLOBAL_RECIPES = {
+    "score_profitability_global": ["ROA_pct_global", "ROE_pct_global", "net_margin_pct_global"],
+    "score_liquidity_global": ["current_ratio_pct_global", "cash_ratio_pct_global"],
+    # the global debt percentile is stored already inverted (1 - rank)
+    "score_solvency_global": ["debt_to_equity_pct_global"],
+    "score_leverage_adjusted_global": ["ROE_pct_global", "debt_to_equity_pct_global"],
+}
+
+# column layout of the percentile block, same order as dataset1_complet.csv
+PCT_BLOCK = LOCAL_PCT_COLS + ["inv_debt_pct"] + GLOBAL_PCT_COLS
+OUTPUT_COLS = (
+    LOCAL_PCT_COLS
+    + ["score_profitability_local", "score_liquidity_local", "score_solvency_local",
+       "inv_debt_pct", "score_leverage_adjusted_local"]
+    + GLOBAL_PCT_COLS
+    + GLOBAL_SCORE_COLS
+)
+
+
+def _weight_matrix():
+    recipes = {**_LOCAL_RECIPES, **_GLOBAL_RECIPES}
+    weights = np.zeros((len(PCT_BLOCK), len(recipes)))
+    for j, members in enumerate(recipes.values()):
+        for col in members:
+            weights[PCT_BLOCK.index(col), j] = 1.0
+    return list(recipes), weights
+
+
+_SCORE_NAMES, _WEIGHTS = _weight_matrix()
+COMPOSITE_COLS = list(_SCORE_NAMES)
+LOCAL_BLOCK_WIDTH = len(LOCAL_PCT_COLS) + 1
+
+
+def group_codes(keys):
+    """Integer codes for a grouping column; missing keys get -1 (dropped like groupby)."""
+    codes, uniques = pd.factorize(keys, sort=True)
+    return codes.astype(np.int64), uniques
+
+
+def grouped_pct_rank(values, codes):
+    """Percentile rank of every column of `values` within the groups given by `codes`.
+
+    Matches `df.groupby(key)[col].rank(pct=True)` (average ties, NaN kept as NaN
+    and excluded from the denominator) for all columns at once.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return grouped_pct_rank(values[:, None], codes)[:, 0]
+
+    n, k = values.shape
+    out = np.full((n, k), np.nan)
+    if n == 0:
+        return out
+
+    codes = np.asarray(codes, dtype=np.int64)
+    missing_key = codes < 0
+    n_groups = int(codes.max()) + 2
+    codes = np.where(missing_key, n_groups - 1, codes)
+
+    # position of each value in its column's global order (NaN sorts last), then
+    # one argsort of (group, position) sorts every column by group and value
+    rows = np.arange(n)
+    order = np.argsort(values, axis=0, kind="stable")
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.broadcast_to(rows[:, None], (n, k)), axis=0)
+    order = np.argsort(codes[:, None] * n + position, axis=0)
+
+    sorted_vals = np.take_along_axis(values, order, axis=0)
+    sorted_codes = codes[order]
+    idx = np.broadcast_to(rows[:, None], (n, k))
+
+    new_group = np.ones((n, k), dtype=bool)
+    new_group[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    new_run = new_group.copy()
+    new_run[1:] |= sorted_vals[1:] != sorted_vals[:-1]
+    run_end = np.ones((n, k), dtype=bool)
+    run_end[:-1] = new_run[1:]
+
+    group_start = np.maximum.accumulate(np.where(new_group, idx, 0), axis=0)
+    run_start = np.maximum.accumulate(np.where(new_run, idx, 0), axis=0)
+    run_stop = np.minimum.accumulate(np.where(run_end, idx, n - 1)[::-1], axis=0)[::-1]
+    avg_rank = (run_start + run_stop) / 2.0 - group_start + 1.0
+
+    valid = ~np.isnan(values)
+    counts = np.bincount(
+        (codes[:, None] * k + np.arange(k)).ravel(),
+        weights=valid.ravel(),
+        minlength=n_groups * k,
+    ).reshape(n_groups, k)
+    pct = avg_rank / counts[sorted_codes, np.arange(k)]
+    pct[np.isnan(sorted_vals)] = np.nan
+
+    np.put_along_axis(out, order, pct, axis=0)
+    out[missing_key] = np.nan
+    return out
+
+
+def quarter_ordinal(quarters):
+    """Consecutive integers for "YYYY-Qn" labels (year * 4 + n - 1); missing labels give -1."""
+    codes, uniques = pd.factorize(pd.Series(quarters).astype("string"))
+    parts = pd.Series(uniques).str.extract(r"^(\d{4})-?Q([1-4])$")
+    if parts.isna().any(axis=None):
+        bad = list(pd.Series(uniques)[parts.isna().any(axis=1).to_numpy()][:3])
+        raise ValueError(f"quarters must look like 2024-Q3, got {bad}")
+    ordinal = parts[0].astype(np.int64).to_numpy() * 4 + parts[1].astype(np.int64).to_numpy() - 1
+    return np.where(codes >= 0, ordinal[codes] if len(ordinal) else -1, -1)
+
+
+def rolling_pct_rank(values, codes, times, window):
+    """Percentile rank of each row among its group's rows with time in (t - window, t].
+
+    Point-in-time counterpart of `grouped_pct_rank`: same average-tie and NaN
+    rules, but the denominator is the trailing window of the row's own group.
+    Rows are sorted by (group, time) once; each row is then compared with the
+    at most `window - 1` rows before it, one vectorized pass per lag, so the
+    cost is O(n * window) with no per-window re-sort.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return rolling_pct_rank(values[:, None], codes, times, window)[:, 0]
+    if window < 1:
+        raise ValueError("window must be at least 1 quarter")
+
+    codes = np.asarray(codes, dtype=np.int64)
+    times = np.asarray(times, dtype=np.int64)
+    order = np.lexsort((times, codes))
+    vals, codes, times = values[order], codes[order], times[order]
+
+    less = np.zeros(vals.shape)
+    equal = np.zeros(vals.shape)
+    valid = np.zeros(vals.shape)
+    for lag in range(min(window, len(vals))):
+        prev = vals[:len(vals) - lag]
+        cur = vals[lag:]
+        in_window = (codes[lag:] == codes[:len(vals) - lag]) & (times[lag:] - times[:len(vals) - lag] < window)
+        in_window = in_window[:, None] & ~np.isnan(prev)
+        less[lag:] += in_window & (prev < cur)
+        equal[lag:] += in_window & (prev == cur)
+        valid[lag:] += in_window
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = (less + (equal + 1) / 2) / valid
+    pct[np.isnan(vals) | (codes < 0)[:, None] | (times < 0)[:, None]] = np.nan
+
+    out = np.empty_like(pct)
+    out[order] = pct
+    return out
+
+
+def nanmean_combine(block, weights):
+    """NaN-skipping weighted means of `block` columns; all-NaN rows give NaN."""
+    present = ~np.isnan(block)
+    totals = np.where(present, block, 0.0) @ weights
+    counts = present.astype(np.float64) @ weights
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def percentile_block(df, local_by="company", global_by="quarter", window=None):
+    """(rows x PCT_BLOCK) array of local and global percentiles for `df`."""
+    raw = df[INDICATORS].to_numpy(dtype=np.float64)
+    local_codes = group_codes(df[local_by])[0]
+    if window is None:
+        local = grouped_pct_rank(raw, local_codes)
+    else:
+        local = rolling_pct_rank(raw, local_codes, quarter_ordinal(df[global_by]), window)
+    global_ = grouped_pct_rank(raw, group_codes(df[global_by])[0])
+    return assemble_block(local, global_)
+
+
+def local_block(local):
+    """Local percentiles plus the derived `inv_debt_pct` column."""
+    debt = INDICATORS.index("debt_to_equity")
+    return np.hstack([local, 1 - local[:, [debt]]])
+
+
+def global_block(global_):
+    """Global percentiles with the debt percentile inverted, as stored."""
+    debt = INDICATORS.index("debt_to_equity")
+    global_ = global_.copy()
+    global_[:, debt] = 1 - global_[:, debt]
+    return global_
+
+
+def assemble_block(local, global_):
+    """Stack local and global percentile arrays into the PCT_BLOCK layout."""
+    return np.hstack([local_block(local), global_block(global_)])
+
+
+def composite_scores(block):
+    """(rows x composite scores) array, columns in `_SCORE_NAMES` order."""
+    return nanmean_combine(block, _WEIGHTS)
+
+
+def scores_frame(block, index, composite=None):
+    """Percentile block + composite scores as a DataFrame in OUTPUT_COLS order."""
+    if composite is None:
+        composite = composite_scores(block)
+    data = dict(zip(PCT_BLOCK, block.T))
+    data.update(zip(_SCORE_NAMES, composite.T))
+    return pd.DataFrame({col: data[col] for col in OUTPUT_COLS}, index=index)
+
+
+def score(df, local_by="company", global_by="quarter", workers=1, window=None):
+    """Return `df` with every percentile and composite score column appended.
+
+    `df` needs `company`, `quarter` and the numeric INDICATORS columns (see
+    `dataset_unified.csv`). Local percentiles rank each indicator within its
+    company's history, global ones within the quarter. `workers` > 1 (or None
+    for one per CPU) ranks company and quarter partitions in a process pool.
+    With `window` set, local percentiles only use the trailing `window`
+    quarters (point-in-time mode, always computed in-process).
+    """
+    if workers != 1 and window is None:
+        from .parallel import score_parallel
+        return score_parallel(df, workers=workers, local_by=local_by, global_by=global_by)
+    block = percentile_block(df, local_by=local_by, global_by=global_by, window=window)
+    result = scores_frame(block, df.index)
+    base = df.drop(columns=[c for c in OUTPUT_COLS if c in df.columns])
+    return pd.concat([base, result], axis=1)
@@ -0,0 +1,170 @@
+"""Materialized score store.
+
+`materialize` runs scoring, thresholds and classification once and writes the
+result to a versioned Parquet file; the thresholds travel in the file's schema
+metadata, with the `thresholds.ThresholdService` state they come from so
+`incremental.update_store` can update them from the changed rows only.
+Readers (the Streamlit pages) only load the artifact. The frame is stored in
+the compact `schema` dtypes, with alerts as bitmasks. Macro series are not
+repeated on every row: the metadata holds one `MacroTable` per store and
+`load_store` joins it back unless asked not to. Sources whose macro values
+differ within a (country, quarter) keep them on the rows instead.
+
+    python -m health_scoring.store ../dataset_unified.csv app_streamlit/scores.v3.parquet
+    python -m health_scoring.store ../dataset_unified.csv filled.parquet --fill linear
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from .classify import classify
+from .gaps import STRATEGIES, fill_gaps
+from .loader import NUMERIC_COLUMNS, read_source, write_atomic
+from .macro import MACRO_COLUMNS, MacroTable, split_macro
+from .schema import compact
+from .scoring import GLOBAL_SCORE_COLS, LOCAL_SCORE_COLS, score
+from .thresholds import ThresholdService
+
+
+# 3: macro columns moved from the rows to a `MacroTable` in the metadata
+SCHEMA_VERSION = 3
+STORE_FILENAME = f"scores.v{SCHEMA_VERSION}.parquet"
+METADATA_KEY = b"health_scoring"
+# source ratios filled by `--fill`, in `imputed_flags` bit order
+FILL_COLUMNS = NUMERIC_COLUMNS
+
+
+def read_csv_any(path):
+    """Read either the raw `company;date;...` source or an already scored CSV."""
+    with open(path, encoding="utf-8-sig") as f:
+        header = f.readline()
+    if ";" in header:
+        return read_source(path)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def build(df, workers=1, fill="none", service=None, sketch_thresholds=False):
+    """Compact scores (if missing), statuses and alert flags for `df`, the thresholds used and their service.
+
+    With a `fill` strategy other than "none", gaps in the source ratios are
+    filled (`gaps.fill_gaps`) before scoring and `imputed_flags` marks them.
+    Thresholds come from `service` when given (already fed with the scores of
+    `df`), else from a new one built on the stored float32 scores: exact
+    quantiles, or a KLL sketch with `sketch_thresholds`.
+    """
+    if fill != "none":
+        df = fill_gaps(df, FILL_COLUMNS, strategy=fill)
+    if not set(LOCAL_SCORE_COLS + GLOBAL_SCORE_COLS) <= set(df.columns):
+        df = score(df, workers=workers)
+    df = compact(df.sort_values(["company", "quarter"], kind="stable").reset_index(drop=True))
+    if service is None:
+        service = ThresholdService.from_frame(df, exact=not sketch_thresholds)
+    thresholds = {"local": service.thresholds("local"), "global": service.thresholds("global")}
+    labels = classify(df, thresholds["local"], thresholds["global"], render=False)
+    return compact(pd.concat([df, labels], axis=1)), thresholds, service
+
+
+def write_store(df, thresholds, path, source=None, fill="none", service=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    meta = {"version": SCHEMA_VERSION, "thresholds": thresholds, "source": source, "fill": fill,
+            "columns": list(df.columns)}
+    if service is not None:
+        meta["threshold_state"] = service.to_dict()
+    if any(c in df.columns for c in MACRO_COLUMNS):
+        df, macro = split_macro(df)
+        meta["macro"] = macro.to_dict() if macro is not None else None
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        METADATA_KEY: json.dumps(meta).encode(),
+    })
+    write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+
+def materialize(source_path, path, workers=1, fill="none", sketch_thresholds=False):
+    """Score `source_path` and write the store to `path`; returns the metadata."""
+    df, thresholds, service = build(read_csv_any(source_path), workers=workers, fill=fill,
+                                    sketch_thresholds=sketch_thresholds)
+    source = {"path": os.path.basename(source_path), "sha256": file_hash(source_path)}
+    write_store(df, thresholds, path, source=source, fill=fill, service=service)
+    return {"version": SCHEMA_VERSION, "thresholds": thresholds, "source": source, "fill": fill}
+
+
+def read_metadata(path):
+    import pyarrow.parquet as pq
+
+    raw = pq.read_schema(path).metadata or {}
+    if METADATA_KEY not in raw:
+        raise ValueError(f"{path} is not a health_scoring store")
+    meta = json.loads(raw[METADATA_KEY])
+    if meta["version"] != SCHEMA_VERSION:
+        raise ValueError(f"{path} has store version {meta['version']}, expected {SCHEMA_VERSION}")
+    return meta
+
+
+def load_macro(meta):
+    """`MacroTable` of a store's metadata, or None if the store has no macro series."""
+    return MacroTable.from_dict(meta["macro"]) if meta.get("macro") is not None else None
+
+
+def load_store(path, macro=True):
+    """(DataFrame, metadata) of a materialized store.
+
+    With `macro`, the macro columns are joined back from the stored table (in
+    their original place); else the rows come without them and
+    `load_macro(meta)` gives the table. Stores without a table (see
+    `macro.split_macro`) always return the macro columns on the rows.
+    """
+    meta = read_metadata(path)
+    df = pd.read_parquet(path)
+    table = load_macro(meta)
+    if macro and table is not None:
+        df = table.join(df)[meta["columns"]]
+    return df, meta
+
+
+@functools.lru_cache(maxsize=32)
+def _hash_file(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """sha256 of a file, recomputed only when its mtime or size changes."""
+    stat = os.stat(path)
+    return _hash_file(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def ensure_store(path, source_path):
+    """Materialize `path` from `source_path` if missing or stale; return its hash."""
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source_path):
+        materialize(source_path, path)
+    return file_hash(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materialize the score store.")
+    parser.add_argument("source", help="dataset_unified.csv or an already scored CSV")
+    parser.add_argument("output", nargs="?", default=STORE_FILENAME)
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes (0 = one per CPU)")
+    parser.add_argument("--fill", choices=STRATEGIES, default="none", help="gap filling of the source ratios")
+    parser.add_argument("--sketch-thresholds", action="store_true",
+                        help="approximate p10/p90 with a KLL sketch instead of keeping every score")
+    args = parser.parse_args(argv)
+    meta = materialize(args.source, args.output, workers=args.workers or None, fill=args.fill,
+                       sketch_thresholds=args.sketch_thresholds)
+    print(f"wrote {args.output} (store v{meta['version']}, source {meta['source']['sha256'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
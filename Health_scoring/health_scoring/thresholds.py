@@ -0,0 +1,293 @@
+"""Streaming p10/p90 thresholds.
+
+`ThresholdService` keeps one quantile summary per score column instead of the
+full columns the pages used to call `.quantile()` on. Summaries are updated
+per partition in O(new rows) and can be merged across workers. The default
+summary keeps sorted runs and reproduces `Series.quantile` exactly, so the
+labels match the pages' p10/p90; `exact=False` swaps in a KLL sketch (bounded
+memory, ~1/k rank error) for sources too large to hold every score.
+
+    service = ThresholdService()
+    for part in score_chunked("dataset_unified.csv"):
+        service.update(part)
+    thresholds_dynamic = service.thresholds("local")
+
+Re-scored rows are swapped with `remove(old)` + `update(new)`: the exact
+summary deletes the old values, the sketch counts them in a second sketch of
+retracted values and answers quantiles on the difference. The store keeps the
+service in its metadata (`to_dict`) so `incremental.update_store` only feeds
+it the rows whose scores changed.
+"""
+
+import numpy as np
+
+from .classify import REVENUE_THRESHOLDS, THRESHOLD_QUANTILES, score_columns
+
+
+# normalized rank error of a KLL sketch is about this over k (99% of queries)
+KLL_RANK_ERROR = 1.65
+
+
+def _clean(values):
+    values = np.asarray(values, dtype=np.float64).ravel()
+    return values[~np.isnan(values)]
+
+
+def _weighted_quantile(items, weights, q):
+    """`Series.quantile(q)` of items with (possibly negative) integer weights."""
+    items, inverse = np.unique(items, return_inverse=True)
+    weights = np.bincount(inverse, weights=weights, minlength=len(items))
+    cum = np.maximum.accumulate(np.cumsum(weights))
+    if not len(cum) or cum[-1] <= 0:
+        return np.nan
+    position = q * (cum[-1] - 1)
+    lo, hi = np.floor(position), np.ceil(position)
+    at = np.searchsorted(cum, [lo, hi], side="right")
+    a, b = items[np.minimum(at, len(items) - 1)]
+    return a + (b - a) * (position - lo)
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch over float values (NaN ignored)."""
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.seed = seed
+        self.retracted = None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def count(self):
+        """Number of values added and not removed."""
+        return self.n - (self.retracted.n if self.retracted is not None else 0)
+
+    def rank_error(self):
+        """Bound on the normalized rank error of `quantile`, retracted values included."""
+        if not self.count:
+            return 0.0
+        return KLL_RANK_ERROR / self.k * (2 * self.n - self.count) / self.count
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) < self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # an odd item stays behind; every other item moves up with double weight
+            keep = items[len(items) - len(items) % 2:]
+            pairs = items[:len(items) - len(keep)]
+            promoted = pairs[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # capacities of lower levels shrink when a level is added, so start over
+            level = 0
+
+    def update(self, values):
+        values = _clean(values)
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+        return self
+
+    def remove(self, values):
+        """Retract values added earlier; they are subtracted from every rank."""
+        values = _clean(values)
+        if not len(values):
+            return self
+        if self.retracted is None:
+            self.retracted = KLLSketch(k=self.k, seed=self.seed + 1)
+        self.retracted.update(values)
+        return self
+
+    def merge(self, other):
+        if other.retracted is not None:
+            if self.retracted is None:
+                self.retracted = KLLSketch(k=self.k, seed=self.seed + 1)
+            self.retracted.merge(other.retracted)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def weighted(self):
+        """(items, weights) of the sketch; retracted items carry negative weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+        if self.retracted is not None:
+            gone, gone_weights = self.retracted.weighted()
+            items, weights = np.concatenate([items, gone]), np.concatenate([weights, -gone_weights])
+        return items, weights
+
+    def quantile(self, q):
+        """Approximate `Series.quantile(q)` (linear interpolation between ranks)."""
+        return _weighted_quantile(*self.weighted(), q)
+
+    def to_dict(self):
+        return {
+            "kind": "kll", "k": self.k, "seed": self.seed, "n": self.n,
+            "levels": [lv.tolist() for lv in self.levels],
+            "retracted": self.retracted.to_dict() if self.retracted is not None else None,
+        }
+
+
+class ExactQuantiles:
+    """Exact quantiles from sorted runs; updates are O(new rows log new rows)."""
+
+    def __init__(self):
+        self.n = 0
+        self.runs = []
+        self._sorted = None
+
+    @property
+    def count(self):
+        return self.n
+
+    def rank_error(self):
+        return 0.0
+
+    def update(self, values):
+        values = _clean(values)
+        if len(values):
+            self.runs.append(np.sort(values))
+            self.n += len(values)
+            self._sorted = None
+        return self
+
+    def remove(self, values):
+        """Delete values added earlier (ValueError if some were never added)."""
+        values = _clean(values)
+        if not len(values):
+            return self
+        items, counts = np.unique(np.concatenate(self.runs) if self.runs else np.empty(0), return_counts=True)
+        gone, gone_counts = np.unique(values, return_counts=True)
+        at = np.searchsorted(items, gone)
+        found = at < len(items)
+        found[found] = items[at[found]] == gone[found]
+        if not found.all() or (counts[at] < gone_counts).any():
+            raise ValueError("cannot remove values that were not added")
+        counts[at] -= gone_counts
+        self._sorted = np.repeat(items, counts)
+        self.runs = [self._sorted]
+        self.n = len(self._sorted)
+        return self
+
+    def merge(self, other):
+        self.runs.extend(other.runs)
+        self.n += other.n
+        self._sorted = None
+        return self
+
+    def quantile(self, q):
+        if not self.n:
+            return np.nan
+        if self._sorted is None:
+            self._sorted = np.sort(np.concatenate(self.runs))
+            self.runs = [self._sorted]
+        return float(np.quantile(self._sorted, q))
+
+    def to_dict(self):
+        values = np.sort(np.concatenate(self.runs)) if self.runs else np.empty(0)
+        return {"kind": "exact", "n": self.n, "values": values.tolist()}
+
+
+def summary_from_dict(state):
+    if state["kind"] == "exact":
+        return ExactQuantiles().update(state["values"])
+    sketch = KLLSketch(k=state["k"], seed=state.get("seed", 0))
+    sketch.levels = [np.asarray(lv, dtype=np.float64) for lv in state["levels"]]
+    sketch.n = state["n"]
+    if state.get("retracted") is not None:
+        sketch.retracted = summary_from_dict(state["retracted"])
+    return sketch
+
+
+class ThresholdService:
+    """Low/high cut points for every local and global score, built incrementally."""
+
+    def __init__(self, exact=True, k=200, quantiles=THRESHOLD_QUANTILES):
+        self.exact = exact
+        self.k = k
+        self.quantiles = tuple(quantiles)
+        self.columns = score_columns("local") + score_columns("global")
+        self.summaries = {col: self._new_summary(i) for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        return cls(**kwargs).update(df)
+
+    def update(self, df):
+        """Add the score columns of a partition (missing columns are skipped)."""
+        for col in self.columns:
+            if col in df.columns:
+                self.summaries[col].update(df[col].to_numpy())
+        return self
+
+    def remove(self, df):
+        """Retract the score columns of rows added earlier (e.g. before a re-score)."""
+        for col in self.columns:
+            if col in df.columns:
+                self.summaries[col].remove(df[col].to_numpy())
+        return self
+
+    def _new_summary(self, i):
+        return ExactQuantiles() if self.exact else KLLSketch(k=self.k, seed=i)
+
+    def stale(self):
+        """Columns whose retracted values outnumber the live ones."""
+        return [col for col, s in self.summaries.items() if s.count < s.n - s.count]
+
+    def rebuild(self, df, columns=None):
+        """Summaries of `columns` (default: the stale ones) rebuilt from the scores of `df`."""
+        for col in self.stale() if columns is None else columns:
+            self.summaries[col] = self._new_summary(self.columns.index(col)).update(df[col].to_numpy())
+        return self
+
+    def rank_error(self):
+        """Largest normalized rank error bound over the score columns."""
+        return max(s.rank_error() for s in self.summaries.values())
+
+    def merge(self, other):
+        if other.exact != self.exact or other.quantiles != self.quantiles:
+            raise ValueError("cannot merge threshold services with different settings")
+        for col in self.columns:
+            self.summaries[col].merge(other.summaries[col])
+        return self
+
+    def thresholds(self, scope="local"):
+        """Same structure as `classify.compute_thresholds(df, scope)`."""
+        low_q, high_q = self.quantiles
+        result = {}
+        for col in score_columns(scope):
+            summary = self.summaries[col]
+            result[col.replace(f"_{scope}", "")] = {"low": summary.quantile(low_q), "high": summary.quantile(high_q)}
+        if scope == "local":
+            result["revenue_growth"] = dict(REVENUE_THRESHOLDS)
+        return result
+
+    def to_dict(self):
+        return {
+            "exact": self.exact,
+            "k": self.k,
+            "quantiles": list(self.quantiles),
+            "summaries": {col: s.to_dict() for col, s in self.summaries.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        service = cls(exact=state["exact"], k=state.get("k", 200), quantiles=state["quantiles"])
+        service.summaries = {col: summary_from_dict(s) for col, s in state["summaries"].items()}
+        return service
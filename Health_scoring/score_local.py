@@ -1,8 +1,15 @@
+import os
+
 import pandas as pd
 import streamlit as st
 
-# Load your actual normalized dataset (replace this with your real DataFrame)
-df = dataset_normalized.copy()
+from health_scoring import score
+from health_scoring.loader import read_source
+
+# Load the source dataset and score it with the shared engine
+current_dir = os.path.dirname(os.path.abspath(__file__))
+csv_path = os.path.normpath(os.path.join(current_dir, '..', 'dataset_unified.csv'))
+df = score(read_source(csv_path))
 
 # Define helper functions
 def classify_score(score):
@@ -15,25 +22,27 @@ def classify_score(score):
     else:
         return "Green"
 
+# revenue_growth is a fraction in dataset_unified.csv (0.05 = 5%), so the
+# ±10% alert cut-offs are ±0.1, as on the dashboard pages
 def classify_revenue_alert(value):
     if pd.isna(value):
         return "Unknown"
-    elif value < -10:
+    elif value < -0.1:
         return "Rev ↓"
-    elif value > 10:
+    elif value > 0.1:
         return "Rev ↑"
     else:
         return "Stable"
 
 def alert_summary(row):
     alerts = []
-    if classify_score(row['score_profitability']) == 'Red':
+    if classify_score(row['score_profitability_local']) == 'Red':
         alerts.append("Profit")
-    if classify_score(row['score_liquidity']) == 'Red':
+    if classify_score(row['score_liquidity_local']) == 'Red':
         alerts.append("Liquidity")
-    if classify_score(row['score_solvency']) == 'Red':
+    if classify_score(row['score_solvency_local']) == 'Red':
         alerts.append("Solvency")
-    if classify_score(row['score_leverage_ajusted_localc']) == 'Red':
+    if classify_score(row['score_leverage_adjusted_local']) == 'Red':
         alerts.append("Adj. Leverage")
 
     alert_text = f"Red ({', '.join(alerts)})" if alerts else ""
@@ -55,19 +64,19 @@ selected_company = st.selectbox("Select a company:", sorted(companies))
 
 # Filter data
 df_filtered = df[df['company'] == selected_company].copy()
-df_filtered["Rev Growth"] = df_filtered["revenue_growth"].apply(lambda x: f"{x:.1f}%" if pd.notna(x) else "")
+df_filtered["Rev Growth"] = df_filtered["revenue_growth"].apply(lambda x: f"{x:.1%}" if pd.notna(x) else "")
 df_filtered["Alert Summary"] = df_filtered.apply(alert_summary, axis=1)
 
 # Table output
 summary = df_filtered[[
-    "quarter", "score_profitability", "score_liquidity", "score_solvency",
-    "score_leverage_ajusted_localc", "Rev Growth", "Alert Summary"
+    "quarter", "score_profitability_local", "score_liquidity_local", "score_solvency_local",
+    "score_leverage_adjusted_local", "Rev Growth", "Alert Summary"
 ]].rename(columns={
     "quarter": "Quarter",
-    "score_profitability": "Profitability",
-    "score_liquidity": "Liquidity",
-    "score_solvency": "Solvency",
-    "score_leverage_ajusted_localc": "Adj. Leverage"
+    "score_profitability_local": "Profitability",
+    "score_liquidity_local": "Liquidity",
+    "score_solvency_local": "Solvency",
+    "score_leverage_adjusted_local": "Adj. Leverage"
 }).reset_index(drop=True)
 
 st.dataframe(summary, use_container_width=True)
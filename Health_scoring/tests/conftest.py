@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+# the benchmarks' synthetic data and legacy baselines double as test fixtures
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
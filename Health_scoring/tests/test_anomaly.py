@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.anomaly import GROUPS, AnomalyModel, detect, error_frame, prepare, score_only
+from synthetic import synthetic_source
+
+FLAGS = [f"is_anomaly_{group}" for group in GROUPS]
+
+
+@pytest.fixture(scope="module")
+def source():
+    return synthetic_source(3, 16, seed=11)
+
+
+def _autoencoder(df, **kwargs):
+    pytest.importorskip("keras")
+    return detect(df, backend="autoencoder", epochs=3, batch_size=32, **kwargs)
+
+
+def test_batched_fit_has_the_per_company_layout(source):
+    batched = _autoencoder(source)
+    per_company = pd.concat([_autoencoder(part) for _, part in source.groupby("company", sort=True)],
+                            ignore_index=True)
+
+    assert list(batched.columns) == list(GROUPS) + ["date", "company"] + FLAGS
+    assert batched.shape == per_company.shape
+    pd.testing.assert_frame_equal(batched[["date", "company"]], per_company[["date", "company"]])
+
+
+def test_flags_are_errors_above_each_company_cutoff(source):
+    df, X, codes, companies = prepare(source)
+    rng = np.random.default_rng(0)
+    errors = {group: rng.random(len(df)) for group in GROUPS}
+    out = error_frame(df, errors)
+
+    cutoffs = pd.DataFrame(errors).groupby(df["company"].to_numpy()).quantile(0.95)
+    for group in GROUPS:
+        limit = cutoffs[group].reindex(df["company"]).to_numpy()
+        np.testing.assert_array_equal(out[f"is_anomaly_{group}"].to_numpy(), errors[group] > limit)
+        # 16 rows per company: exactly one sits above its 95th percentile
+        assert (out.groupby("company")[f"is_anomaly_{group}"].sum() == 1).all()
+
+
+def test_fixed_seed_is_deterministic(source):
+    first = _autoencoder(source, seed=3)
+    second = _autoencoder(source, seed=3)
+    pd.testing.assert_frame_equal(first, second)
+
+
+@pytest.mark.parametrize("backend, kwargs", [
+    ("pca", {}),
+    ("isolation_forest", {"n_estimators": 20}),
+    ("autoencoder", {"epochs": 3, "batch_size": 32}),
+])
+def test_saved_model_scores_like_the_fitted_one(source, tmp_path, backend, kwargs):
+    if backend == "autoencoder":
+        pytest.importorskip("keras")
+    model = AnomalyModel(backend, **kwargs)
+    model.fit(source)
+    model.save(tmp_path / backend)
+
+    pd.testing.assert_frame_equal(score_only(source, tmp_path / backend), model.score(source))
@@ -0,0 +1,123 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from health_scoring.api import MicroBatcher, ScoringService, create_app, parse_rows
+from health_scoring.store import build
+from synthetic import synthetic_source
+
+
+@pytest.fixture(scope="module")
+def service():
+    df, thresholds, _ = build(synthetic_source(15, 10, seed=7))
+    return ScoringService(df, thresholds)
+
+
+def _row(service, i, **changes):
+    stored = service.index.frame.iloc[i]
+    row = {"company": str(stored["company"]), "quarter": str(stored["quarter"]), "ROA": 0.5, "ROE": 0.07,
+           "debt_to_equity": 14.0, "current_ratio": 1.1, "net_margin": 0.2, "cash_ratio": 0.4}
+    return {**row, **changes}
+
+
+def test_parse_rows_coerces_numbers_and_rejects_text():
+    frame = parse_rows([{"company": "A", "quarter": "2020-Q1", "ROA": "1.5", "ROE": None}])
+    assert frame.at[0, "ROA"] == 1.5 and np.isnan(frame.at[0, "ROE"])
+    with pytest.raises(ValueError, match="ROA"):
+        parse_rows([{"company": "A", "quarter": "2020-Q1", "ROA": "abc"}])
+    with pytest.raises(ValueError, match="ROE"):
+        parse_rows([{"company": "A", "quarter": "2020-Q1", "ROE": [1]}])
+
+
+def test_group_pairs_match_per_row_lookup(service):
+    index = service.index
+    rows = [_row(service, i) for i in range(0, len(index), 7)]
+    rows += [{"company": "Unknown Bank", "quarter": rows[0]["quarter"]}, {"company": rows[0]["company"], "quarter": "1999-Q1"}]
+    (local_owners, local_pos), (global_owners, global_pos) = service._group_pairs(parse_rows(rows))
+    for i, row in enumerate(rows):
+        company, quarter = row["company"], row["quarter"]
+        known_company, known_quarter = company in index.companies, quarter in index.quarters
+        same = index.row(company, quarter) if known_company and known_quarter else -1
+        span = index.company_span(company) if known_company else slice(0, 0)
+        local = [p for p in range(span.start, span.stop) if p != same]
+        global_ = [p for p in (index.quarter_rows(quarter) if known_quarter else []) if p != same]
+        assert list(local_pos[local_owners == i]) == local
+        assert list(global_pos[global_owners == i]) == global_
+
+
+def test_batch_failure_only_fails_the_bad_request():
+    calls = []
+
+    def fn(items):
+        calls.append(len(items))
+        if "bad" in items:
+            raise ValueError("bad item")
+        return [item.upper() for item in items]
+
+    async def run():
+        batcher = MicroBatcher(fn, max_delay=0.05)
+        results = await asyncio.gather(
+            batcher.submit(["a", "b"]), batcher.submit(["bad"]), batcher.submit(["c"]), return_exceptions=True,
+        )
+        await batcher.close()
+        return results
+
+    ok1, failed, ok2 = asyncio.run(run())
+    assert ok1 == ["A", "B"] and ok2 == ["C"]
+    assert isinstance(failed, ValueError)
+    assert calls[0] == 4
+
+
+class _Abort(BaseException):
+    """Escapes `except Exception`, so it takes the batching task down."""
+
+
+@pytest.mark.parametrize("failure", [RuntimeError("scoring failed"), None, _Abort()])
+def test_batcher_recovers_after_a_failed_batch(failure):
+    calls = []
+
+    def fn(items):
+        calls.append(items)
+        if len(calls) == 1:
+            if failure is None:
+                return None
+            raise failure
+        return [item.upper() for item in items]
+
+    async def run():
+        batcher = MicroBatcher(fn, max_delay=0.01)
+        try:
+            first = await asyncio.wait_for(batcher.submit(["a"]), 5)
+        except BaseException as exc:
+            first = exc
+        second = await asyncio.wait_for(batcher.submit(["b", "c"]), 5)
+        await batcher.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, BaseException) and not isinstance(first, asyncio.TimeoutError)
+    if failure is not None:
+        assert first is failure
+    assert second == ["B", "C"]
+
+
+def test_http_bad_row_is_rejected_and_others_succeed(service):
+    pytest.importorskip("aiohttp")
+    from aiohttp.test_utils import TestClient, TestServer
+
+    async def run():
+        async with TestClient(TestServer(create_app(service, max_delay=0.05))) as client:
+            good, bad = _row(service, 0), _row(service, 1, ROA="abc")
+            responses = await asyncio.gather(
+                client.post("/score", json={"rows": [good]}),
+                client.post("/score", json={"rows": [bad]}),
+                client.post("/score", json={"rows": [good, _row(service, 2)]}),
+            )
+            return [(r.status, await r.json()) for r in responses]
+
+    (s1, body1), (s2, body2), (s3, body3) = asyncio.run(run())
+    assert (s1, s2, s3) == (200, 400, 200)
+    assert "ROA" in body2["error"]
+    assert len(body1["rows"]) == 1 and len(body3["rows"]) == 2
+    assert body1["rows"][0] == body3["rows"][0]
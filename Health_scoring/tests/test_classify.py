@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from bench_classify import legacy_classify, synthetic_scores
+from health_scoring.classify import classify, compute_thresholds
+from health_scoring.scoring import GLOBAL_SCORE_COLS, LOCAL_SCORE_COLS, SCORES
+
+
+def _on_thresholds(thresholds_local, thresholds_global, rows=40, seed=1):
+    """Rows whose scores sit exactly on a low/high cut point, or are missing."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for scope, cols, thresholds in (("local", LOCAL_SCORE_COLS, thresholds_local),
+                                    ("global", GLOBAL_SCORE_COLS, thresholds_global)):
+        for s, col in zip(SCORES, cols):
+            cut = thresholds[f"score_{s}"]
+            data[col] = rng.choice([cut["low"], cut["high"], np.nan, 0.5], rows)
+    data["revenue_growth"] = rng.choice([-0.1, 0.1, np.nan, 0.0], rows)
+    return pd.DataFrame(data)
+
+
+def test_classify_matches_rowwise_pages():
+    df = synthetic_scores(2000, seed=3, missing=0.15)
+    thresholds_local = compute_thresholds(df, "local")
+    thresholds_global = compute_thresholds(df, "global")
+    df = pd.concat([df, _on_thresholds(thresholds_local, thresholds_global)], ignore_index=True)
+
+    fast = classify(df, thresholds_local, thresholds_global).astype(str)
+    slow = legacy_classify(df, thresholds_local, thresholds_global)
+    pd.testing.assert_frame_equal(fast, slow)
+
+
+def test_all_missing_scores_are_insufficient():
+    df = synthetic_scores(5).mask(lambda d: d.notna())
+    out = classify(df, compute_thresholds(synthetic_scores(50), "local"), compute_thresholds(synthetic_scores(50), "global"))
+    assert (out["Local Status"] == "Insufficient Data").all()
+    assert (out["Local Alert Summary"] == "").all()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.correlation import correlate, to_matrix
+from health_scoring.loader import NUMERIC_COLUMNS
+from synthetic import synthetic_source
+
+
+@pytest.fixture(scope="module")
+def source():
+    df = synthetic_source(30, 12, seed=2)
+    # ties, and a column missing on some rows only
+    df["current_ratio"] = df["current_ratio"].round(1)
+    df.loc[df.index % 5 == 0, "cash_ratio"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_pooled_matrix_matches_pandas(source, method):
+    matrix = to_matrix(correlate(source, method=method))
+    expected = source[NUMERIC_COLUMNS].corr(method=method)
+    pd.testing.assert_frame_equal(matrix, expected, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_per_company_spearman_matches_pandas(source):
+    corr = correlate(source, method="spearman", by="company")
+    for company, rows in source.groupby("company"):
+        matrix = to_matrix(corr[corr["company"] == company].drop(columns="company"))
+        expected = rows[NUMERIC_COLUMNS].corr(method="spearman")
+        pd.testing.assert_frame_equal(matrix, expected, check_exact=False, rtol=1e-9, atol=1e-12)
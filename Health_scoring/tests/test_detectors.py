@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from health_scoring.anomaly import GROUPS, flag_anomalies, get_detector
+from health_scoring.detectors import group_features
+
+
+def _correlated_features(rows, seed=0):
+    """Standardized-looking features whose groups follow a fixed linear pattern, 16 rows per company."""
+    rng = np.random.default_rng(seed)
+    x, y, z, g, c = rng.normal(0, 1, (5, rows))
+    noise = rng.normal(0, 0.05, (rows, 7))
+    columns = {
+        "ROE": x, "ROA": y, "net_margin": x + y,   # rentabilité: a plane
+        "debt_to_equity": z, "current_ratio": z,   # solvabilité: a line
+        "cash_ratio": g, "revenue_growth": c,
+    }
+    X = np.column_stack([columns[f] for f in group_features(GROUPS)]) + noise
+    return X.astype(np.float32), np.repeat(np.arange(rows // 16), 16).astype(np.int32)
+
+
+# off the group patterns above, and far out on the single-feature groups
+OUTLIER = {"ROE": 4, "ROA": 4, "net_margin": -4, "debt_to_equity": 4, "current_ratio": -4,
+           "cash_ratio": 8, "revenue_growth": -8}
+
+
+@pytest.mark.parametrize("backend", ["pca", "isolation_forest"])
+def test_backend_flags_an_injected_outlier(backend):
+    X, codes = _correlated_features(128)
+    row = 21
+    X[row] = [OUTLIER[f] for f in group_features(GROUPS)]
+    # fitted on the rows it scores, as AnomalyModel.fit does
+    detector = get_detector(backend, GROUPS).fit(X, codes, n_companies=8)
+    errors = detector.reconstruction_errors(X, codes)
+
+    assert list(errors) == list(GROUPS)
+    flags = flag_anomalies(errors, codes)
+    for group, values in errors.items():
+        assert values.shape == (len(X),)
+        assert np.argmax(values) == row
+        assert flags[f"is_anomaly_{group}"][row]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="unknown anomaly backend"):
+        get_detector("lof")
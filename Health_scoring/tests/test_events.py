@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.anomaly import GROUPS
+from health_scoring.events import EVENT_TYPES, ORIGINS, EventStore
+
+ALL = list(GROUPS)
+
+
+def _errors(rows):
+    """error_frame-like rows from (date, company, country)."""
+    df = pd.DataFrame(rows, columns=["date", "company", "country"])
+    df["date"] = pd.to_datetime(df["date"])
+    for g in ALL:
+        df[g] = 1.0
+        df[f"is_anomaly_{g}"] = True
+    return df
+
+
+def _event(date, event, company="", country="", target="", macro=False):
+    return {"date": date, "company": company, "country": country, "event": event, "target": target, "macro": macro}
+
+
+def _events_by_row(out, group=ALL[0]):
+    return out.loc[out["error_type"] == group, "event"].tolist()
+
+
+def test_company_country_and_global_scopes():
+    store = EventStore([
+        _event("2020-02-10", "company", company="A"),
+        _event("2020-05-10", "country", country="France", macro=True),
+        _event("2020-08-10", "global", macro=True),
+    ])
+    errors = _errors([
+        ("2020-03-31", "A", "France"), ("2020-03-31", "B", "France"),
+        ("2020-06-30", "B", "France"), ("2020-06-30", "C", "USA"),
+        ("2020-09-30", "C", "USA"),
+    ])
+    out = store.attribute(errors)
+
+    assert _events_by_row(out) == ["company", np.nan, "country", np.nan, "global"]
+    assert out.loc[out["error_type"] == ALL[0], "event_type"].tolist() == [
+        EVENT_TYPES["internal"], EVENT_TYPES["none"], EVENT_TYPES["external"], EVENT_TYPES["none"], EVENT_TYPES["external"],
+    ]
+    # countries can also come from a {company: country} map
+    mapped = store.attribute(errors.drop(columns="country"), countries={"A": "France", "B": "France", "C": "USA"})
+    pd.testing.assert_frame_equal(mapped, out)
+
+
+def test_quarter_and_day_windows():
+    store = EventStore([_event("2020-04-03", "early April", company="A")])
+    errors = _errors([("2020-03-31", "A", "France")])
+
+    assert _events_by_row(store.attribute(errors)) == [np.nan]
+    assert _events_by_row(store.attribute(errors, window=5)) == ["early April"]
+    assert _events_by_row(store.attribute(errors, window=2)) == [np.nan]
+    assert _events_by_row(store.attribute(errors, window=(0, 3))) == ["early April"]
+    assert _events_by_row(store.attribute(errors, window=(30, 0))) == [np.nan]
+
+
+def test_nearest_event_wins_and_ties_go_to_the_earlier_one():
+    errors = _errors([("2020-03-31", "A", "France")])
+    store = EventStore([
+        _event("2020-03-11", "20 days before", company="A"),
+        _event("2020-04-05", "5 days after", company="A"),
+    ])
+    assert _events_by_row(store.attribute(errors, window=30)) == ["5 days after"]
+
+    store = EventStore([
+        _event("2020-04-10", "10 days after", company="A"),
+        _event("2020-03-21", "10 days before", company="A"),
+    ])
+    out = store.attribute(errors, window=30)
+    assert _events_by_row(out) == ["10 days before"]
+    assert out["event_date"].iloc[0] == pd.Timestamp("2020-03-21")
+
+
+def test_targets_limit_the_groups_an_event_explains():
+    store = EventStore([
+        _event("2020-03-01", "liquidity squeeze", company="A", target=" liquidité "),
+        _event("2020-03-02", "merger", company="A", target=f"{ALL[0]}/{ALL[1]}"),
+    ])
+    out = store.attribute(_errors([("2020-03-31", "A", "France")]))
+
+    events = out.set_index("error_type")["event"]
+    expected = pd.Series({ALL[0]: "merger", ALL[1]: "merger", "liquidité": "liquidity squeeze", "croissance": np.nan})
+    pd.testing.assert_series_equal(events, expected, check_names=False, check_index_type=False)
+    assert dict(zip(out["error_type"], out["origine"]))["croissance"] == ORIGINS["unexplained"]
+
+
+def test_unknown_targets_are_rejected():
+    with pytest.raises(ValueError, match="unknown event targets"):
+        EventStore([_event("2020-03-01", "typo", company="A", target="liquidity")])
+
+
+def test_empty_store_attributes_nothing():
+    errors = _errors([("2020-03-31", "A", "France"), ("2020-06-30", "B", "USA")])
+    store = EventStore([])
+    out = store.attribute(errors)
+
+    assert len(store) == 0
+    assert len(out) == len(errors) * len(ALL)
+    assert out["event"].isna().all() and out["event_date"].isna().all() and out["macro"].isna().all()
+    assert (out["event_type"] == EVENT_TYPES["none"]).all()
+    assert (out["origine"] == ORIGINS["unexplained"]).all()
+
+
+def test_csv_round_trip(tmp_path):
+    store = EventStore([
+        _event("2020-03-31", "Crise Covid-19", company="JP Morgan Chase", country="USA",
+               target="rentabilité/liquidité/croissance", macro="true"),
+        _event("2021-01-15", "Nouvelle direction", country="France", macro=""),
+    ])
+    again = EventStore.read_csv(store.to_csv(tmp_path / "events.csv"))
+    pd.testing.assert_frame_equal(again.frame, store.frame)
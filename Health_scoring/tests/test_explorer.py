@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.explorer import MACRO_OPTIONS, SCORE_OPTIONS, ExplorerCube, bucket_size
+from health_scoring.scoring import score
+from synthetic import synthetic_source
+
+
+@pytest.fixture(scope="module")
+def cube():
+    return ExplorerCube(score(synthetic_source(12, 40, seed=5)))
+
+
+@pytest.mark.parametrize("max_points", [1, 7, 100, 135, 479, 480, 5000])
+def test_select_honours_point_budget(cube, max_points):
+    companies = list(cube.companies)
+    labels = list(SCORE_OPTIONS) + list(MACRO_OPTIONS)
+    selection = cube.select(companies, labels, max_points=max_points)
+    assert 0 < len(selection) <= max_points
+    full = cube.select(companies, labels, max_points=10**9)
+    if len(full) <= max_points:
+        pd.testing.assert_frame_equal(selection, full)
+
+
+def test_select_keeps_every_series_when_one_point_each_fits(cube):
+    companies = list(cube.companies)[:5]
+    labels = list(SCORE_OPTIONS)[:4]
+    selection = cube.select(companies, labels, max_points=20)
+    assert len(selection) <= 20
+    assert len(selection.groupby(["Company", "Score"], observed=True)) == 20
+
+
+def test_bucket_size_accounts_for_alignment():
+    first, last = np.array([1, 0]), np.array([10, 9])
+    bucket = bucket_size(first, last, 5)
+    assert (last // bucket - first // bucket + 1).max() <= 5
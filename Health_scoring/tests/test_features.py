@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.features import TREND_SCORE_COLS, feature_columns, trend_features
+from health_scoring.scoring import score
+from synthetic import synthetic_source
+
+
+@pytest.mark.parametrize("companies", [40, 2000])
+def test_constant_window_has_zero_std_and_no_z(companies):
+    df = score(synthetic_source(companies, 20, seed=1)).sort_values(["company", "quarter"]).reset_index(drop=True)
+    rows = np.flatnonzero(df["company"] == df["company"].iloc[-1])
+    # the last company holds its scores for six quarters, after many rows of running sums
+    df.loc[rows[8:14], TREND_SCORE_COLS] = 0.3
+    features = trend_features(df)
+
+    flat = rows[11:14]
+    assert (features.loc[flat, feature_columns("std")] == 0).all(axis=None)
+    assert features.loc[flat, feature_columns("z")].isna().all(axis=None)
+    assert features.loc[flat, feature_columns("mean")].to_numpy() == pytest.approx(0.3)
+
+
+def test_rolling_std_matches_pandas():
+    df = score(synthetic_source(30, 16, seed=2))
+    features = trend_features(df)
+    expected = (
+        df.sort_values(["company", "quarter"]).groupby("company")[TREND_SCORE_COLS]
+        .rolling(4, min_periods=2).std().reset_index(level=0, drop=True)
+    ).reindex(df.index)
+    np.testing.assert_allclose(features[feature_columns("std")].to_numpy(), expected.to_numpy(), atol=1e-9)
+
+
+def _one_score(values, column="score_solvency_local"):
+    quarters = [f"{2015 + i // 4}-Q{i % 4 + 1}" for i in range(len(values))]
+    return pd.DataFrame({"company": "A", "quarter": quarters, column: values}), [column]
+
+
+def test_constant_window_at_a_large_offset_is_exactly_flat():
+    level = 1e6 + 0.3
+    df, columns = _one_score([1e6 - 50.0, 1e6 + 70.0, 1e6 + 1.0] + [level] * 5)
+    features = trend_features(df, columns=columns)
+
+    flat = features.iloc[6:]
+    assert (flat[feature_columns("std", columns)] == 0).all(axis=None)
+    assert (flat[feature_columns("mean", columns)] == level).all(axis=None)
+    assert flat[feature_columns("z", columns)].isna().all(axis=None)
+
+
+def test_small_spread_around_a_large_level_is_not_flat():
+    values = 1e6 + np.array([0.0, 2e-6, 1e-6, 4e-6, 3e-6, 3e-6])
+    df, columns = _one_score(values)
+    features = trend_features(df, columns=columns)
+
+    for row in range(3, len(values)):
+        window = values[row - 3:row + 1]
+        expected = np.std(window - window[0], ddof=1)
+        assert features[feature_columns("std", columns)].iloc[row, 0] == pytest.approx(expected, rel=1e-6)
+        assert features[feature_columns("mean", columns)].iloc[row, 0] == pytest.approx(window.mean(), abs=1e-9)
+    assert features[feature_columns("z", columns)].iloc[3:].notna().all(axis=None)
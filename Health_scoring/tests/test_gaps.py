@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.gaps import IMPUTED_COL, fill_gaps, imputed_mask
+
+QUARTERS = [f"{year}-Q{q}" for year in (2023, 2024) for q in range(1, 5)]
+NAN = np.nan
+
+
+def _frame(series):
+    """Company rows from {company: {quarter: (x, y)}}."""
+    rows = [(company, quarter, *values) for company, by_quarter in series.items()
+            for quarter, values in by_quarter.items()]
+    return pd.DataFrame(rows, columns=["company", "quarter", "x", "y"])
+
+
+# A: leading gap, inner gaps, the same quarter known a year later or earlier
+A = dict(zip(QUARTERS, [(NAN, 0), (2, 0), (NAN, 0), (4, 0), (5, 0), (NAN, 0), (7, 0), (8, 0)]))
+
+
+@pytest.mark.parametrize("strategy, expected", [
+    ("none", [NAN, 2, NAN, 4, 5, NAN, 7, 8]),
+    ("ffill", [2, 2, 2, 4, 5, 5, 7, 8]),
+    ("linear", [2, 2, 3, 4, 5, 6, 7, 8]),
+    # 2023-Q1 <- 2024-Q1, 2023-Q3 <- 2024-Q3, 2024-Q2 <- 2023-Q2
+    ("seasonal", [5, 2, 7, 4, 5, 2, 7, 8]),
+])
+def test_strategies(strategy, expected):
+    filled = fill_gaps(_frame({"A": A}), ["x", "y"], strategy=strategy)
+    np.testing.assert_array_equal(filled["x"].to_numpy(), expected)
+    imputed = [strategy != "none" and np.isnan(v) for v in (NAN, 2, NAN, 4, 5, NAN, 7, 8)]
+    assert filled[IMPUTED_COL].tolist() == [int(flag) for flag in imputed]
+
+
+def test_missing_quarters_are_interpolation_steps_on_the_calendar():
+    df = _frame({"B": {"2023-Q1": (0, 0), "2023-Q2": (NAN, 0), "2024-Q1": (4, 0)}})
+    assert fill_gaps(df, ["x"], spacing="calendar")["x"].tolist() == [0, 1, 4]
+    assert fill_gaps(df, ["x"], spacing="rows")["x"].tolist() == [0, 2, 4]
+    with pytest.raises(ValueError, match="calendar"):
+        fill_gaps(df, ["x"], strategy="seasonal", spacing="rows")
+
+
+@pytest.mark.parametrize("strategy", ["ffill", "linear", "seasonal"])
+def test_empty_and_single_observation_series(strategy):
+    df = _frame({
+        "C": {q: (NAN, 1) for q in QUARTERS[:4]},
+        "D": {"2023-Q2": (NAN, 1), "2023-Q4": (3, 1), "2024-Q1": (NAN, 1)},
+        "E": {"2024-Q2": (NAN, 1)},
+    })
+    filled = fill_gaps(df, ["x", "y"], strategy=strategy)
+
+    assert filled.loc[df["company"] == "C", "x"].isna().all()
+    assert filled.loc[df["company"] == "D", "x"].tolist() == [3, 3, 3]
+    assert filled.loc[df["company"] == "E", "x"].isna().all()
+    assert filled[IMPUTED_COL].tolist() == [0, 0, 0, 0, 1, 0, 1, 0]
+
+
+def test_imputed_flags_bitmask():
+    df = pd.DataFrame({
+        "company": ["A"] * 4,
+        "quarter": QUARTERS[:4],
+        "x": [1, NAN, 3, NAN],
+        "y": [NAN, 2, 3, 4],
+        "z": [1, NAN, NAN, 4],
+    })
+    filled = fill_gaps(df, ["x", "y", "z"], strategy="ffill")
+
+    assert filled[IMPUTED_COL].dtype == np.uint16
+    # bit j set where columns[j] was missing
+    assert filled[IMPUTED_COL].tolist() == [0b010, 0b101, 0b100, 0b001]
+    mask = imputed_mask(filled, ["x", "y", "z"])
+    pd.testing.assert_frame_equal(mask, df[["x", "y", "z"]].isna())
+
+    # a second fill of the same columns keeps the earlier flags
+    again = fill_gaps(filled.assign(x=[NAN, 2, 3, 3]), ["x", "y", "z"], strategy="ffill")
+    assert again[IMPUTED_COL].tolist() == [0b011, 0b101, 0b100, 0b001]
+
+
+def test_duplicate_company_quarter_is_rejected():
+    df = _frame({"A": {"2023-Q1": (1, 0)}})
+    with pytest.raises(ValueError, match="share"):
+        fill_gaps(pd.concat([df, df]), ["x"])
+
+
+def test_gap_filled_store_rejects_incremental_updates(tmp_path):
+    from health_scoring.incremental import update_store
+    from health_scoring.store import FILL_COLUMNS, build, write_store
+    from synthetic import synthetic_source
+
+    source = synthetic_source(10, 6, seed=4)
+    df, thresholds, service = build(source, fill="linear")
+    assert imputed_mask(df, FILL_COLUMNS).to_numpy().any()
+    path = tmp_path / "filled.parquet"
+    write_store(df, thresholds, path, fill="linear", service=service)
+
+    with pytest.raises(ValueError, match="gap-filled"):
+        update_store(path, source.tail(10))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from health_scoring.index import ScoreIndex
+
+
+def _frame():
+    companies = ["B", "A", np.nan, "A", "B", "A", "C", None]
+    quarters = ["2024Q2", "2024Q2", "2024Q1", np.nan, "2024Q1", "2024Q1", np.nan, "2024Q2"]
+    return pd.DataFrame({"company": companies, "quarter": quarters, "score": np.arange(8.0)})
+
+
+def test_missing_keys_stay_in_the_frame_but_out_of_lookups():
+    index = ScoreIndex(_frame())
+
+    assert len(index) == 8
+    assert list(index.companies) == ["A", "B", "C"]
+    assert list(index.quarters) == ["2024Q1", "2024Q2"]
+    assert index.company("A")["score"].tolist() == [5.0, 1.0, 3.0]
+    assert index.company("C")["score"].tolist() == [6.0]
+    # the row without a company still belongs to its quarter, after the known companies
+    assert index.quarter("2024Q1")["score"].tolist() == [5.0, 4.0, 2.0]
+    assert index.quarter("2024Q2")["score"].tolist() == [1.0, 0.0, 7.0]
+    assert index.frame["score"].iloc[index.row("B", "2024Q1")] == 4.0
+    assert index.row("C", "2024Q1") == -1
+    assert index.cells(["A", "C", "Z"], ["2024Q2", "2024Q2", "2024Q1"]).tolist() == [1, -1, -1]
+    assert index.company_sizes().tolist() == [3, 2, 1]
+
+    owners, rows = index.quarter_pairs(["2024Q2", "2024Q1"])
+    assert owners.tolist() == [0, 0, 0, 1, 1, 1]
+    assert index.frame["score"].iloc[rows].tolist() == [1.0, 0.0, 7.0, 5.0, 4.0, 2.0]
+
+
+def test_lookups_match_boolean_scans():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "company": rng.choice(["A", "B", "C", "D"], 60),
+        "quarter": rng.choice(["2023Q4", "2024Q1", "2024Q2"], 60),
+        "score": rng.random(60),
+    }).drop_duplicates(["company", "quarter"])
+    index = ScoreIndex(df)
+
+    for company in index.companies:
+        expected = df[df["company"] == company].sort_values("quarter")["score"].tolist()
+        assert index.company(company)["score"].tolist() == expected
+    for quarter in index.quarters:
+        expected = df[df["quarter"] == quarter].sort_values("company")["score"].tolist()
+        assert index.quarter(quarter)["score"].tolist() == expected
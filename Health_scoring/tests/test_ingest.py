@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.ingest import FileSource, StatementCache, ingest, write_statements
+
+UNIVERSE = {"Bank A": ("AAA", "France"), "Bank B": ("BBB.L", "UK")}
+DATES = pd.to_datetime(["2024-03-31", "2024-06-30"])
+
+
+def _statements(net_income=(10.0, 12.0), revenue=(50.0, 60.0)):
+    return {
+        "income": pd.DataFrame({"Total Revenue": revenue, "Net Income": net_income}, index=DATES),
+        "balance": pd.DataFrame({
+            "Total Assets": [1000.0, 1200.0],
+            "Total Liabilities Net Minority Interest": [900.0, 1080.0],
+            "Stockholders Equity": [100.0, 120.0],
+            "Current Assets": [300.0, 330.0],
+            "Current Liabilities": [250.0, 300.0],
+            "Cash And Cash Equivalents": [50.0, 75.0],
+        }, index=DATES),
+        "cashflow": pd.DataFrame({"Operating Cash Flow": [5.0, 6.0]}, index=DATES),
+    }
+
+
+class CountingSource(FileSource):
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    def fetch(self, ticker, statement):
+        self.calls.append((ticker, statement))
+        return super().fetch(ticker, statement)
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "statements"
+    for _, (ticker, _) in UNIVERSE.items():
+        write_statements(root, ticker, _statements())
+    return root
+
+
+def test_cache_miss_then_hit(root, tmp_path):
+    source = CountingSource(root)
+    cache = StatementCache(tmp_path / "cache", period="2024-Q3")
+    first, errors = ingest(source, UNIVERSE, cache=cache)
+    assert not errors and len(source.calls) == 6
+
+    source.calls.clear()
+    second, _ = ingest(source, UNIVERSE, cache=cache)
+    assert source.calls == []
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cache_refetches_when_the_source_changes(root, tmp_path):
+    cache = StatementCache(tmp_path / "cache", period="2024-Q3")
+    ingest(FileSource(root), UNIVERSE, cache=cache)
+
+    path = FileSource(root).path("AAA", "income")
+    write_statements(root, "AAA", {"income": _statements(net_income=(20.0, 24.0))["income"]})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    source = CountingSource(root)
+    df, _ = ingest(source, UNIVERSE, cache=cache)
+    assert source.calls == [("AAA", "income")]
+    latest = df[df["company"] == "Bank A"].iloc[0]
+    assert latest["ROA"] == pytest.approx(24.0 / 1200.0 * 400)
+
+    # another root holding the same tickers is another source
+    other = tmp_path / "other"
+    for _, (ticker, _) in UNIVERSE.items():
+        write_statements(other, ticker, _statements())
+    source = CountingSource(other)
+    ingest(source, UNIVERSE, cache=cache)
+    assert len(source.calls) == 6
+
+
+def test_failing_ticker_does_not_stop_the_others(root, tmp_path):
+    universe = {**UNIVERSE, "Missing Bank": ("ZZZ", "Spain")}
+    df, errors = ingest(FileSource(root), universe, cache=StatementCache(tmp_path / "cache", period="2024-Q3"))
+    assert list(errors) == ["ZZZ"]
+    assert sorted(df["company"].unique()) == ["Bank A", "Bank B"]
+
+
+def test_derived_ratios_match_hand_computed_values(root):
+    df, _ = ingest(FileSource(root), UNIVERSE)
+    bank = df[df["company"] == "Bank A"].set_index("quarter")
+    assert list(bank.index) == ["2024-Q2", "2024-Q1"]
+    q1, q2 = bank.loc["2024-Q1"], bank.loc["2024-Q2"]
+    assert q1["ROA"] == pytest.approx(10 / 1000 * 400)
+    assert q1["ROE"] == pytest.approx(10 / 100 * 4)
+    assert q1["debt_to_equity"] == pytest.approx(9.0)
+    assert q1["current_ratio"] == pytest.approx(1.2)
+    assert q1["net_margin"] == pytest.approx(0.2)
+    assert q1["cash_ratio"] == pytest.approx(0.2)
+    assert np.isnan(q1["revenue_growth"])
+    assert q2["revenue_growth"] == pytest.approx(0.2)
+    assert q2["cash_ratio"] == pytest.approx(0.25)
+    assert q1["country"] == "France" and q1["date"] == "2024-03-31"
+    assert bank[["inflation_YoY", "gdp_growth_rate", "interest_rate"]].isna().all(axis=None)
+
+
+def test_concurrent_puts_do_not_share_a_temporary_file(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = StatementCache(str(tmp_path / "cache"), period="2024-Q3")
+    frames = [_statements(net_income=(float(i), float(i + 1)))["income"] for i in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: cache.put("AAA", "income", frames[i], version=f"v{i}"), range(16)))
+
+    directory = os.path.dirname(cache.path("AAA", "income"))
+    assert sorted(os.listdir(directory)) == ["income.parquet", "income.parquet.version"]
+    with open(cache.path("AAA", "income") + ".version", encoding="utf-8") as f:
+        version = f.read()
+    cached = cache.get("AAA", "income", version)
+    assert cached is not None and len(cached) == 2
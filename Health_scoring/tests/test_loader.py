@@ -0,0 +1,46 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from health_scoring import loader
+from health_scoring.loader import read_source, score_chunked, write_source
+from health_scoring.scoring import INDICATORS, score
+from synthetic import synthetic_source
+
+
+def _source(tmp_path, companies, quarters):
+    path = tmp_path / "source.csv"
+    write_source(synthetic_source(companies, quarters, seed=2), path)
+    return path
+
+
+def test_score_chunked_matches_score(tmp_path):
+    path = _source(tmp_path, 30, 12)
+    expected = score(read_source(path))
+    got = pd.concat(score_chunked(path, chunksize=50), ignore_index=True)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_score_chunked_reads_bounded_chunks(tmp_path, monkeypatch):
+    path = _source(tmp_path, 400, 60)
+    chunksize = 1000
+    largest = []
+
+    def counting_read(*args, **kwargs):
+        for chunk in read_source(*args, **kwargs):
+            largest.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(loader, "read_source", counting_read)
+    rows = 0
+    tracemalloc.start()
+    for part in score_chunked(path, chunksize=chunksize):
+        rows += len(part)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert rows == 400 * 60
+    assert max(largest) <= chunksize
+    # the old pass 1 held the indicators and their global ranks for every row
+    assert peak < 2 * rows * len(INDICATORS) * np.dtype(np.float64).itemsize
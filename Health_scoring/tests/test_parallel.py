@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.parallel import score_parallel, slice_bounds
+from health_scoring.scoring import GLOBAL_SCORE_COLS, LOCAL_SCORE_COLS, score
+from synthetic import synthetic_source
+
+
+@pytest.mark.parametrize("global_by", ["quarter", "country"])
+def test_two_workers_match_in_process_scoring(global_by):
+    df = synthetic_source(40, 12, seed=7)
+    expected = score(df, global_by=global_by)
+    result = score_parallel(df, workers=2, global_by=global_by)
+
+    pd.testing.assert_frame_equal(result[LOCAL_SCORE_COLS], expected[LOCAL_SCORE_COLS])
+    pd.testing.assert_frame_equal(result[GLOBAL_SCORE_COLS], expected[GLOBAL_SCORE_COLS])
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_slices_never_split_a_group():
+    codes = np.repeat(np.arange(5), [1, 7, 2, 2, 9])
+    bounds = slice_bounds(codes, 4)
+    assert bounds[0] == 0 and bounds[-1] == len(codes)
+    for cut in bounds[1:-1]:
+        assert codes[cut] != codes[cut - 1]
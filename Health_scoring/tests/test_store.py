@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.store import build, load_store, write_store
+from synthetic import synthetic_source
+
+
+def test_concurrent_writers_do_not_share_a_temporary_file(tmp_path):
+    df, thresholds, service = build(synthetic_source(20, 8, seed=6))
+    path = tmp_path / "scores.parquet"
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: write_store(df, thresholds, path, service=service), range(16)))
+
+    assert os.listdir(tmp_path) == ["scores.parquet"]
+    stored, meta = load_store(path)
+    pd.testing.assert_frame_equal(stored, df)
+    assert meta["thresholds"] == thresholds
+
+
+def test_macro_series_are_stored_once_and_joined_on_load(tmp_path):
+    import pyarrow.parquet as pq
+
+    from health_scoring.macro import MACRO_COLUMNS
+    from health_scoring.store import load_macro
+
+    df, thresholds, service = build(synthetic_source(20, 8, seed=6))
+    path = tmp_path / "scores.parquet"
+    write_store(df, thresholds, path, service=service)
+
+    assert not set(MACRO_COLUMNS) & set(pq.read_schema(path).names)
+    stored, meta = load_store(path)
+    pd.testing.assert_frame_equal(stored, df)
+    bare, _ = load_store(path, macro=False)
+    assert list(bare.columns) == [c for c in df.columns if c not in MACRO_COLUMNS]
+    assert len(load_macro(meta)) == df[["country", "quarter"]].drop_duplicates().shape[0]
+
+
+@pytest.mark.parametrize("case", ["missing everywhere", "missing on one row", "conflicting"])
+def test_macro_round_trip_keeps_missing_and_conflicting_values(tmp_path, case):
+    import pyarrow.parquet as pq
+
+    from health_scoring.macro import MACRO_COLUMNS
+
+    df, thresholds, service = build(synthetic_source(20, 8, seed=6))
+    key = (df["country"] == df.at[0, "country"]) & (df["quarter"] == df.at[0, "quarter"])
+    if case == "missing everywhere":
+        df.loc[key, "interest_rate"] = np.nan
+    elif case == "missing on one row":
+        df.loc[key.idxmax(), "interest_rate"] = np.nan
+    else:
+        df.loc[key.idxmax(), "inflation_YoY"] += 0.01
+    path = tmp_path / "scores.parquet"
+    write_store(df, thresholds, path, service=service)
+
+    stored, meta = load_store(path)
+    pd.testing.assert_frame_equal(stored, df)
+    factored = case == "missing everywhere"
+    assert (meta["macro"] is not None) == factored
+    assert bool(set(MACRO_COLUMNS) & set(pq.read_schema(path).names)) != factored
+
+
+def test_default_thresholds_keep_the_page_labels():
+    from bench_classify import legacy_classify
+    from health_scoring.classify import compute_thresholds
+    from health_scoring.store import read_csv_any
+
+    source = read_csv_any(os.path.join(os.path.dirname(__file__), "..", "app_streamlit", "dataset1_complet.csv"))
+    df, thresholds, service = build(source)
+
+    source = source.sort_values(["company", "quarter"], kind="stable").reset_index(drop=True)
+    legacy = legacy_classify(source, compute_thresholds(source, "local"), compute_thresholds(source, "global"))
+    for col in ("Local Status", "Global Status"):
+        assert df[col].astype(str).tolist() == legacy[col].tolist()
+
+
+def test_store_file_gets_the_mode_of_a_plain_open(tmp_path):
+    import stat
+
+    df, thresholds, service = build(synthetic_source(5, 4, seed=6))
+    path = tmp_path / "scores.parquet"
+    write_store(df, thresholds, path, service=service)
+    (tmp_path / "plain").write_text("")
+
+    mode = stat.S_IMODE(os.stat(path).st_mode)
+    assert mode == stat.S_IMODE(os.stat(tmp_path / "plain").st_mode)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from health_scoring.classify import compute_thresholds, score_columns
+from health_scoring.incremental import update_store
+from health_scoring.store import build, load_store, write_store
+from health_scoring.thresholds import ExactQuantiles, KLLSketch, ThresholdService
+from synthetic import synthetic_source
+
+
+def _store_without_last_quarters(tmp_path, exact, held_out=1, companies=60, quarters=16):
+    """(store path of all but the last `held_out` quarters, source rows of each held-out quarter)."""
+    source = synthetic_source(companies, quarters, seed=4)
+    last = sorted(source["quarter"].unique())[-held_out:]
+    path = tmp_path / "scores.parquet"
+    df, thresholds, service = build(source[~source["quarter"].isin(last)], sketch_thresholds=not exact)
+    write_store(df, thresholds, path, service=service)
+    return path, [source[source["quarter"] == q] for q in last]
+
+
+def _rank(values, x):
+    """Normalized rank of `x` among the non-missing `values`."""
+    values = np.sort(values[~np.isnan(values)])
+    return np.searchsorted(values, x, side="right") / len(values)
+
+
+def test_exact_incremental_thresholds_match_full_recompute(tmp_path):
+    path, batches = _store_without_last_quarters(tmp_path, exact=True, held_out=2)
+    for new_rows in batches:
+        df = update_store(path, new_rows)
+    meta = load_store(path)[1]
+    for scope in ("local", "global"):
+        expected = compute_thresholds(df, scope)
+        for key, bounds in meta["thresholds"][scope].items():
+            assert bounds == pytest.approx(expected[key], abs=1e-12)
+
+
+def test_sketch_incremental_thresholds_within_rank_error(tmp_path):
+    path, batches = _store_without_last_quarters(tmp_path, exact=False, held_out=3)
+    for new_rows in batches:
+        df = update_store(path, new_rows)
+        meta = load_store(path)[1]
+        service = ThresholdService.from_dict(meta["threshold_state"])
+        bound = service.rank_error()
+        assert 0 < bound < 0.05
+        _assert_within(df, meta["thresholds"], bound)
+
+
+def _assert_within(df, thresholds, bound):
+    for scope in ("local", "global"):
+        for col in score_columns(scope):
+            values = df[col].astype(np.float64)
+            bounds = thresholds[scope][col.replace(f"_{scope}", "")]
+            for side, q in (("low", 0.1), ("high", 0.9)):
+                # the exact quantiles `bound` ranks away bracket the sketch's answer
+                assert values.quantile(q - bound) <= bounds[side] <= values.quantile(q + bound)
+
+
+def test_global_summaries_only_see_the_new_quarter(tmp_path):
+    path, (new_rows,) = _store_without_last_quarters(tmp_path, exact=False)
+    before = load_store(path)[1]["threshold_state"]["summaries"]
+    df = update_store(path, new_rows)
+    after = load_store(path)[1]["threshold_state"]["summaries"]
+    added = df[df["quarter"].astype(str).isin(new_rows["quarter"])]
+    for col in score_columns("global"):
+        assert after[col]["n"] - before[col]["n"] == added[col].notna().sum()
+        assert after[col]["retracted"] is None
+
+
+def test_exact_remove_restores_quantiles():
+    rng = np.random.default_rng(0)
+    a, b = rng.random(500), rng.random(300)
+    summary = ExactQuantiles().update(a).update(b).remove(b)
+    assert summary.quantile(0.1) == pytest.approx(pd.Series(a).quantile(0.1))
+    with pytest.raises(ValueError):
+        summary.remove([2.0])
+
+
+def test_sketch_remove_tracks_live_values():
+    rng = np.random.default_rng(1)
+    a, b = rng.random(20_000), rng.random(5_000) + 1
+    sketch = KLLSketch(k=200).update(a).update(b).remove(b)
+    assert sketch.count == len(a)
+    assert abs(_rank(a, sketch.quantile(0.9)) - 0.9) <= sketch.rank_error()